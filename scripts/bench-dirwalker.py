@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark `makefiles.utils.dirwalker.listf` against the previous `os.walk` based walker.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Protocol, cast
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+import makefiles.utils.dirwalker as dirwalker  # noqa: E402
+
+DEFAULT_SIZES = (10_000, 100_000)
+FILES_PER_DIR = 25
+DIRS_PER_DIR = 8
+
+
+def log(message: str) -> None:
+    print(f"-> {message}", file=sys.stderr)
+
+
+def listf_oswalk(path: Path) -> list[str]:
+    """The `os.walk` + `os.path.relpath` walker `listf` used to be."""
+    path = path.absolute()
+    result: list[str] = []
+
+    for root, dirs, files in os.walk(path, topdown=True):
+        dirs[:] = filter(lambda d: not d.startswith("."), dirs)
+
+        for file in files:
+            if not file.startswith("."):
+                result.append(os.path.relpath(os.path.join(root, file), path))
+
+    return result
+
+
+def generate_tree(root: Path, count: int) -> None:
+    """Create *count* empty files spread over a balanced directory tree below *root*."""
+    pending: list[Path] = [root]
+    created = 0
+
+    while created < count:
+        current = pending.pop(0)
+        current.mkdir(parents=True, exist_ok=True)
+
+        for index in range(min(FILES_PER_DIR, count - created)):
+            current.joinpath(f"template_{index:02d}.txt").touch()
+            created += 1
+
+        pending.extend(current.joinpath(f"group_{index}") for index in range(DIRS_PER_DIR))
+
+
+def measure(func: Callable[[Path], list[str]], root: Path, repeat: int) -> tuple[float, int]:
+    timings: list[float] = []
+    found = 0
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = len(func(root))
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings), found
+
+
+class Args(Protocol):
+    """
+    Typed stand-in for argparse's default Namespace.
+    """
+
+    sizes: list[int]
+    repeat: int
+
+
+def parse_args() -> Args:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "sizes",
+        nargs="*",
+        type=int,
+        default=list(DEFAULT_SIZES),
+        help=f"number of templates per generated tree (default: {' '.join(map(str, DEFAULT_SIZES))})",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=5,
+        help="runs per walker; the median is reported (default: 5)",
+    )
+
+    return cast(Args, cast(object, parser.parse_args()))
+
+
+def main() -> None:
+    args = parse_args()
+
+    print(f"{'templates':>10}  {'os.walk':>10}  {'scandir':>10}  {'speedup':>8}")
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix="mkfile-bench-") as tmp:
+            root = Path(tmp)
+            log(f"Generating {size} templates in {root}")
+            generate_tree(root, size)
+
+            # Warm the dentry cache so both walkers see the same filesystem state
+            listf_oswalk(root)
+
+            old, old_found = measure(listf_oswalk, root, args.repeat)
+            new, new_found = measure(dirwalker.listf, root, args.repeat)
+
+            if old_found != new_found:
+                raise SystemExit(f"error: walkers disagree ({old_found} vs {new_found} files)")
+
+            print(f"{size:>10}  {old * 1000:>8.1f}ms  {new * 1000:>8.1f}ms  {old / new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
+
+
+# pyright: reportUnusedExpression=false, reportUnusedCallResult=false
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory use of `makefiles.utils.name_store.NameStore` against a plain `list[str]` of template names.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Protocol, cast
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from makefiles.utils.name_store import NameStore  # noqa: E402
+
+DEFAULT_SIZES = (100_000, 1_000_000)
+FILES_PER_DIR = 25
+DIRS_PER_DIR = 8
+
+
+def log(message: str) -> None:
+    print(f"-> {message}", file=sys.stderr)
+
+
+def generate_names(count: int) -> list[str]:
+    """Return *count* template names spread over a balanced directory tree."""
+    names: list[str] = []
+    pending: list[str] = [""]
+
+    while len(names) < count:
+        current = pending.pop(0)
+
+        for index in range(min(FILES_PER_DIR, count - len(names))):
+            names.append(f"{current}template_{index:02d}.txt")
+
+        pending.extend(f"{current}group_{index}/" for index in range(DIRS_PER_DIR))
+
+    return names
+
+
+def measure(build: Callable[[], object]) -> int:
+    """Return the bytes retained by the object *build* returns."""
+    gc.collect()
+    tracemalloc.start()
+
+    built = build()
+    retained, _ = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+    del built
+    return retained
+
+
+def time_build(names: list[str]) -> float:
+    start = time.perf_counter()
+    NameStore(names)
+    return time.perf_counter() - start
+
+
+class Args(Protocol):
+    """
+    Typed stand-in for argparse's default Namespace.
+    """
+
+    sizes: list[int]
+
+
+def parse_args() -> Args:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "sizes",
+        nargs="*",
+        type=int,
+        default=list(DEFAULT_SIZES),
+        help=f"number of template names per run (default: {' '.join(map(str, DEFAULT_SIZES))})",
+    )
+
+    return cast(Args, cast(object, parser.parse_args()))
+
+
+def main() -> None:
+    args = parse_args()
+
+    print(f"{'templates':>10}  {'list[str]':>10}  {'NameStore':>10}  {'ratio':>7}  {'build':>8}")
+
+    for size in args.sizes:
+        log(f"Generating {size} template names")
+        names = generate_names(size)
+        encoded = "\n".join(names).encode()  # kept outside the measurement, so both sides start from raw data
+
+        list_bytes = measure(lambda: encoded.decode().split("\n"))
+        store_bytes = measure(lambda: NameStore(encoded.decode().split("\n")))
+        elapsed = time_build(names)
+
+        print(
+            f"{size:>10}  {list_bytes / 2**20:>8.1f}MB  {store_bytes / 2**20:>8.1f}MB  "
+            f"{list_bytes / store_bytes:>6.1f}x  {elapsed:>7.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
+
+
+# pyright: reportUnusedExpression=false, reportUnusedCallResult=false
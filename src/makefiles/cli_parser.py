@@ -1,6 +1,8 @@
 import argparse
+import re
 
 import makefiles.types as custom_types
+import makefiles.utils.template_grep as template_grep
 
 
 def get_parser() -> argparse.ArgumentParser:
@@ -33,6 +35,13 @@ def get_parser() -> argparse.ArgumentParser:
         help="template to generate. If no template is provided, it will prompt for template",
     )
 
+    parser.add_argument(
+        "-a",
+        "--auto",
+        action="store_true",
+        help="pick a template for each file from its name, e.g. `*.py`, `test_*.py` or `Dockerfile`",
+    )
+
     parser.add_argument(
         "-p",
         "--parents",
@@ -47,6 +56,18 @@ def get_parser() -> argparse.ArgumentParser:
         help="overwrite destination if it already exists",
     )
 
+    parser.add_argument(
+        "--link",
+        nargs=1,
+        action="store",
+        type=str,
+        choices=["hard", "reflink", "auto"],
+        default=[None],
+        help="share storage with the template instead of copying it: `hard` links, `reflink` clones, `auto` clones "
+        "or else hard-links a read-only template. Hard links are the template itself, so editing one edits the "
+        "template. Where a file cannot be linked it is copied once and the others are linked to that copy",
+    )
+
     parser.add_argument(
         "-P",
         "--picker",
@@ -68,11 +89,122 @@ def get_parser() -> argparse.ArgumentParser:
         help="height of fzf window if fzf is used as template picker",
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        nargs=1,
+        action="store",
+        type=custom_types.NaturalNumber,
+        default=[custom_types.NaturalNumber(1)],
+        help="number of directories to read in parallel while scanning templates, and of files written in parallel "
+        "when creating several. Useful on network filesystems",
+    )
+
+    parser.add_argument(
+        "--max-depth",
+        nargs=1,
+        action="store",
+        type=custom_types.NaturalNumber,
+        default=[None],
+        dest="max_depth",
+        help="only look for templates this many levels deep. `1` only finds templates at the top level",
+    )
+
+    parser.add_argument(
+        "--max-entries",
+        nargs=1,
+        action="store",
+        type=custom_types.NaturalNumber,
+        default=[None],
+        dest="max_entries",
+        help="stop looking for templates after finding this many. `--list` then prints a truncated listing "
+        "and exits with 1; the picker fails",
+    )
+
+    parser.add_argument(
+        "-L",
+        "--follow-links",
+        action="store_true",
+        dest="follow_links",
+        help="also look for templates in symbolically linked directories. Each directory is read once, "
+        "however many links lead to it",
+    )
+
     parser.add_argument(
         "-l",
         "--list",
         action="store_true",
-        help="list available templates and exit",
+        help="list available templates in natural order (`file2` before `file10`, ignoring case) and exit",
+    )
+
+    parser.add_argument(
+        "--long",
+        action="store_true",
+        help="with --list, also show the size, modification time, line count and text/binary kind of each template",
+    )
+
+    parser.add_argument(
+        "--tree",
+        action="store_true",
+        help="with --list, show templates as a directory tree with the number of templates in each directory",
+    )
+
+    parser.add_argument(
+        "--offset",
+        nargs=1,
+        action="store",
+        type=int,
+        default=[0],
+        metavar="N",
+        help="with --list, skip the first N templates",
+    )
+
+    parser.add_argument(
+        "--limit",
+        nargs=1,
+        action="store",
+        type=custom_types.NaturalNumber,
+        default=[None],
+        metavar="N",
+        help="with --list, list at most N templates. Together with --offset, pages through large listings",
+    )
+
+    parser.add_argument(
+        "-s",
+        "--search",
+        nargs=1,
+        action="store",
+        type=str,
+        default=[None],
+        metavar="QUERY",
+        help="list templates whose contents contain all words of QUERY, best match first. A trailing `*` "
+        "matches any word starting with the rest. Exits with 1 if nothing matches",
+    )
+
+    parser.add_argument(
+        "--grep",
+        nargs=1,
+        action="store",
+        type=str,
+        default=[None],
+        metavar="PATTERN",
+        help="print the lines of templates that match the regular expression PATTERN, as `template:line:text`. "
+        "Binary templates are skipped. Exits with 1 if nothing matches",
+    )
+
+    parser.add_argument(
+        "--pack-templates",
+        action="store_true",
+        dest="pack_templates",
+        help="store all templates in one pack file inside the templates directory, which is then read instead of "
+        "the individual templates. Run it again after changing templates",
+    )
+
+    parser.add_argument(
+        "--watch-index",
+        action="store_true",
+        dest="watch_index",
+        help="keep the cached template index up to date using inotify until interrupted (Linux only)",
     )
 
     parser.add_argument(
@@ -98,9 +230,52 @@ def get_parser() -> argparse.ArgumentParser:
 def get_cli_args(argparser: argparse.ArgumentParser) -> argparse.Namespace:
     cli_arguments: argparse.Namespace = argparser.parse_args()
 
-    if not cli_arguments.files and not (cli_arguments.version or cli_arguments.list):
+    standalone: bool = (
+        cli_arguments.version
+        or cli_arguments.list
+        or cli_arguments.search[0] is not None
+        or cli_arguments.grep[0] is not None
+        or cli_arguments.pack_templates
+        or cli_arguments.watch_index
+    )
+    if not cli_arguments.files and not standalone:
         argparser.error("the following arguments are required: files")
 
+    if cli_arguments.long and not cli_arguments.list:
+        argparser.error("argument --long: only allowed with argument -l/--list")
+
+    if cli_arguments.tree and not cli_arguments.list:
+        argparser.error("argument --tree: only allowed with argument -l/--list")
+
+    if cli_arguments.tree and (
+        cli_arguments.long or cli_arguments.offset[0] != 0 or cli_arguments.limit[0] is not None
+    ):
+        argparser.error("argument --tree: not allowed with arguments --long, --offset or --limit")
+
+    if cli_arguments.offset[0] != 0 and not cli_arguments.list:
+        argparser.error("argument --offset: only allowed with argument -l/--list")
+
+    if cli_arguments.limit[0] is not None and not cli_arguments.list:
+        argparser.error("argument --limit: only allowed with argument -l/--list")
+
+    if cli_arguments.offset[0] < 0:
+        argparser.error("argument --offset: expected a non-negative number")
+
+    if cli_arguments.search[0] is not None and not cli_arguments.search[0].split():
+        argparser.error("argument -s/--search: expected a non-empty query")
+
+    if cli_arguments.grep[0] is not None:
+        try:
+            template_grep.compile_pattern(cli_arguments.grep[0])
+        except re.error as e:
+            argparser.error(f"argument --grep: invalid pattern: {e}")
+
+    if cli_arguments.link[0] is not None and cli_arguments.template is None and not cli_arguments.auto:
+        argparser.error("argument --link: only allowed with arguments -t/--template or -a/--auto")
+
+    if cli_arguments.auto and cli_arguments.template is not None:
+        argparser.error("argument -a/--auto: not allowed with argument -t/--template")
+
     if cli_arguments.dry_run:
         cli_arguments.verbose = True
 
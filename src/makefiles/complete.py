@@ -0,0 +1,267 @@
+"""
+Shell completion backend for `mkfile --template`.
+
+Usage:
+    mkfile-complete [--] PREFIX     print the template names that complete PREFIX
+    mkfile-complete --shell SHELL   print the completion script for bash, zsh or fish
+
+Completions are one path component at a time: templates below a directory
+are offered as that directory with a trailing `/`, like file name
+completion does. They are served from the names files that are rewritten
+whenever a template index is saved (by any `mkfile` run that lists or
+picks templates, or continuously by `mkfile --watch-index`), so answering
+a request reads one small file per template directory. Template archives
+are listed from their own index, see :mod:`makefiles.utils.template_archive`.
+
+This module is started once per key press, so it only imports what it
+needs for that: not `makefiles.mkfile`, argparse, logging or the pickers.
+A template directory that has never been indexed is indexed once, on a
+slower path that loads the indexer.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import pathlib
+import sys
+from collections.abc import Iterator
+from typing import Final
+
+import makefiles.utils as utils
+import makefiles.utils.name_cache as name_cache
+from makefiles.utils.name_store import NameStore
+
+_USAGE: Final[str] = "usage: mkfile-complete [--] PREFIX\n       mkfile-complete --shell {bash,zsh,fish}\n"
+
+_BASH_SCRIPT: Final[str] = r"""# bash completion for mkfile
+# Load it with: eval "$(mkfile-complete --shell bash)"
+
+_mkfile() {
+    local cur="${COMP_WORDS[COMP_CWORD]}" prev="${COMP_WORDS[COMP_CWORD-1]}"
+
+    # `--template=NAME` reaches us as `--template`, `=` and `NAME`
+    if [[ "$cur" == "=" ]]; then
+        cur=""
+    elif [[ "$prev" == "=" && $COMP_CWORD -ge 2 ]]; then
+        prev="${COMP_WORDS[COMP_CWORD-2]}"
+    fi
+
+    case "$prev" in
+        -t | --template)
+            local IFS=$'\n'
+            compopt +o default 2>/dev/null
+            COMPREPLY=($(mkfile-complete -- "$cur" 2>/dev/null))
+            if [[ ${#COMPREPLY[@]} -eq 1 && "${COMPREPLY[0]}" == */ ]]; then
+                compopt -o nospace 2>/dev/null
+            fi
+            return 0
+            ;;
+        -P | --picker)
+            COMPREPLY=($(compgen -W "fzf manual" -- "$cur"))
+            return 0
+            ;;
+        --link)
+            COMPREPLY=($(compgen -W "hard reflink auto" -- "$cur"))
+            return 0
+            ;;
+        -H | --height | -j | --jobs | --max-depth | --max-entries | --offset | --limit | -s | --search | --grep)
+            return 0
+            ;;
+    esac
+
+    if [[ "$cur" == -* ]]; then
+        COMPREPLY=($(compgen -W "--version --template --auto --parents --force --link --picker --height --jobs
+            --max-depth --max-entries --follow-links --list --long --tree --offset --limit --search --grep
+            --pack-templates --watch-index --verbose --dry-run --help" -- "$cur"))
+        return 0
+    fi
+
+    COMPREPLY=()
+}
+
+complete -o default -F _mkfile mkfile
+"""
+
+_ZSH_SCRIPT: Final[str] = r"""#compdef mkfile
+# zsh completion for mkfile
+# Load it with: source <(mkfile-complete --shell zsh)
+# or save it as `_mkfile` in a directory of your $fpath
+
+_mkfile_templates() {
+    local -a names files dirs
+    names=(${(f)"$(mkfile-complete -- "$PREFIX" 2>/dev/null)"})
+    dirs=(${(M)names:#*/})
+    files=(${names:#*/})
+    compadd -Q -a files
+    compadd -Q -S '' -a dirs
+}
+
+_mkfile() {
+    _arguments -s -S \
+        '(- *)--version[print version and exit]' \
+        '(-t --template -a --auto)'{-t+,--template=}'[template to generate]::template:_mkfile_templates' \
+        '(-a --auto -t --template)'{-a,--auto}'[pick a template for each file from its name]' \
+        '(-p --parents)'{-p,--parents}'[make parent directories as needed]' \
+        '(-f --force)'{-f,--force}'[overwrite destination if it already exists]' \
+        '--link=[share storage with the template instead of copying it]:mode:(hard reflink auto)' \
+        '(-P --picker)'{-P+,--picker=}'[template picker]:picker:(fzf manual)' \
+        '(-H --height)'{-H+,--height=}'[height of the fzf window]:height' \
+        '(-j --jobs)'{-j+,--jobs=}'[directories to read or files to write in parallel]:jobs' \
+        '--max-depth=[only look for templates this many levels deep]:depth' \
+        '--max-entries=[stop looking for templates after this many]:entries' \
+        '(-L --follow-links)'{-L,--follow-links}'[look for templates in linked directories too]' \
+        '(- *)'{-l,--list}'[list available templates and exit]' \
+        '--long[with --list, show size, mtime, lines and kind]' \
+        '--tree[with --list, show templates as a directory tree]' \
+        '--offset=[with --list, skip this many templates]:offset' \
+        '--limit=[with --list, list at most this many templates]:limit' \
+        '(- *)'{-s+,--search=}'[list templates whose contents match a query]:query' \
+        '(- *)--grep=[print template lines matching a regular expression]:pattern' \
+        '(- *)--pack-templates[store all templates in one pack file]' \
+        '(- *)--watch-index[keep the template index up to date]' \
+        '(-v --verbose)'{-v,--verbose}'[print a message for each file operation]' \
+        '(-n --dry-run)'{-n,--dry-run}'[show what would be done]' \
+        '(- *)'{-h,--help}'[show help and exit]' \
+        '*:file:_files'
+}
+
+if [[ "${zsh_eval_context[-1]}" == loadautofunc ]]; then
+    _mkfile "$@"
+else
+    compdef _mkfile mkfile
+fi
+"""
+
+_FISH_SCRIPT: Final[str] = r"""# fish completion for mkfile
+# Load it with: mkfile-complete --shell fish | source
+
+function __mkfile_templates
+    mkfile-complete -- (string replace -r -- '^--template=' '' (commandline -ct)) 2>/dev/null
+end
+
+complete -c mkfile -l version -d 'Print version and exit'
+complete -c mkfile -s t -l template -r -f -a '(__mkfile_templates)' -d 'Template to generate'
+complete -c mkfile -s a -l auto -d 'Pick a template for each file from its name'
+complete -c mkfile -s p -l parents -d 'Make parent directories as needed'
+complete -c mkfile -s f -l force -d 'Overwrite destination if it already exists'
+complete -c mkfile -l link -x -a 'hard reflink auto' -d 'Share storage with the template instead of copying it'
+complete -c mkfile -s P -l picker -x -a 'fzf manual' -d 'Template picker'
+complete -c mkfile -s H -l height -x -d 'Height of the fzf window'
+complete -c mkfile -s j -l jobs -x -d 'Directories to read or files to write in parallel'
+complete -c mkfile -l max-depth -x -d 'Only look for templates this many levels deep'
+complete -c mkfile -l max-entries -x -d 'Stop looking for templates after this many'
+complete -c mkfile -s L -l follow-links -d 'Look for templates in linked directories too'
+complete -c mkfile -s l -l list -d 'List available templates and exit'
+complete -c mkfile -l long -d 'With --list, show size, mtime, lines and kind'
+complete -c mkfile -l tree -d 'With --list, show templates as a directory tree'
+complete -c mkfile -l offset -x -d 'With --list, skip this many templates'
+complete -c mkfile -l limit -x -d 'With --list, list at most this many templates'
+complete -c mkfile -s s -l search -x -d 'List templates whose contents match a query'
+complete -c mkfile -l grep -x -d 'Print template lines matching a regular expression'
+complete -c mkfile -l pack-templates -d 'Store all templates in one pack file'
+complete -c mkfile -l watch-index -d 'Keep the template index up to date'
+complete -c mkfile -s v -l verbose -d 'Print a message for each file operation'
+complete -c mkfile -s n -l dry-run -d 'Show what would be done'
+"""
+
+_SCRIPTS: Final[dict[str, str]] = {
+    "bash": _BASH_SCRIPT,
+    "zsh": _ZSH_SCRIPT,
+    "fish": _FISH_SCRIPT,
+}
+
+
+def _load_names(root: pathlib.Path) -> NameStore | None:
+    """
+    Returns the cached names of *root*, indexing it first if it never was.
+
+    Returns:
+        NameStore | None: The names, or `None` if *root* is neither a
+        directory nor a template archive.
+    """
+    if os.path.isfile(root):
+        import makefiles.utils.template_archive as template_archive
+
+        # Listing an archive leaves it closed, as no template is read
+        archive: template_archive.TemplateArchive | None = template_archive.load(root)
+        return None if archive is None else archive.names
+
+    names: NameStore | None = name_cache.load(root)
+    if names is not None or not os.path.isdir(root):
+        return names
+
+    import makefiles.exceptions as exceptions
+    import makefiles.utils.template_index as template_index
+
+    try:
+        template_index.get_index(root)
+    except exceptions.MKFileException:
+        return None
+
+    return name_cache.load(root)
+
+
+def _sort_key(name: str) -> bytes:
+    return name.encode("utf-8", "surrogateescape")  # the order NameStore keeps its names in
+
+
+def complete(prefix: str, roots: tuple[pathlib.Path, ...]) -> Iterator[str]:
+    """
+    Yields the completions of a partial template name.
+
+    Args:
+        prefix (str): What has been typed so far.
+        roots (tuple[pathlib.Path, ...]): Template directories, highest
+            precedence first. Missing directories are skipped.
+
+    Returns:
+        Iterator[str]: Distinct completions, in sorted order. Directories
+        carry a trailing `/`.
+    """
+    stores: list[NameStore] = [names for names in map(_load_names, roots) if names is not None]
+    previous: str | None = None
+
+    for completion in heapq.merge(*(names.iter_completions(prefix) for names in stores), key=_sort_key):
+        if completion != previous:
+            yield completion
+        previous = completion
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Entry point for the `mkfile-complete` command.
+
+    Args:
+        argv (list[str] | None): Command line arguments, without the program
+            name. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: Process exit code.
+    """
+    args: list[str] = sys.argv[1:] if argv is None else argv
+
+    if args[:1] == ["--shell"]:
+        script: str | None = _SCRIPTS.get(args[1]) if len(args) == 2 else None
+        if script is None:
+            sys.stderr.write(_USAGE)
+            return 2
+
+        sys.stdout.write(script)
+        return 0
+
+    if args[:1] == ["--"]:
+        args = args[1:]
+    if len(args) > 1:
+        sys.stderr.write(_USAGE)
+        return 2
+
+    roots: tuple[pathlib.Path, ...] = (utils.get_xdg_templates_dir(), *utils.get_fallback_templates_dirs())
+    for completion in complete(args[0] if args else "", roots):
+        sys.stdout.write(completion + "\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,7 @@ class MKFileException(Exception):
     """Base exception for this project"""
 
     def __init__(self, message: str) -> None:
-        super().__init__(self, message)
+        super().__init__(message)
 
 
 class InvalidPathError(MKFileException):
@@ -40,6 +40,13 @@ class TemplateNotFoundError(MKFileException, FileNotFoundError):
         super().__init__(message)
 
 
+class AmbiguousTemplateError(TemplateNotFoundError):
+    """Given partial template name matches several templates equally well"""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
 class CopyError(MKFileException):
     """Failed to copy file"""
 
@@ -80,3 +87,38 @@ class FZFNotFoundError(FZFError):
 
     def __init__(self, message: str) -> None:
         super().__init__(message)
+
+
+class IndexWatchError(MKFileException):
+    """Failed to watch the template directory"""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+class EntryLimitExceededError(MKFileException):
+    """Directory walk found more entries than allowed"""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+class SearchIndexError(MKFileException):
+    """Template contents cannot be searched"""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+class TemplatePackError(MKFileException):
+    """Failed to write the template pack"""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
+
+
+class TemplateArchiveError(MKFileException):
+    """Failed to extract a template from a template archive"""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
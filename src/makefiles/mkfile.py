@@ -1,9 +1,15 @@
 import argparse
+import contextlib
+import functools
+import itertools
 import os
+import re
+import time
+from collections.abc import Callable, Iterator
 from logging import Logger
 from pathlib import Path
 from platform import system
-from typing import Literal
+from typing import IO, Literal
 
 try:
     from typing import assert_never
@@ -15,13 +21,22 @@ import makefiles.exceptions as exceptions
 import makefiles.types as custom_types
 import makefiles.utils as utils
 import makefiles.utils.cli_io as cli_io
-import makefiles.utils.dirwalker as dirwalker
 import makefiles.utils.fileutils as fileutils
+import makefiles.utils.index_watcher as index_watcher
 import makefiles.utils.picker as picker
+import makefiles.utils.search_index as search_index
+import makefiles.utils.template_catalog as template_catalog
+import makefiles.utils.template_grep as template_grep
+import makefiles.utils.template_index as template_index
+import makefiles.utils.template_mirror as template_mirror
+import makefiles.utils.template_pack as template_pack
+import makefiles.utils.template_tree as template_tree
 from makefiles.logger import get_logger, setup_logging
 
 _logger: Logger = get_logger(__name__)
 
+_LIST_BATCH_SIZE: int = 512  # number of templates written per chunk by `--list`
+
 
 def _get_templates_dir() -> Path | None:
     """
@@ -31,22 +46,173 @@ def _get_templates_dir() -> Path | None:
     Returns:
         pathlib.Path | None: The template directory if possible. Else `None`.
     """
-    templates_dir: str
     curr_os: str = system()
 
     if curr_os in ("Linux", "FreeBSD", "OpenBSD", "NetBSD"):
-        templates_dir = os.environ.get("XDG_TEMPLATES_DIR", str(Path.home().joinpath("Templates")))
-        return Path(templates_dir)
+        return utils.get_xdg_templates_dir()
 
     return None
 
 
-def _get_available_templates(templates_dir: Path) -> list[str]:
+def _get_fallback_templates_dirs() -> tuple[Path, ...]:
+    """
+    Get the template directories searched after the user's templates directory.
+
+    These are the entries of `MKFILE_TEMPLATES_PATH` (a `:`-separated list,
+    e.g. team-shared template stores), followed by the system-wide
+    `makefiles-cli/templates` directory of every `XDG_DATA_DIRS` entry.
+    Entries that do not exist are left out, so a search path without any
+    fallback directory is empty.
+
+    Returns:
+        tuple[pathlib.Path, ...]: Existing fallback template directories (or
+        archives), highest precedence first.
+    """
+    return tuple(directory for directory in utils.get_fallback_templates_dirs() if directory.exists())
+
+
+def _get_catalog(
+    templates_dir: Path,
+    *,
+    fallback_dirs: tuple[Path, ...] = (),
+    jobs: custom_types.NaturalNumber = custom_types.NaturalNumber(1),
+    max_depth: custom_types.NaturalNumber | None = None,
+    max_entries: custom_types.NaturalNumber | None = None,
+    follow_links: bool = False,
+    metadata: bool = False,
+) -> template_catalog.TemplateCatalog:
+    """
+    Returns the merged template catalog of the template search path.
+
+    Args:
+        templates_dir (pathlib.Path): Directory that holds template files.
+            Its templates shadow those of *fallback_dirs*.
+        fallback_dirs (tuple[pathlib.Path, ...]): Further template
+            directories, highest precedence first.
+        jobs (custom_types.NaturalNumber): Number of directories revalidated
+            in parallel within each template directory.
+        max_depth (custom_types.NaturalNumber | None): Maximum number of path
+            components of a template name; deeper directories are not read.
+        max_entries (custom_types.NaturalNumber | None): Number of templates
+            after which discovery stops and the catalog is marked truncated.
+        follow_links (bool): Descend into symbolic links to directories.
+        metadata (bool): Keep the recorded metadata of every template in the
+            catalog, collecting it for templates that have none yet.
+
+    Returns:
+        template_catalog.TemplateCatalog: The merged catalog.
+
+    Raises:
+        makefiles.exceptions.NoTemplatesAvailableError: If none of the
+            template directories exists.
+    """
+    try:
+        return template_catalog.get_catalog(
+            (templates_dir, *fallback_dirs),
+            jobs=jobs,
+            max_depth=max_depth,
+            max_entries=max_entries,
+            follow_links=follow_links,
+            metadata=metadata,
+        )
+    except exceptions.InvalidPathError:
+        raise exceptions.NoTemplatesAvailableError("could not find template directory") from None
+
+
+def _iter_available_templates(
+    templates_dir: Path,
+    *,
+    fallback_dirs: tuple[Path, ...] = (),
+    jobs: custom_types.NaturalNumber = custom_types.NaturalNumber(1),
+    max_depth: custom_types.NaturalNumber | None = None,
+    max_entries: custom_types.NaturalNumber | None = None,
+    follow_links: bool = False,
+) -> Iterator[str]:
+    """
+    Lazily yields relative paths of all non-hidden files of the template search path.
+
+    The listing is served from the persistent template indexes, which only
+    rescan directories whose mtime changed since the previous run. A name
+    found in several template directories is listed once.
+
+    Args:
+        templates_dir (pathlib.Path): Directory that holds template files.
+        fallback_dirs (tuple[pathlib.Path, ...]): Further template
+            directories, highest precedence first.
+        jobs (custom_types.NaturalNumber): Number of directories revalidated
+            in parallel.
+        max_depth (custom_types.NaturalNumber | None): Maximum number of path
+            components of a template name; deeper directories are not read.
+        max_entries (custom_types.NaturalNumber | None): Maximum number of
+            templates. Discovery stops as soon as it is exceeded.
+        follow_links (bool): Descend into symbolic links to directories.
+
+    Returns:
+        Iterator[str]: Relative template file paths.
+
+    Raises:
+        makefiles.exceptions.NoTemplatesAvailableError: If no template
+            directory exists, or none contains files. The empty case is
+            detected before the first template is returned.
+        makefiles.exceptions.EntryLimitExceededError: If there are more than
+            *max_entries* templates.
+    """
+    catalog: template_catalog.TemplateCatalog = _get_catalog(
+        templates_dir,
+        fallback_dirs=fallback_dirs,
+        jobs=jobs,
+        max_depth=max_depth,
+        max_entries=max_entries,
+        follow_links=follow_links,
+    )
+    if catalog.truncated:
+        raise exceptions.EntryLimitExceededError(_get_entry_limit_message(max_entries))
+
+    return _iter_catalog(catalog)
+
+
+def _iter_catalog(catalog: template_catalog.TemplateCatalog) -> Iterator[str]:
+    """
+    Returns an iterator over *catalog*, in natural order, that fails early
+    when it is empty.
+
+    Raises:
+        makefiles.exceptions.NoTemplatesAvailableError: If *catalog* holds no
+            templates.
     """
-    Returns relative paths of all non-hidden files under *templates_dir*.
+    if not catalog:
+        raise exceptions.NoTemplatesAvailableError("no templates found")
+
+    return catalog.iter_natural()
+
+
+def _get_entry_limit_message(max_entries: custom_types.NaturalNumber | None) -> str:
+    return f"more than {max_entries} templates found, check the templates directory or raise --max-entries"
+
+
+def _get_available_templates(
+    templates_dir: Path,
+    *,
+    fallback_dirs: tuple[Path, ...] = (),
+    jobs: custom_types.NaturalNumber = custom_types.NaturalNumber(1),
+    max_depth: custom_types.NaturalNumber | None = None,
+    max_entries: custom_types.NaturalNumber | None = None,
+    follow_links: bool = False,
+) -> list[str]:
+    """
+    Returns relative paths of all non-hidden files of the template search path.
 
     Args:
         templates_dir (pathlib.Path): Directory that holds template files.
+        fallback_dirs (tuple[pathlib.Path, ...]): Further template
+            directories, highest precedence first.
+        jobs (custom_types.NaturalNumber): Number of directories revalidated
+            in parallel.
+        max_depth (custom_types.NaturalNumber | None): Maximum number of path
+            components of a template name; deeper directories are not read.
+        max_entries (custom_types.NaturalNumber | None): Maximum number of
+            templates. Discovery stops as soon as it is exceeded.
+        follow_links (bool): Descend into symbolic links to directories.
 
     Returns:
         list[str]: Relative template file paths.
@@ -54,15 +220,486 @@ def _get_available_templates(templates_dir: Path) -> list[str]:
     Raises:
         makefiles.exceptions.NoTemplatesAvailableError: If the directory does
             not exist, is not a directory, or contains no files.
+        makefiles.exceptions.EntryLimitExceededError: If there are more than
+            *max_entries* templates.
     """
-    try:
-        available_templates: list[str] = dirwalker.listf(templates_dir)
-        if not available_templates:
+    return list(
+        _iter_available_templates(
+            templates_dir,
+            fallback_dirs=fallback_dirs,
+            jobs=jobs,
+            max_depth=max_depth,
+            max_entries=max_entries,
+            follow_links=follow_links,
+        )
+    )
+
+
+def _format_long_entry(name: str, file_meta: template_index.FileMeta | None) -> str:
+    """
+    Formats a template as a line of the long listing.
+
+    Args:
+        name (str): Template name.
+        file_meta (template_index.FileMeta | None): Recorded metadata, or
+            `None` if the template could not be read.
+
+    Returns:
+        str: Size, mtime, line count (`-` for binary templates), `text` or
+        `binary` and the name, in aligned columns. Unknown values are `?`.
+    """
+    if file_meta is None:
+        return f"{'?':>10}  {'?':<16}  {'?':>8}  {'?':<6}  {name}"
+
+    mtime: str = time.strftime("%Y-%m-%d %H:%M", time.localtime(file_meta.mtime_ns // 1_000_000_000))
+    lines: str = "-" if file_meta.binary else str(file_meta.lines)
+    kind: str = "binary" if file_meta.binary else "text"
+    return f"{file_meta.size:>10}  {mtime:<16}  {lines:>8}  {kind:<6}  {name}"
+
+
+def _list_templates(
+    templates_dir: Path,
+    *,
+    fallback_dirs: tuple[Path, ...] = (),
+    jobs: custom_types.NaturalNumber = custom_types.NaturalNumber(1),
+    max_depth: custom_types.NaturalNumber | None = None,
+    max_entries: custom_types.NaturalNumber | None = None,
+    follow_links: bool = False,
+    long: bool = False,
+    tree: bool = False,
+    offset: int = 0,
+    limit: custom_types.NaturalNumber | None = None,
+) -> custom_types.ExitCode:
+    """
+    Streams the available templates to stdout, one per line, in natural order.
+
+    Templates are written in chunks of `_LIST_BATCH_SIZE` lines instead of
+    being joined into one string, so the first lines appear immediately and
+    no copy of the whole listing is built.
+
+    When there are more than *max_entries* templates, the first
+    *max_entries* in natural order are listed and the listing is marked as
+    truncated on stderr.
+
+    The tree format draws the templates as a directory tree with the number
+    of templates below every directory; see :mod:`makefiles.utils.template_tree`.
+
+    *offset* and *limit* select a page of the listing. Pages are cut from
+    the cached natural order of the catalog, so a page deep into a large
+    listing costs no more than the first one.
+
+    The long format adds the size in bytes, the mtime, the line count and
+    whether the template is text or binary, all taken from the metadata
+    recorded in the template index; see :func:`_format_long_entry`.
+
+    Args:
+        templates_dir (pathlib.Path): Directory that holds template files.
+        fallback_dirs (tuple[pathlib.Path, ...]): Further template
+            directories, highest precedence first.
+        jobs (custom_types.NaturalNumber): Number of directories revalidated
+            in parallel.
+        max_depth (custom_types.NaturalNumber | None): Maximum number of path
+            components of a template name; deeper directories are not read.
+        max_entries (custom_types.NaturalNumber | None): Maximum number of
+            templates listed. Discovery stops as soon as it is exceeded.
+        follow_links (bool): Descend into symbolic links to directories.
+        long (bool): Use the long format.
+        tree (bool): Use the tree format.
+        offset (int): Number of templates skipped at the start of the listing.
+        limit (custom_types.NaturalNumber | None): Maximum number of
+            templates listed.
+
+    Returns:
+        custom_types.ExitCode: `0` for a complete listing, `1` for a
+        truncated one.
+
+    Raises:
+        makefiles.exceptions.NoTemplatesAvailableError: If no templates exist.
+    """
+    with _get_catalog(
+        templates_dir,
+        fallback_dirs=fallback_dirs,
+        jobs=jobs,
+        max_depth=max_depth,
+        max_entries=max_entries,
+        follow_links=follow_links,
+        metadata=long,
+    ) as catalog:
+        if not catalog:
+            raise exceptions.NoTemplatesAvailableError("no templates found")
+
+        templates: Iterator[str] = catalog.iter_natural(offset=offset, limit=limit)
+        if long:
+            templates = itertools.starmap(_format_long_entry, catalog.iter_metadata(offset=offset, limit=limit))
+        elif tree:
+            templates = template_tree.iter_tree(catalog.names)
+
+        while batch := list(itertools.islice(templates, _LIST_BATCH_SIZE)):
+            cli_io.print("\n".join(batch) + "\n")
+
+        if catalog.truncated:
+            cli_io.eprint(f"listing truncated: {_get_entry_limit_message(max_entries)}\n")
+            return custom_types.ExitCode(1)
+
+        return custom_types.ExitCode(0)
+
+
+def _search_templates(
+    query: str,
+    templates_dir: Path,
+    *,
+    fallback_dirs: tuple[Path, ...] = (),
+    jobs: custom_types.NaturalNumber = custom_types.NaturalNumber(1),
+    max_depth: custom_types.NaturalNumber | None = None,
+    max_entries: custom_types.NaturalNumber | None = None,
+    follow_links: bool = False,
+) -> custom_types.ExitCode:
+    """
+    Prints the templates whose contents match *query*, best match first.
+
+    The contents come from the full-text index of
+    :mod:`makefiles.utils.search_index`, which is first brought up to date
+    with the templates of the search path. Only templates that changed
+    since the previous search are read, and templates of packs and
+    archives are read from the pack or archive.
+
+    Args:
+        query (str): Words that must all occur in a template.
+        templates_dir (pathlib.Path): Directory that holds template files.
+        fallback_dirs (tuple[pathlib.Path, ...]): Further template
+            directories, highest precedence first.
+        jobs (custom_types.NaturalNumber): Number of directories revalidated
+            and templates read in parallel.
+        max_depth (custom_types.NaturalNumber | None): Maximum number of path
+            components of a template name; deeper directories are not read.
+        max_entries (custom_types.NaturalNumber | None): Maximum number of
+            templates searched. Discovery stops as soon as it is exceeded.
+        follow_links (bool): Descend into symbolic links to directories.
+
+    Returns:
+        custom_types.ExitCode: `0` if a template matched, `1` if none did or
+        the search was truncated.
+
+    Raises:
+        makefiles.exceptions.NoTemplatesAvailableError: If no templates exist.
+        makefiles.exceptions.SearchIndexError: If the search index cannot be
+            used.
+    """
+    with _get_catalog(
+        templates_dir,
+        fallback_dirs=fallback_dirs,
+        jobs=jobs,
+        max_depth=max_depth,
+        max_entries=max_entries,
+        follow_links=follow_links,
+    ) as catalog:
+        if not len(catalog):
+            raise exceptions.NoTemplatesAvailableError("no templates found")
+
+        with search_index.SearchIndex() as index:
+            index.sync(
+                catalog.roots,
+                catalog.iter_sources(),
+                jobs=jobs,
+                bundles=catalog.get_bundle_files(),
+                read_contents=catalog.read_contents,
+            )
+            matches: list[str] = index.search(query, catalog.roots)
+
+        if matches:
+            cli_io.print("\n".join(matches) + "\n")
+
+        if catalog.truncated:
+            cli_io.eprint(f"search truncated: {_get_entry_limit_message(max_entries)}\n")
+            return custom_types.ExitCode(1)
+
+        return custom_types.ExitCode(0 if matches else 1)
+
+
+def _grep_templates(
+    pattern: str,
+    templates_dir: Path,
+    *,
+    fallback_dirs: tuple[Path, ...] = (),
+    jobs: custom_types.NaturalNumber = custom_types.NaturalNumber(1),
+    max_depth: custom_types.NaturalNumber | None = None,
+    max_entries: custom_types.NaturalNumber | None = None,
+    follow_links: bool = False,
+) -> custom_types.ExitCode:
+    """
+    Prints the lines of templates that match *pattern*, as `template:line:text`.
+
+    Templates are searched in sorted order by :mod:`makefiles.utils.template_grep`,
+    *jobs* at a time, and the matches of each template are printed as soon
+    as it is searched. Templates of packs and archives are searched in
+    memory. Binary templates are skipped.
+
+    Args:
+        pattern (str): Regular expression in Python `re` syntax.
+        templates_dir (pathlib.Path): Directory that holds template files.
+        fallback_dirs (tuple[pathlib.Path, ...]): Further template
+            directories, highest precedence first.
+        jobs (custom_types.NaturalNumber): Number of directories revalidated
+            and templates searched in parallel.
+        max_depth (custom_types.NaturalNumber | None): Maximum number of path
+            components of a template name; deeper directories are not read.
+        max_entries (custom_types.NaturalNumber | None): Maximum number of
+            templates searched. Discovery stops as soon as it is exceeded.
+        follow_links (bool): Descend into symbolic links to directories.
+
+    Returns:
+        custom_types.ExitCode: `0` if a line matched, `1` if none did or the
+        search was truncated.
+
+    Raises:
+        makefiles.exceptions.NoTemplatesAvailableError: If no templates exist.
+    """
+    with _get_catalog(
+        templates_dir,
+        fallback_dirs=fallback_dirs,
+        jobs=jobs,
+        max_depth=max_depth,
+        max_entries=max_entries,
+        follow_links=follow_links,
+    ) as catalog:
+        if not len(catalog):
             raise exceptions.NoTemplatesAvailableError("no templates found")
+
+        compiled: re.Pattern[bytes] = template_grep.compile_pattern(pattern)
+        bundled: set[Path] = {root for root in catalog.roots if catalog.is_bundled(root)}
+        sources: Iterator[str | Callable[[], bytes | memoryview | None]] = (
+            functools.partial(catalog.read_contents, name) if root in bundled else os.path.join(root, name)
+            for name, root in catalog.iter_sources()
+        )
+
+        matched: bool = False
+        for name, matches in zip(catalog, template_grep.grep(sources, compiled, jobs=jobs)):
+            if matches:
+                matched = True
+                cli_io.print(
+                    "".join(f"{name}:{match.number}:{match.line.decode('utf-8', 'replace')}\n" for match in matches)
+                )
+
+        if catalog.truncated:
+            cli_io.eprint(f"search truncated: {_get_entry_limit_message(max_entries)}\n")
+            return custom_types.ExitCode(1)
+
+        return custom_types.ExitCode(0 if matched else 1)
+
+
+def _pack_templates(
+    templates_dir: Path,
+    *,
+    jobs: custom_types.NaturalNumber = custom_types.NaturalNumber(1),
+    max_depth: custom_types.NaturalNumber | None = None,
+    max_entries: custom_types.NaturalNumber | None = None,
+    follow_links: bool = False,
+) -> None:
+    """
+    Stores the templates of *templates_dir* in its template pack.
+
+    Fallback template directories are not packed; pack them by running
+    with `XDG_TEMPLATES_DIR` pointing at them.
+
+    Args:
+        templates_dir (pathlib.Path): Directory that holds template files.
+        jobs (custom_types.NaturalNumber): Number of directories revalidated
+            and templates read in parallel.
+        max_depth (custom_types.NaturalNumber | None): Maximum number of path
+            components of a packed template.
+        max_entries (custom_types.NaturalNumber | None): Maximum number of
+            templates. Nothing is packed when there are more.
+        follow_links (bool): Descend into symbolic links to directories.
+
+    Raises:
+        makefiles.exceptions.NoTemplatesAvailableError: If the template
+            directory does not exist.
+        makefiles.exceptions.EntryLimitExceededError: If there are more than
+            *max_entries* templates.
+        makefiles.exceptions.TemplatePackError: If the pack cannot be written.
+    """
+    try:
+        count: int = template_pack.write_pack(
+            templates_dir, jobs=jobs, max_depth=max_depth, max_entries=max_entries, follow_links=follow_links
+        )
     except exceptions.InvalidPathError:
         raise exceptions.NoTemplatesAvailableError("could not find template directory") from None
+    except exceptions.EntryLimitExceededError:
+        raise exceptions.EntryLimitExceededError(_get_entry_limit_message(max_entries)) from None
 
-    return available_templates
+    cli_io.print(f"packed {count} templates into '{template_pack.get_pack_path(templates_dir)}'\n")
+
+
+def _watch_index(templates_dir: Path, *, jobs: custom_types.NaturalNumber = custom_types.NaturalNumber(1)) -> None:
+    """
+    Keeps the template index of *templates_dir* current until interrupted.
+
+    While the watcher runs, `--list` and the pickers read the cached index
+    of *templates_dir* without revalidating it. Fallback template
+    directories are not watched and keep being revalidated as usual.
+
+    Args:
+        templates_dir (pathlib.Path): Directory that holds template files.
+        jobs (custom_types.NaturalNumber): Number of directories scanned in
+            parallel during the initial scan.
+
+    Raises:
+        makefiles.exceptions.NoTemplatesAvailableError: If the template
+            directory does not exist.
+        makefiles.exceptions.IndexWatchError: If inotify is unavailable or
+            the directory is already being watched.
+    """
+    cli_io.eprint(f"watching templates in '{templates_dir}', press Ctrl+C to stop\n")
+
+    try:
+        index_watcher.watch(templates_dir, jobs=jobs)
+    except exceptions.InvalidPathError:
+        raise exceptions.NoTemplatesAvailableError("could not find template directory") from None
+
+
+def _resolve_partial_template(
+    catalog: template_catalog.TemplateCatalog, template: str, *, verbose: bool = False
+) -> str | None:
+    """
+    Resolves a partial template name, e.g. `pyscr` for `python/pyscript.py`.
+
+    Args:
+        catalog (template_catalog.TemplateCatalog): Templates to search.
+        template (str): Partial template name.
+        verbose (bool): Report the template the name resolved to when *True*.
+
+    Returns:
+        str | None: Name of the only template that matches best, or `None`
+        if no template matches.
+
+    Raises:
+        makefiles.exceptions.AmbiguousTemplateError: If several templates
+            match equally well; the message lists the best candidates.
+    """
+    matches: list[str] = catalog.find(template)
+    if not matches:
+        return None
+
+    if len(matches) > 1:
+        raise exceptions.AmbiguousTemplateError(f"template {template} is ambiguous, candidates: {', '.join(matches)}")
+
+    _logger.info("resolved partial template name %s to %s", template, matches[0])
+    if verbose:
+        cli_io.eprint(f"using template {matches[0]}\n")
+
+    return matches[0]
+
+
+def _copy_template(
+    template: str,
+    template_path: Path,
+    destinations: tuple[Path, ...],
+    *,
+    contents: bytes | memoryview | None = None,
+    open_contents: Callable[[], contextlib.AbstractContextManager[IO[bytes]]] | None = None,
+    templates_dir: Path | None = None,
+    overwrite: bool,
+    parents: bool,
+    verbose: bool,
+    dry_run: bool,
+    jobs: custom_types.NaturalNumber = custom_types.NaturalNumber(1),
+    link: Literal["hard"] | Literal["reflink"] | Literal["auto"] | None = None,
+) -> custom_types.ExitCode:
+    """
+    Copies a template to each destination path.
+
+    With `MKFILE_MIRROR_TTL` set, templates of *templates_dir* are copied
+    from their local mirror, see :mod:`makefiles.utils.template_mirror`.
+
+    Args:
+        template (str): Template name, used in error messages.
+        template_path (pathlib.Path): Path of the template.
+        destinations (tuple[pathlib.Path, ...]): Target paths for the copy.
+        contents (bytes | memoryview | None): Contents of the template when it
+            is served from a template pack; *template_path* is not read then.
+        open_contents (Callable[[], contextlib.AbstractContextManager[IO[bytes]]] | None):
+            Opens the contents of the template when it is served from a
+            template archive, so they are streamed to the destinations;
+            *template_path* is not read then.
+        templates_dir (pathlib.Path | None): The user's templates directory,
+            whose templates may be mirrored locally.
+        overwrite (bool): Replace existing destinations when *True*.
+        parents (bool): Create missing parent directories when *True*.
+        verbose (bool): Print a confirmation for each successful copy.
+        dry_run (bool): Preview only; make no filesystem changes.
+        jobs (custom_types.NaturalNumber): Number of destinations written in
+            parallel.
+        link (Literal["hard", "reflink", "auto"] | None): Link destinations to
+            the template, or to its first copy, instead of copying it.
+
+    Returns:
+        custom_types.ExitCode: `0` on success / preview, `1` on any skip.
+
+    Raises:
+        makefiles.exceptions.TemplateNotFoundError: If the template file
+            disappeared.
+        makefiles.exceptions.TemplateArchiveError: If the template cannot be
+            extracted from its archive.
+    """
+    _logger.debug(
+        "_copy_template: template=%s destinations=%s in_memory=%s streamed=%s dry_run=%s",
+        template_path,
+        destinations,
+        contents is not None,
+        open_contents is not None,
+        dry_run,
+    )
+
+    if open_contents is not None:
+        return fileutils.copy_stream(
+            open_contents,
+            destinations,
+            source=str(template_path),
+            overwrite=overwrite,
+            parents=parents,
+            verbose=verbose,
+            dry_run=dry_run,
+            jobs=jobs,
+            link=link,
+        )
+
+    if contents is not None:
+        return fileutils.copy_data(
+            contents,
+            destinations,
+            source=str(template_path),
+            overwrite=overwrite,
+            parents=parents,
+            verbose=verbose,
+            dry_run=dry_run,
+            jobs=jobs,
+            link=link,
+        )
+
+    source_path: Path = template_path
+    ttl: float | None = None if templates_dir is None else template_mirror.get_ttl()
+    if templates_dir is not None and ttl is not None and not dry_run:
+        try:
+            name: str = str(template_path.absolute().relative_to(templates_dir.absolute()))
+        except ValueError:
+            pass  # provided by a fallback directory
+        else:
+            source_path = template_mirror.fetch(templates_dir, name, ttl=ttl) or template_path
+
+    try:
+        return fileutils.copy_file(
+            source_path,
+            destinations,
+            source=str(template_path),
+            overwrite=overwrite,
+            parents=parents,
+            verbose=verbose,
+            dry_run=dry_run,
+            jobs=jobs,
+            link=link,
+        )
+    except exceptions.SourceNotFoundError:
+        raise exceptions.TemplateNotFoundError(f"template {template} not found") from None
 
 
 def _create_template(
@@ -73,10 +710,26 @@ def _create_template(
     parents: bool,
     verbose: bool,
     dry_run: bool,
+    fallback_dirs: tuple[Path, ...] = (),
+    jobs: custom_types.NaturalNumber = custom_types.NaturalNumber(1),
+    max_depth: custom_types.NaturalNumber | None = None,
+    max_entries: custom_types.NaturalNumber | None = None,
+    follow_links: bool = False,
+    link: Literal["hard"] | Literal["reflink"] | Literal["auto"] | None = None,
 ) -> custom_types.ExitCode:
     """
     Copies a named template to each destination path.
 
+    A file *template* of *templates_dir* is copied directly, without
+    building a catalog. Any other name is resolved with a single lookup in
+    the merged catalog of the search path, so the first fallback directory
+    that provides it wins, and a name that matches no template exactly is
+    looked up as a partial name, see :func:`_resolve_partial_template`.
+    Templates of a packed directory or of a template archive are always
+    looked up in the catalog and copied out of the pack or archive. With
+    `MKFILE_MIRROR_TTL` set, a template mirrored within the TTL is copied
+    from its mirror without touching *templates_dir* at all.
+
     Args:
         template (str): Template filename relative to *templates_dir*.
         destinations (tuple[pathlib.Path, ...]): Target paths for the copy.
@@ -85,35 +738,197 @@ def _create_template(
         parents (bool): Create missing parent directories when *True*.
         verbose (bool): Print a confirmation for each successful copy.
         dry_run (bool): Preview only; make no filesystem changes.
+        fallback_dirs (tuple[pathlib.Path, ...]): Further template
+            directories, highest precedence first.
+        jobs (custom_types.NaturalNumber): Number of directories revalidated
+            in parallel while building the catalog, and of destinations
+            written in parallel.
+        max_depth (custom_types.NaturalNumber | None): Maximum number of path
+            components of a template name in the catalog.
+        max_entries (custom_types.NaturalNumber | None): Maximum number of
+            templates in the catalog.
+        follow_links (bool): Descend into symbolic links to directories.
+        link (Literal["hard", "reflink", "auto"] | None): Link destinations to
+            the template, or to its first copy, instead of copying it.
 
     Returns:
         custom_types.ExitCode: `0` on success / preview, `1` on any skip.
 
     Raises:
         makefiles.exceptions.TemplateNotFoundError: If *template* does not
-            exist inside *templates_dir*.
+            exist in the template search path.
+        makefiles.exceptions.AmbiguousTemplateError: If *template* is a
+            partial name that matches several templates equally well.
+        makefiles.exceptions.EntryLimitExceededError: If *template* is not in
+            the catalog and the catalog was truncated by *max_entries*.
+    """
+    direct_path: Path = templates_dir.joinpath(template)
+    ttl: float | None = template_mirror.get_ttl()
+    if ttl is not None and not dry_run and template_mirror.lookup(templates_dir, template, ttl=ttl) is not None:
+        return _copy_template(
+            template,
+            direct_path,
+            destinations,
+            templates_dir=templates_dir,
+            overwrite=overwrite,
+            parents=parents,
+            verbose=verbose,
+            dry_run=dry_run,
+            jobs=jobs,
+            link=link,
+        )
+
+    is_direct: bool = utils.isfile(direct_path) or utils.islinkf(direct_path)
+    template_path: Path | None = direct_path
+    contents: bytes | memoryview | None = None
+    open_contents: Callable[[], contextlib.AbstractContextManager[IO[bytes]]] | None = None
+    with contextlib.ExitStack() as stack:
+        # A template of the templates directory itself shadows the fallback directories and needs no catalog
+        if not is_direct or template_pack.get_pack_path(templates_dir).exists():
+            try:
+                catalog: template_catalog.TemplateCatalog = _get_catalog(
+                    templates_dir,
+                    fallback_dirs=fallback_dirs,
+                    jobs=jobs,
+                    max_depth=max_depth,
+                    max_entries=max_entries,
+                    follow_links=follow_links,
+                )
+            except exceptions.NoTemplatesAvailableError:
+                template_path = None
+            else:
+                stack.enter_context(catalog)
+                name: str | None = template if template in catalog else None
+                if name is None and not is_direct:
+                    if catalog.truncated:
+                        raise exceptions.EntryLimitExceededError(_get_entry_limit_message(max_entries))
+                    name = _resolve_partial_template(catalog, template, verbose=verbose)
+
+                # A file the pack leaves out, such as a hidden template, is still copied from the directory
+                if name is not None or not is_direct:
+                    template_path = None if name is None else catalog.resolve(name)
+                    open_contents = None if name is None else catalog.get_opener(name)
+                    if name is not None and open_contents is None:
+                        contents = catalog.read_contents(name)
+
+        if template_path is None:
+            raise exceptions.TemplateNotFoundError(f"template {template} not found")
+
+        return _copy_template(
+            template,
+            template_path,
+            destinations,
+            contents=contents,
+            open_contents=open_contents,
+            templates_dir=templates_dir,
+            overwrite=overwrite,
+            parents=parents,
+            verbose=verbose,
+            dry_run=dry_run,
+            jobs=jobs,
+            link=link,
+        )
+
+
+def _create_auto_templates(
+    destinations: tuple[Path, ...],
+    templates_dir: Path,
+    overwrite: bool,
+    parents: bool,
+    verbose: bool,
+    dry_run: bool,
+    fallback_dirs: tuple[Path, ...] = (),
+    jobs: custom_types.NaturalNumber = custom_types.NaturalNumber(1),
+    max_depth: custom_types.NaturalNumber | None = None,
+    max_entries: custom_types.NaturalNumber | None = None,
+    follow_links: bool = False,
+    link: Literal["hard"] | Literal["reflink"] | Literal["auto"] | None = None,
+) -> custom_types.ExitCode:
+    """
+    Copies to each destination the template that fits its file name.
+
+    Templates are chosen with
+    :meth:`~makefiles.utils.template_catalog.TemplateCatalog.match_filename`,
+    without prompting. Destinations that share a template are copied
+    together. Destinations that no template fits are reported and skipped.
+
+    Args:
+        destinations (tuple[pathlib.Path, ...]): Target paths.
+        templates_dir (pathlib.Path): Root directory of available templates.
+        overwrite (bool): Replace existing destinations when *True*.
+        parents (bool): Create missing parent directories when *True*.
+        verbose (bool): Print a confirmation for each successful copy.
+        dry_run (bool): Preview only; make no filesystem changes.
+        fallback_dirs (tuple[pathlib.Path, ...]): Further template
+            directories, highest precedence first.
+        jobs (custom_types.NaturalNumber): Number of directories revalidated
+            in parallel while building the catalog, and of destinations
+            written in parallel.
+        max_depth (custom_types.NaturalNumber | None): Maximum number of path
+            components of a template name in the catalog.
+        max_entries (custom_types.NaturalNumber | None): Maximum number of
+            templates in the catalog.
+        follow_links (bool): Descend into symbolic links to directories.
+        link (Literal["hard", "reflink", "auto"] | None): Link destinations to
+            the template, or to its first copy, instead of copying it.
+
+    Returns:
+        custom_types.ExitCode: `0` on success / preview, `1` on any skip.
+
+    Raises:
+        makefiles.exceptions.NoTemplatesAvailableError: If none of the
+            template directories exists.
+        makefiles.exceptions.TemplateNotFoundError: If a chosen template
+            disappeared before it was copied.
     """
     exitcode: custom_types.ExitCode = custom_types.ExitCode(0)
 
-    template_path: Path = templates_dir.joinpath(template)
-    _logger.debug("_create_template: template=%s destinations=%s dry_run=%s", template_path, destinations, dry_run)
+    with _get_catalog(
+        templates_dir,
+        fallback_dirs=fallback_dirs,
+        jobs=jobs,
+        max_depth=max_depth,
+        max_entries=max_entries,
+        follow_links=follow_links,
+    ) as catalog:
+        groups: dict[str, list[Path]] = {}
+        for destination in destinations:
+            template: str | None = catalog.match_filename(destination.name)
+            if template is None:
+                cli_io.eprint(f"no template matches {destination}\n")
+                exitcode = custom_types.ExitCode(1)
+                continue
 
-    try:
-        exitcode = (
-            fileutils.copy_file(
-                template_path,
-                destinations,
-                overwrite=overwrite,
-                parents=parents,
-                verbose=verbose,
-                dry_run=dry_run,
+            groups.setdefault(template, []).append(destination)
+
+        for template, paths in groups.items():
+            template_path: Path | None = catalog.resolve(template)
+            if template_path is None:
+                raise exceptions.TemplateNotFoundError(f"template {template} not found")
+
+            # Archive templates are streamed, pack templates are already in memory
+            open_contents: Callable[[], contextlib.AbstractContextManager[IO[bytes]]] | None = catalog.get_opener(
+                template
+            )
+            exitcode = (
+                _copy_template(
+                    template,
+                    template_path,
+                    tuple(paths),
+                    contents=None if open_contents is not None else catalog.read_contents(template),
+                    open_contents=open_contents,
+                    templates_dir=templates_dir,
+                    overwrite=overwrite,
+                    parents=parents,
+                    verbose=verbose,
+                    dry_run=dry_run,
+                    jobs=jobs,
+                    link=link,
+                )
+                or exitcode
             )
-            or exitcode
-        )
-    except exceptions.SourceNotFoundError:
-        raise exceptions.TemplateNotFoundError(f"template {template} not found") from None
 
-    return exitcode
+        return exitcode
 
 
 def _get_template_from_prompt(
@@ -121,6 +936,11 @@ def _get_template_from_prompt(
     t_picker: Literal["fzf"] | Literal["manual"],
     fzf_height: custom_types.NaturalNumber = custom_types.NaturalNumber(10),
     templates_dir: Path,
+    fallback_dirs: tuple[Path, ...] = (),
+    jobs: custom_types.NaturalNumber = custom_types.NaturalNumber(1),
+    max_depth: custom_types.NaturalNumber | None = None,
+    max_entries: custom_types.NaturalNumber | None = None,
+    follow_links: bool = False,
 ) -> str:
     """
     Interactively prompts the user to choose a template.
@@ -130,16 +950,34 @@ def _get_template_from_prompt(
         fzf_height (custom_types.NaturalNumber): Terminal height for the fzf
             window (only used when *t_picker* is `fzf`).
         templates_dir (pathlib.Path): Directory scanned for available templates.
+        fallback_dirs (tuple[pathlib.Path, ...]): Further template
+            directories, highest precedence first.
+        jobs (custom_types.NaturalNumber): Number of directories revalidated
+            in parallel.
+        max_depth (custom_types.NaturalNumber | None): Maximum number of path
+            components of a template name; deeper directories are not read.
+        max_entries (custom_types.NaturalNumber | None): Maximum number of
+            templates offered.
+        follow_links (bool): Descend into symbolic links to directories.
 
     Returns:
         str: The template name chosen by the user.
 
     Raises:
         makefiles.exceptions.NoTemplatesAvailableError: If no templates exist.
+        makefiles.exceptions.EntryLimitExceededError: If there are more than
+            *max_entries* templates.
         makefiles.exceptions.FZFNotFoundError: If `fzf` is selected but
             the binary is not in `PATH`.
     """
-    available_templates: list[str] = _get_available_templates(templates_dir)
+    available_templates: list[str] = _get_available_templates(
+        templates_dir,
+        fallback_dirs=fallback_dirs,
+        jobs=jobs,
+        max_depth=max_depth,
+        max_entries=max_entries,
+        follow_links=follow_links,
+    )
 
     if t_picker == "fzf":
         return picker.fzf(available_templates, height=fzf_height)
@@ -149,7 +987,11 @@ def _get_template_from_prompt(
     assert_never(t_picker)  # for linter
 
 
-def runner(cli_arguments: argparse.Namespace, templates_dir: Path) -> custom_types.ExitCode:
+def runner(
+    cli_arguments: argparse.Namespace,
+    templates_dir: Path,
+    fallback_dirs: tuple[Path, ...] = (),
+) -> custom_types.ExitCode:
     """
     Core program logic: dispatches to file-creation or template-copy
     operations based on the parsed CLI arguments.
@@ -158,16 +1000,20 @@ def runner(cli_arguments: argparse.Namespace, templates_dir: Path) -> custom_typ
         cli_arguments (argparse.Namespace): Validated namespace from
             :func:`~makefiles.cli_parser.get_cli_args`.
         templates_dir (pathlib.Path): Directory that holds template files.
+        fallback_dirs (tuple[pathlib.Path, ...]): Further template
+            directories searched after *templates_dir*, highest precedence first.
 
     Returns:
         custom_types.ExitCode: `0` on success, `1` when any destination
-        was skipped.
+        was skipped, the listing was truncated or a search found nothing.
 
     Raises:
-        makefiles.exceptions.NoTemplatesAvailableError: If `--list` is used
-            and no templates exist.
+        makefiles.exceptions.NoTemplatesAvailableError: If `--list`,
+            `--search` or `--grep` is used and no templates exist.
         makefiles.exceptions.TemplateNotFoundError: If the requested template
             does not exist.
+        makefiles.exceptions.EntryLimitExceededError: If the picker would
+            have to offer more than `--max-entries` templates.
         makefiles.exceptions.MKFileException: For other application errors.
     """
     exitcode: custom_types.ExitCode = custom_types.ExitCode(0)
@@ -176,9 +1022,14 @@ def runner(cli_arguments: argparse.Namespace, templates_dir: Path) -> custom_typ
     template: str | object | None = cli_arguments.template
     t_picker: Literal["fzf"] | Literal["manual"] = cli_arguments.picker[0]
     fzf_height: custom_types.NaturalNumber = cli_arguments.height[0]
+    jobs: custom_types.NaturalNumber = cli_arguments.jobs[0]
+    max_depth: custom_types.NaturalNumber | None = cli_arguments.max_depth[0]
+    max_entries: custom_types.NaturalNumber | None = cli_arguments.max_entries[0]
+    follow_links: bool = cli_arguments.follow_links
     verbose: bool = cli_arguments.verbose
     dry_run: bool = cli_arguments.dry_run
     force: bool = cli_arguments.force
+    link: Literal["hard"] | Literal["reflink"] | Literal["auto"] | None = cli_arguments.link[0]
 
     if cli_arguments.version:
         cli_io.print(f"{utils.get_version()}\n")
@@ -186,21 +1037,96 @@ def runner(cli_arguments: argparse.Namespace, templates_dir: Path) -> custom_typ
         return exitcode
 
     if cli_arguments.list:
-        cli_io.print("\n".join(_get_available_templates(templates_dir)) + "\n")
+        exitcode = (
+            _list_templates(
+                templates_dir,
+                fallback_dirs=fallback_dirs,
+                jobs=jobs,
+                max_depth=max_depth,
+                max_entries=max_entries,
+                follow_links=follow_links,
+                long=cli_arguments.long,
+                tree=cli_arguments.tree,
+                offset=cli_arguments.offset[0],
+                limit=cli_arguments.limit[0],
+            )
+            or exitcode
+        )
+        return exitcode
+
+    if cli_arguments.search[0] is not None:
+        exitcode = (
+            _search_templates(
+                cli_arguments.search[0],
+                templates_dir,
+                fallback_dirs=fallback_dirs,
+                jobs=jobs,
+                max_depth=max_depth,
+                max_entries=max_entries,
+                follow_links=follow_links,
+            )
+            or exitcode
+        )
+        return exitcode
+
+    if cli_arguments.grep[0] is not None:
+        exitcode = (
+            _grep_templates(
+                cli_arguments.grep[0],
+                templates_dir,
+                fallback_dirs=fallback_dirs,
+                jobs=jobs,
+                max_depth=max_depth,
+                max_entries=max_entries,
+                follow_links=follow_links,
+            )
+            or exitcode
+        )
+        return exitcode
+
+    if cli_arguments.pack_templates:
+        _pack_templates(
+            templates_dir, jobs=jobs, max_depth=max_depth, max_entries=max_entries, follow_links=follow_links
+        )
+        return exitcode
+
+    if cli_arguments.watch_index:
+        _watch_index(templates_dir, jobs=jobs)
         return exitcode
 
     files_paths: tuple[Path, ...] = tuple(map(Path, files))
 
     _logger.info(
-        "runner: files=%s template=%r verbose=%s dry_run=%s parents=%s force=%s",
+        "runner: files=%s template=%r auto=%s verbose=%s dry_run=%s parents=%s force=%s",
         files,
         template if isinstance(template, str) or template is None else "<sentinel>",
+        cli_arguments.auto,
         verbose,
         dry_run,
         cli_arguments.parents,
         force,
     )
 
+    if cli_arguments.auto:
+        exitcode = (
+            _create_auto_templates(
+                files_paths,
+                templates_dir=templates_dir,
+                overwrite=force,
+                parents=cli_arguments.parents,
+                verbose=verbose,
+                dry_run=dry_run,
+                fallback_dirs=fallback_dirs,
+                jobs=jobs,
+                max_depth=max_depth,
+                max_entries=max_entries,
+                follow_links=follow_links,
+                link=link,
+            )
+            or exitcode
+        )
+        return exitcode
+
     if not template:
         exitcode = (
             fileutils.create_empty_files(
@@ -219,6 +1145,11 @@ def runner(cli_arguments: argparse.Namespace, templates_dir: Path) -> custom_typ
             t_picker=t_picker,
             fzf_height=fzf_height,
             templates_dir=templates_dir,
+            fallback_dirs=fallback_dirs,
+            jobs=jobs,
+            max_depth=max_depth,
+            max_entries=max_entries,
+            follow_links=follow_links,
         )
 
     exitcode = (
@@ -230,6 +1161,12 @@ def runner(cli_arguments: argparse.Namespace, templates_dir: Path) -> custom_typ
             parents=cli_arguments.parents,
             verbose=verbose,
             dry_run=dry_run,
+            fallback_dirs=fallback_dirs,
+            jobs=jobs,
+            max_depth=max_depth,
+            max_entries=max_entries,
+            follow_links=follow_links,
+            link=link,
         )
         or exitcode
     )
@@ -264,7 +1201,7 @@ def main() -> custom_types.ExitCode:
 
     try:
         cli_arguments: argparse.Namespace = cli_parser.get_cli_args(argument_parser)
-        exitcode = runner(cli_arguments, templates_dir_path) or exitcode
+        exitcode = runner(cli_arguments, templates_dir_path, _get_fallback_templates_dirs()) or exitcode
 
     except exceptions.MKFileException as ex:
         cli_io.eprint(f"{argument_parser.prog}: {str(ex)}\n")
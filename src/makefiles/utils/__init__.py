@@ -1,3 +1,4 @@
+import os
 import pathlib
 
 
@@ -114,6 +115,56 @@ def get_version() -> str:
         return "unknown"
 
 
+def get_cache_dir() -> pathlib.Path:
+    """
+    Returns the application cache directory, honouring `XDG_CACHE_HOME`.
+
+    Follows the XDG Base Directory Specification:
+    `$XDG_CACHE_HOME/makefiles-cli/`.  Defaults to
+    `~/.cache/makefiles-cli/` when the variable is unset.
+
+    Returns:
+        pathlib.Path: Absolute cache-directory path (not guaranteed to exist yet).
+    """
+    xdg_cache_home: pathlib.Path = pathlib.Path(
+        os.environ.get("XDG_CACHE_HOME", str(pathlib.Path.home().joinpath(".cache")))
+    )
+    return xdg_cache_home.joinpath("makefiles-cli")
+
+
+def get_xdg_templates_dir() -> pathlib.Path:
+    """
+    Returns the user's templates directory, honouring `XDG_TEMPLATES_DIR`.
+
+    Defaults to `~/Templates` when the variable is unset.
+
+    Returns:
+        pathlib.Path: Templates directory path (not guaranteed to exist).
+    """
+    return pathlib.Path(os.environ.get("XDG_TEMPLATES_DIR", str(pathlib.Path.home().joinpath("Templates"))))
+
+
+def get_fallback_templates_dirs() -> tuple[pathlib.Path, ...]:
+    """
+    Returns the template directories searched after the user's templates directory.
+
+    These are the entries of `MKFILE_TEMPLATES_PATH` (a `:`-separated list,
+    e.g. team-shared template stores), followed by the system-wide
+    `makefiles-cli/templates` directory of every `XDG_DATA_DIRS` entry.
+
+    Returns:
+        tuple[pathlib.Path, ...]: Fallback template directories, highest
+        precedence first (not guaranteed to exist).
+    """
+    team_dirs: list[str] = os.environ.get("MKFILE_TEMPLATES_PATH", "").split(os.pathsep)
+    data_dirs: list[str] = (os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share").split(os.pathsep)
+
+    return (
+        *(pathlib.Path(directory) for directory in team_dirs if directory),
+        *(pathlib.Path(directory).joinpath("makefiles-cli", "templates") for directory in data_dirs if directory),
+    )
+
+
 def get_hinder(path: pathlib.Path) -> str | None:
     """
     Recursively identifies the nearest path component that would prevent file or directory creation.
@@ -1,37 +1,292 @@
 import os
 import pathlib
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TypeVar
 
 import makefiles.exceptions as exceptions
 import makefiles.utils as utils
+from makefiles.utils.ignore import IgnoreMatcher
 
+_T = TypeVar("_T")
 
-def listf(path: pathlib.Path) -> list[str]:
+
+def iterf(
+    path: pathlib.Path,
+    *,
+    jobs: int = 1,
+    ignore: IgnoreMatcher | None = None,
+    max_depth: int | None = None,
+    max_entries: int | None = None,
+    follow_links: bool = False,
+) -> Iterator[str]:
     """
-    Recursively lists all non-hidden files within a directory, relative to the given path.
+    Lazily yields all non-hidden files within a directory, relative to the given path.
+
+    The tree is walked with `os.scandir`. Relative paths are built incrementally
+    from a per-directory prefix and entry types come from the cached
+    `os.DirEntry` answers, so no extra `stat` or path normalisation is done
+    per entry. Like `os.walk` without `followlinks`, symbolic links to
+    directories inside the tree are not descended into unless *follow_links*
+    is set. Followed walks remember the `(st_dev, st_ino)` pair of every
+    directory they read, so link cycles end and a directory reachable
+    through several links is read once, under the first path the walk
+    reaches it by.
+
+    Entries are produced as they are discovered, so memory use does not grow
+    with the size of the tree. *path* is validated eagerly, before the first
+    entry is requested.
+
+    With *jobs* greater than 1, directories are read concurrently by a bounded
+    thread pool. This pays off on network filesystems, where every directory
+    read is a round trip. The set of entries is the same; only their order differs.
+
+    Entries matched by *ignore* are skipped; ignored directories are pruned
+    and never read.
+
+    Both budgets are enforced during the walk: directories deeper than
+    *max_depth* are never read, and the walk stops as soon as a file beyond
+    *max_entries* is found, so a huge tree costs no more than the budget.
 
     Args:
         path (pathlib.Path): Path to a directory or a symbolic link to a directory.
+        jobs (int): Maximum number of directories read at the same time.
+        ignore (IgnoreMatcher | None): Patterns of entries to leave out.
+        max_depth (int | None): Maximum number of path components of a
+            returned file (`1` lists only the files directly in *path*).
+        max_entries (int | None): Maximum number of files to return.
+        follow_links (bool): Descend into symbolic links to directories.
 
     Returns:
-        list[str]: A list of relative file paths (as strings) for all non-hidden files
-                   within the directory tree rooted at `path`.
+        Iterator[str]: Relative file paths (as strings) for all non-hidden files
+                       within the directory tree rooted at `path`.
 
     Raises:
         makefiles.exceptions.InvalidPathError: If the provided path is not a directory or a symlink to a directory.
+        makefiles.exceptions.EntryLimitExceededError: When more than
+            *max_entries* files are found, after the first *max_entries*
+            have been yielded.
     """
     path = path.absolute()
     if not (utils.isdir(path) or utils.islinkd(path)):
         raise exceptions.InvalidPathError("given path is not a directory or link to directory")
 
-    result: list[str] = []
+    return _walk(
+        str(path), jobs=jobs, ignore=ignore, max_depth=max_depth, max_entries=max_entries, follow_links=follow_links
+    )
+
+
+def listf(
+    path: pathlib.Path,
+    *,
+    jobs: int = 1,
+    ignore: IgnoreMatcher | None = None,
+    max_depth: int | None = None,
+    max_entries: int | None = None,
+    follow_links: bool = False,
+) -> list[str]:
+    """
+    Recursively lists all non-hidden files within a directory, relative to the given path.
+
+    Args:
+        path (pathlib.Path): Path to a directory or a symbolic link to a directory.
+        jobs (int): Maximum number of directories read at the same time.
+        ignore (IgnoreMatcher | None): Patterns of entries to leave out.
+        max_depth (int | None): Maximum number of path components of a
+            returned file (`1` lists only the files directly in *path*).
+        max_entries (int | None): Maximum number of files to return.
+        follow_links (bool): Descend into symbolic links to directories.
+
+    Returns:
+        list[str]: A list of relative file paths (as strings) for all non-hidden files
+                   within the directory tree rooted at `path`.
+
+    Raises:
+        makefiles.exceptions.InvalidPathError: If the provided path is not a directory or a symlink to a directory.
+        makefiles.exceptions.EntryLimitExceededError: If more than
+            *max_entries* files are found. The walk stops right there.
+    """
+    return list(
+        iterf(path, jobs=jobs, ignore=ignore, max_depth=max_depth, max_entries=max_entries, follow_links=follow_links)
+    )
+
+
+def scan(
+    path: str, *, prefix: str = "", ignore: IgnoreMatcher | None = None, follow_links: bool = False
+) -> tuple[list[str], list[str]]:
+    """
+    Lists the direct children of a single directory.
+
+    Hidden entries are skipped and symbolic links to directories are
+    reported neither as files nor as subdirectories, exactly as the
+    recursive walkers treat them, unless *follow_links* is set, in which
+    case they are reported as subdirectories. An unreadable directory is
+    treated as empty.
+
+    Args:
+        path (str): Path to the directory to read.
+        prefix (str): Path of the directory relative to the walk root, with a
+            trailing separator (empty for the root itself). Only used to
+            match entries against *ignore*.
+        ignore (IgnoreMatcher | None): Patterns of entries to leave out.
+        follow_links (bool): Report symbolic links to directories as
+            subdirectories.
+
+    Returns:
+        tuple[list[str], list[str]]: Names of the files and of the
+        subdirectories to descend into.
+    """
+    files: list[str] = []
+    subdirs: list[str] = []
+
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name: str = entry.name
+                if name.startswith("."):  # Exclude hidden files and directories
+                    continue
+
+                try:
+                    is_dir: bool = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if is_dir and not follow_links and entry.is_symlink():
+                    continue
+                if ignore is not None and ignore.ignores(prefix + name, is_dir=is_dir):
+                    continue
+
+                if is_dir:
+                    subdirs.append(name)
+                else:
+                    files.append(name)
+    except OSError:
+        # Unreadable directories are skipped, matching `os.walk`'s default behaviour
+        pass
+
+    return files, subdirs
+
+
+class DirectorySet:
+    """
+    Thread-safe set of directories, identified by `(st_dev, st_ino)`.
+
+    Symbolic links resolve to the directory they point to, so a directory
+    is only added once however many paths lead to it. Walks that follow
+    links use it to break link cycles and to read shared subtrees once.
+    """
+
+    def __init__(self) -> None:
+        self._seen: set[tuple[int, int]] = set()
+        self._lock: threading.Lock = threading.Lock()
+
+    def add(self, path: str, stat_result: os.stat_result | None = None) -> bool:
+        """
+        Adds the directory at *path*.
+
+        Args:
+            path (str): Path to the directory, possibly through symbolic links.
+            stat_result (os.stat_result | None): Result of `os.stat(path)`,
+                if the caller already has it.
+
+        Returns:
+            bool: *True* if the directory was not in the set yet. Paths that
+            cannot be `stat`-ed are never added.
+        """
+        if stat_result is None:
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                return False
+
+        key: tuple[int, int] = (stat_result.st_dev, stat_result.st_ino)
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+
+        return True
+
+
+def traverse(
+    visit: Callable[[str], tuple[_T, list[str]]], *, jobs: int = 1, max_depth: int | None = None
+) -> Iterator[tuple[str, _T]]:
+    """
+    Drives a directory-by-directory traversal, optionally across a thread pool.
+
+    *visit* is called with the path of a directory relative to the traversal
+    root (`""` for the root itself) and returns a payload together with the
+    names of the subdirectories to visit next. With *jobs* set to 1, all
+    visits happen in the calling thread; otherwise up to *jobs* visits run
+    concurrently and results are yielded as they complete.
+
+    Directories nested *max_depth* or more levels below the root are not
+    visited, so the files of every visited directory are at most *max_depth*
+    path components deep.
+
+    Args:
+        visit (Callable[[str], tuple[_T, list[str]]]): Per-directory callback.
+        jobs (int): Maximum number of concurrent visits.
+        max_depth (int | None): Depth limit, counted in path components of
+            the files below the root.
+
+    Returns:
+        Iterator[tuple[str, _T]]: `(relative directory, payload)` pairs.
+    """
+    if jobs <= 1:
+        stack: list[tuple[str, int]] = [("", 1)]
+        while stack:
+            reldir, depth = stack.pop()
+            payload, subdirs = visit(reldir)
+            yield reldir, payload
+            if max_depth is None or depth < max_depth:
+                stack.extend((os.path.join(reldir, name), depth + 1) for name in subdirs)
+        return
+
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        running: dict[Future[tuple[_T, list[str]]], tuple[str, int]] = {executor.submit(visit, ""): ("", 1)}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                reldir, depth = running.pop(future)
+                payload, subdirs = future.result()
+                yield reldir, payload
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                for name in subdirs:
+                    subdir: str = os.path.join(reldir, name)
+                    running[executor.submit(visit, subdir)] = (subdir, depth + 1)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _walk(
+    root: str,
+    *,
+    jobs: int = 1,
+    ignore: IgnoreMatcher | None = None,
+    max_depth: int | None = None,
+    max_entries: int | None = None,
+    follow_links: bool = False,
+) -> Iterator[str]:
+    seen: DirectorySet | None = DirectorySet() if follow_links else None
+
+    def visit(reldir: str) -> tuple[list[str], list[str]]:
+        dirpath: str = os.path.join(root, reldir)
+        if seen is not None and not seen.add(dirpath):
+            return [], []
 
-    for root, dirs, files in os.walk(path, topdown=True):
-        # Exclude hidden directories
-        dirs[:] = filter(lambda d: not d.startswith("."), dirs)
+        return scan(dirpath, prefix=reldir + os.sep if reldir else "", ignore=ignore, follow_links=follow_links)
 
-        for file in files:
-            if not file.startswith("."):
-                relative_path: str = os.path.relpath(os.path.join(root, file), path)
-                result.append(relative_path)
+    remaining: int | None = max_entries
 
-    return result
+    for reldir, files in traverse(visit, jobs=jobs, max_depth=max_depth):
+        prefix: str = reldir + os.sep if reldir else ""
+        for name in files:
+            if remaining is not None:
+                if remaining == 0:
+                    raise exceptions.EntryLimitExceededError(f"more than {max_entries} files found in {root}")
+                remaining -= 1
+            yield prefix + name
@@ -1,9 +1,12 @@
 from makefiles.utils.fileutils.copy_file import copy as copy_file
+from makefiles.utils.fileutils.copy_file import copy_data, copy_stream
 from makefiles.utils.fileutils.create_empty_files import create as create_empty_files
 from makefiles.utils.fileutils.remove_path import remove as remove_path
 
 __all__: list[str] = [
     "copy_file",
+    "copy_data",
+    "copy_stream",
     "remove_path",
     "create_empty_files",
 ]
@@ -0,0 +1,140 @@
+"""
+Whole-file copy backends, from cheapest to most expensive.
+
+:func:`copy` tries, in order:
+
+    reflink           `FICLONE` ioctl: the destination shares the source's
+                      blocks (btrfs, XFS, bcachefs...), so nothing is copied
+    copy_file_range   the kernel copies between the files, possibly
+                      offloaded to the filesystem or the server (NFS 4.2)
+    sendfile          the kernel copies through the page cache
+    userspace         `pread`/`write` through a Python buffer
+
+A backend that the filesystems at hand do not support fails before it
+writes anything and the next one is tried. So does a kernel backend that
+copies nothing at all, as `copy_file_range` does for procfs and some FUSE
+filesystems; a copy that stops part way is an error. The first backend that works
+for a pair of filesystems is remembered for the rest of the run, so later
+copies between them go straight to it.
+"""
+
+from __future__ import annotations
+
+import errno
+import fcntl
+import os
+from collections.abc import Callable
+from logging import Logger
+from typing import Final, NoReturn
+
+from makefiles.logger import get_logger
+
+_logger: Logger = get_logger(__name__)
+
+# Copies *size* bytes from the start of the first descriptor to the second, an empty file
+Backend = Callable[[int, int, int], None]
+
+_FICLONE: Final[int] = 0x40049409  # _IOW(0x94, 9, int) from <linux/fs.h>
+_CHUNK_SIZE: Final[int] = 64 * 1024 * 1024
+_USERSPACE_CHUNK_SIZE: Final[int] = 1024 * 1024
+
+# Errors that mean "not possible between these files", not "the copy failed"
+UNSUPPORTED: Final[frozenset[int]] = frozenset(
+    {
+        errno.EINVAL,
+        errno.ENOSYS,
+        errno.ENOTSUP,
+        errno.EOPNOTSUPP,
+        errno.EXDEV,
+    }
+)
+
+
+def reflink(src_fd: int, dest_fd: int, size: int) -> None:
+    """Makes *dest_fd* share the blocks of *src_fd*."""
+    fcntl.ioctl(dest_fd, _FICLONE, src_fd)
+
+
+def _check_short_copy(backend: str, offset: int, size: int) -> NoReturn:
+    """Raises for a kernel copy that ended after *offset* of *size* bytes."""
+    if offset == 0:
+        # Nothing was written, so the next backend can still make the copy
+        raise OSError(errno.EINVAL, f"{backend} copied nothing")
+
+    raise OSError(errno.EIO, f"{backend} stopped after {offset} of {size} bytes, the source may have shrunk")
+
+
+def copy_file_range(src_fd: int, dest_fd: int, size: int) -> None:
+    """Copies with `copy_file_range(2)`, entirely inside the kernel."""
+    if not hasattr(os, "copy_file_range"):
+        raise OSError(errno.ENOSYS, "copy_file_range is not available")
+
+    offset: int = 0
+    while offset < size:
+        copied: int = os.copy_file_range(src_fd, dest_fd, min(_CHUNK_SIZE, size - offset), offset)
+        if copied == 0:
+            _check_short_copy("copy_file_range", offset, size)
+        offset += copied
+
+
+def sendfile(src_fd: int, dest_fd: int, size: int) -> None:
+    """Copies with `sendfile(2)`, through the page cache."""
+    offset: int = 0
+    while offset < size:
+        sent: int = os.sendfile(dest_fd, src_fd, offset, min(_CHUNK_SIZE, size - offset))
+        if sent == 0:
+            _check_short_copy("sendfile", offset, size)
+        offset += sent
+
+
+def userspace(src_fd: int, dest_fd: int, size: int) -> None:
+    """Copies through a buffer; works between any two files."""
+    offset: int = 0
+    while chunk := os.pread(src_fd, _USERSPACE_CHUNK_SIZE, offset):
+        view: memoryview = memoryview(chunk)
+        while view:
+            view = view[os.write(dest_fd, view) :]
+        offset += len(chunk)
+
+
+BACKENDS: Final[tuple[Backend, ...]] = (reflink, copy_file_range, sendfile, userspace)
+
+# Index into BACKENDS of the first backend that worked, per (source device, destination device)
+_strategies: dict[tuple[int, int], int] = {}
+
+
+def copy(src_fd: int, dest_fd: int, size: int) -> Backend:
+    """
+    Copies a whole file with the cheapest backend that works.
+
+    Args:
+        src_fd (int): Descriptor of the source, open for reading.
+        dest_fd (int): Descriptor of the empty destination, open for writing.
+        size (int): Size of the source in bytes.
+
+    Returns:
+        Backend: The backend that made the copy.
+
+    Raises:
+        OSError: If the copy fails for another reason than an unsupported
+            backend, e.g. a full disk.
+    """
+    key: tuple[int, int] = (os.fstat(src_fd).st_dev, os.fstat(dest_fd).st_dev)
+
+    for number in range(_strategies.get(key, 0), len(BACKENDS)):
+        backend: Backend = BACKENDS[number]
+        try:
+            backend(src_fd, dest_fd, size)
+        except OSError as e:
+            # The last backend has no fallback, and one that already wrote part of the copy cannot be retried
+            if e.errno not in UNSUPPORTED or number == len(BACKENDS) - 1 or os.fstat(dest_fd).st_size:
+                raise
+            _logger.debug("copy backend %s unsupported for devices %s: %s", backend.__name__, key, e)
+            continue
+
+        if _strategies.get(key) != number:
+            _strategies[key] = number
+            _logger.debug("using copy backend %s for devices %s", backend.__name__, key)
+        return backend
+
+    raise AssertionError("unreachable: the userspace backend never reports itself unsupported")
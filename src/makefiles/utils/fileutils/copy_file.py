@@ -1,33 +1,232 @@
+import contextlib
+import errno
+import os
 import pathlib
 import shutil
+import stat
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from logging import Logger
+from typing import IO, BinaryIO, Final, Literal
 
 import makefiles.exceptions as exceptions
 import makefiles.utils as utils
 import makefiles.utils.cli_io as cli_io
 import makefiles.utils.fileutils as fileutils
+import makefiles.utils.fileutils.copy_backends as copy_backends
 from makefiles.logger import get_logger
 from makefiles.types import ExitCode, NaturalNumber
 
 _logger: Logger = get_logger(__name__)
 
+# Sources up to this size are read into memory once and written to every destination;
+# larger ones are copied by the cheapest backend of copy_backends
+_BUFFER_LIMIT: Final[int] = 1024 * 1024
+
+# Errors of os.link that mean "cannot link these files", e.g. across filesystems or past the link limit
+_LINK_UNSUPPORTED: Final[frozenset[int]] = copy_backends.UNSUPPORTED | {errno.EPERM, errno.EMLINK}
+
+# Permission bits of a source that can be written, which auto mode never hard-links
+_WRITE_BITS: Final[int] = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+
+# Message about one destination: whether it is an error, printed to stderr, and its text
+_Message = tuple[bool, str]
+
+
+class _SharedSource:
+    """
+    Source file opened once and copied to any number of destinations.
+
+    The file is opened on the first copy, so a run whose destinations are
+    all skipped never reads it. Small sources are read into a buffer and
+    written to every destination from memory. Larger ones are copied from
+    the one open descriptor by :func:`copy_backends.copy`, which clones or
+    copies them in the kernel where the filesystems allow, so their
+    contents do not pass through Python. Every backend reads at explicit
+    offsets, so several threads may copy from the one descriptor at once.
+
+    Arguments:
+        src (pathlib.Path): Source file.
+    """
+
+    def __init__(self, src: pathlib.Path) -> None:
+        self._src: pathlib.Path = src
+        self._file: BinaryIO | None = None
+        self._size: int = 0
+        self._data: bytes | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def _open(self) -> BinaryIO:
+        file: BinaryIO = open(self._src, "rb")
+        self._size = os.fstat(file.fileno()).st_size
+        if self._size <= _BUFFER_LIMIT:
+            self._data = file.read()
+        return file
+
+    def copy_to(self, dest: pathlib.Path) -> None:
+        """
+        Writes the source to *dest*, replacing its contents.
+
+        Args:
+            dest (pathlib.Path): Destination file.
+        """
+        with self._lock:
+            if self._file is None:
+                self._file = self._open()
+
+        with open(dest, "wb") as out:
+            if self._data is not None:
+                out.write(self._data)
+            else:
+                copy_backends.copy(self._file.fileno(), out.fileno(), self._size)
+
+    def close(self) -> None:
+        """Releases the buffer and closes the source."""
+        self._data = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# Links a destination to a target, returning False where the filesystem cannot link them
+_Link = Callable[[pathlib.Path, pathlib.Path], bool]
+
+
+def _hard_link(target: pathlib.Path, dest: pathlib.Path) -> bool:
+    try:
+        os.link(target, dest)
+    except OSError as e:
+        if e.errno not in _LINK_UNSUPPORTED:
+            raise
+        return False
+
+    return True
+
+
+def _reflink(target: pathlib.Path, dest: pathlib.Path) -> bool:
+    try:
+        with open(target, "rb") as target_file, open(dest, "wb") as dest_file:
+            copy_backends.reflink(target_file.fileno(), dest_file.fileno(), 0)
+    except OSError as e:
+        dest.unlink(missing_ok=True)
+        if e.errno not in copy_backends.UNSUPPORTED:
+            raise
+        return False
+
+    return True
+
+
+class _Linker:
+    """
+    Materialises destinations as links instead of copies.
+
+    Every filesystem, told apart by `st_dev`, has one link target: the
+    source on its own filesystem, elsewhere the first destination that was
+    copied. A destination is linked to the target of its filesystem, and
+    only copied when that fails. A way of linking that failed for a target
+    is not tried with it again, so a filesystem that cannot clone costs a
+    failed attempt per target, not one per destination. When the source
+    itself cannot be linked, e.g. past its hard link limit, the first copy
+    becomes the target of its filesystem instead.
+
+    Arguments:
+        copy_to (Callable[[pathlib.Path], None]): Copies the source to a
+            destination.
+        src (pathlib.Path | None): Source file, or `None` for contents that
+            only exist in memory.
+        mode (Literal["hard", "reflink", "auto"]): `hard` makes hard links,
+            which share the inode; `reflink` makes clones, separate files
+            that share data blocks until one of them is written; `auto`
+            clones where it can and otherwise hard-links a read-only source,
+            whose links cannot be edited either. Copies are never hard-linked
+            in `auto` mode, as they are writable.
+    """
+
+    def __init__(
+        self,
+        copy_to: Callable[[pathlib.Path], None],
+        src: pathlib.Path | None,
+        mode: Literal["hard"] | Literal["reflink"] | Literal["auto"],
+    ) -> None:
+        self._copy_to: Callable[[pathlib.Path], None] = copy_to
+        self._src: pathlib.Path | None = src
+        # Ways of linking to a copy; the source may also be hard-linked in auto mode
+        self._copy_links: tuple[_Link, ...] = {
+            "hard": (_hard_link,),
+            "reflink": (_reflink,),
+            "auto": (_reflink,),
+        }[mode]
+        # Link target of every filesystem, with the ways of linking to it that have not failed yet
+        self._targets: dict[int, tuple[pathlib.Path, list[_Link]]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+        if src is not None:
+            src_stat: os.stat_result = os.stat(src)
+            src_links: list[_Link] = list(self._copy_links)
+            if mode == "auto" and not src_stat.st_mode & _WRITE_BITS:
+                src_links.append(_hard_link)
+            self._targets[src_stat.st_dev] = (src, src_links)
+
+    def link_to(self, dest: pathlib.Path) -> None:
+        """
+        Materialises the source at *dest*, which must not exist.
+
+        Args:
+            dest (pathlib.Path): Destination file.
+        """
+        device: int = os.stat(dest.parent).st_dev
+        with self._lock:
+            # Without a target on this filesystem there is no way of linking either
+            target, links = self._targets.get(device, (dest, []))
+            untried: list[_Link] = list(links)
+
+        for link in untried:
+            if link(target, dest):
+                _logger.debug("%s linked %s -> %s", link.__name__, target, dest)
+                return
+
+            _logger.debug("%s cannot link to %s, not trying it again", link.__name__, target)
+            with self._lock:
+                if link in links:
+                    links.remove(link)
+
+        self._copy_to(dest)
+        with self._lock:
+            current: tuple[pathlib.Path, list[_Link]] | None = self._targets.get(device)
+            if current is None or (current[0] == self._src and not current[1]):
+                self._targets[device] = (dest, list(self._copy_links))
+
 
 def copy(
     src: pathlib.Path,
     dests: tuple[pathlib.Path, ...] = (),
     *,
+    source: str | None = None,
     overwrite: bool = False,
     parents: bool = False,
     verbose: bool = False,
     dry_run: bool = False,
+    jobs: int = 1,
+    link: Literal["hard"] | Literal["reflink"] | Literal["auto"] | None = None,
 ) -> ExitCode:
     """
     Copies a source file or symbolic link to one or more destination paths.
 
+    The source is opened and read once, however many destinations there
+    are; see :class:`_SharedSource`. With *jobs* greater than 1 the
+    destinations are checked and written by a thread pool, which hides the
+    round trips of a network filesystem; messages are still printed in the
+    order of *dests* and the exit code is the same as for a serial copy.
+    With *link*, destinations share storage with the source instead; see
+    :class:`_Linker`.
+
     Args:
         src (pathlib.Path): Source file.  Must be a regular file or a symlink
             to a regular file.
         dests (tuple[pathlib.Path, ...]): One or more destination paths.
+        source (str | None): Name of the file *src* stands in for, e.g. the
+            original of a cached copy, shown in messages instead of *src*.
         overwrite (bool): When *True*, an existing destination is replaced.
             When *False* (default), a warning is printed and that destination
             is skipped.
@@ -39,6 +238,9 @@ def copy(
             *dry_run* is also *True*).
         dry_run (bool): When *True*, perform all pre-flight checks but make
             **no** changes to the filesystem.  Implies *verbose*.
+        jobs (int): Maximum number of destinations written at the same time.
+        link (Literal["hard", "reflink", "auto"] | None): Link destinations
+            to the source, or to its first copy, instead of copying them.
 
     Returns:
         ExitCode: `0` when all copies succeed (or are previewed), `1`
@@ -52,8 +254,6 @@ def copy(
         makefiles.exceptions.InvalidPathError: If a parent directory cannot
             be created (e.g. a file sits in the path).
     """
-    exitcode: ExitCode = ExitCode(0)
-
     if not dests:
         raise ValueError(f"at least 1 destination expected. Got {len(dests)}")
 
@@ -62,33 +262,202 @@ def copy(
     elif not (utils.isfile(src) or utils.islinkf(src)):
         raise exceptions.InvalidSourceError(f"source {str(src)} is not a file or a link to file")
 
-    for dest in dests:
-        if utils.exists(dest) and not overwrite:
-            cli_io.eprint(f"destination {str(dest)} already exists\n")
-            exitcode = ExitCode(1)
-            continue
-
-        dest_parent: pathlib.Path = dest.parent
-        if not (utils.isdir(dest_parent) or utils.islinkd(dest_parent)) and not parents:
-            cli_io.eprint(f"parent dir {str(dest_parent)} does not exists\n")
-            exitcode = ExitCode(1)
-            continue
-
-        if dry_run:
-            cli_io.print(f"[dry-run] would copy '{src}' -> '{dest}'\n")
-            _logger.debug("dry-run: would copy %s -> %s", src, dest)
-            continue
-
-        fileutils.remove_path(dest)
-        try:
-            dest_parent.mkdir(parents=True, exist_ok=True)
-        except OSError as e:
-            raise exceptions.InvalidPathError(f"cannot create parent dir: {e}") from None
-
-        shutil.copyfile(src, dest, follow_symlinks=True)
-        _logger.debug("copied %s -> %s", src, dest)
-
-        if verbose:
-            cli_io.print(f"copied '{src}' -> '{dest}'\n")
+    shared: _SharedSource = _SharedSource(src)
+    copy_to: Callable[[pathlib.Path], None] = (
+        shared.copy_to if link is None else _Linker(shared.copy_to, src, link).link_to
+    )
+    try:
+        return _copy_to_destinations(
+            str(src) if source is None else source,
+            copy_to,
+            dests,
+            overwrite=overwrite,
+            parents=parents,
+            verbose=verbose,
+            dry_run=dry_run,
+            jobs=jobs,
+        )
+    finally:
+        shared.close()
+
+
+def copy_data(
+    data: bytes | memoryview,
+    dests: tuple[pathlib.Path, ...] = (),
+    *,
+    source: str,
+    overwrite: bool = False,
+    parents: bool = False,
+    verbose: bool = False,
+    dry_run: bool = False,
+    jobs: int = 1,
+    link: Literal["hard"] | Literal["reflink"] | Literal["auto"] | None = None,
+) -> ExitCode:
+    """
+    Writes in-memory file contents to one or more destination paths.
+
+    Destinations are checked and reported exactly as by :func:`copy`. With
+    *link*, the contents are written once per filesystem and the other
+    destinations are linked to that copy.
+
+    Args:
+        data (bytes | memoryview): Contents to write.
+        dests (tuple[pathlib.Path, ...]): One or more destination paths.
+        source (str): Where *data* comes from, shown in messages.
+        overwrite (bool): Replace existing destinations when *True*.
+        parents (bool): Create missing parent directories when *True*.
+        verbose (bool): Print a confirmation line for every write.
+        dry_run (bool): Perform the checks but make no changes.
+        jobs (int): Maximum number of destinations written at the same time.
+        link (Literal["hard", "reflink", "auto"] | None): Link destinations
+            to the first written copy instead of writing each one.
+
+    Returns:
+        ExitCode: `0` when all writes succeed (or are previewed), `1`
+        when any destination is skipped.
+
+    Raises:
+        ValueError: If *dests* is empty.
+        makefiles.exceptions.InvalidPathError: If a parent directory cannot
+            be created (e.g. a file sits in the path).
+    """
+    if not dests:
+        raise ValueError(f"at least 1 destination expected. Got {len(dests)}")
+
+    def write_to(dest: pathlib.Path) -> None:
+        with open(dest, "wb") as file:
+            file.write(data)
+
+    copy_to: Callable[[pathlib.Path], None] = write_to if link is None else _Linker(write_to, None, link).link_to
+    return _copy_to_destinations(
+        source, copy_to, dests, overwrite=overwrite, parents=parents, verbose=verbose, dry_run=dry_run, jobs=jobs
+    )
+
+
+def copy_stream(
+    open_source: Callable[[], contextlib.AbstractContextManager[IO[bytes]]],
+    dests: tuple[pathlib.Path, ...] = (),
+    *,
+    source: str,
+    overwrite: bool = False,
+    parents: bool = False,
+    verbose: bool = False,
+    dry_run: bool = False,
+    jobs: int = 1,
+    link: Literal["hard"] | Literal["reflink"] | Literal["auto"] | None = None,
+) -> ExitCode:
+    """
+    Streams file contents to one or more destination paths.
+
+    Every destination reads its own stream from *open_source* and writes
+    it in chunks of up to 1 MiB, so the contents are never held in memory
+    as a whole. Destinations are checked and reported exactly as by
+    :func:`copy`. With *link*, the contents are streamed once per
+    filesystem and the other destinations are linked to that copy.
+
+    Args:
+        open_source (Callable[[], contextlib.AbstractContextManager[IO[bytes]]]):
+            Opens the contents for reading, e.g. a member of an archive.
+        dests (tuple[pathlib.Path, ...]): One or more destination paths.
+        source (str): Where the contents come from, shown in messages.
+        overwrite (bool): Replace existing destinations when *True*.
+        parents (bool): Create missing parent directories when *True*.
+        verbose (bool): Print a confirmation line for every write.
+        dry_run (bool): Perform the checks but make no changes.
+        jobs (int): Maximum number of destinations written at the same time.
+        link (Literal["hard", "reflink", "auto"] | None): Link destinations
+            to the first written copy instead of writing each one.
+
+    Returns:
+        ExitCode: `0` when all writes succeed (or are previewed), `1`
+        when any destination is skipped.
+
+    Raises:
+        ValueError: If *dests* is empty.
+        makefiles.exceptions.InvalidPathError: If a parent directory cannot
+            be created (e.g. a file sits in the path).
+    """
+    if not dests:
+        raise ValueError(f"at least 1 destination expected. Got {len(dests)}")
+
+    def write_to(dest: pathlib.Path) -> None:
+        with open_source() as src_file, open(dest, "wb") as file:
+            shutil.copyfileobj(src_file, file, _BUFFER_LIMIT)
+
+    copy_to: Callable[[pathlib.Path], None] = write_to if link is None else _Linker(write_to, None, link).link_to
+    return _copy_to_destinations(
+        source, copy_to, dests, overwrite=overwrite, parents=parents, verbose=verbose, dry_run=dry_run, jobs=jobs
+    )
+
+
+def _copy_to_destination(
+    src: str,
+    copy_to: Callable[[pathlib.Path], None],
+    dest: pathlib.Path,
+    *,
+    overwrite: bool,
+    parents: bool,
+    verbose: bool,
+    dry_run: bool,
+) -> _Message | None:
+    if utils.exists(dest) and not overwrite:
+        return (True, f"destination {str(dest)} already exists\n")
+
+    dest_parent: pathlib.Path = dest.parent
+    if not (utils.isdir(dest_parent) or utils.islinkd(dest_parent)) and not parents:
+        return (True, f"parent dir {str(dest_parent)} does not exists\n")
+
+    if dry_run:
+        _logger.debug("dry-run: would copy %s -> %s", src, dest)
+        return (False, f"[dry-run] would copy '{src}' -> '{dest}'\n")
+
+    fileutils.remove_path(dest)
+    try:
+        dest_parent.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        raise exceptions.InvalidPathError(f"cannot create parent dir: {e}") from None
+
+    copy_to(dest)
+    _logger.debug("copied %s -> %s", src, dest)
+
+    return (False, f"copied '{src}' -> '{dest}'\n") if verbose else None
+
+
+def _copy_to_destinations(
+    src: str,
+    copy_to: Callable[[pathlib.Path], None],
+    dests: tuple[pathlib.Path, ...],
+    *,
+    overwrite: bool,
+    parents: bool,
+    verbose: bool,
+    dry_run: bool,
+    jobs: int = 1,
+) -> ExitCode:
+    exitcode: ExitCode = ExitCode(0)
+
+    def run(dest: pathlib.Path) -> _Message | None:
+        return _copy_to_destination(
+            src, copy_to, dest, overwrite=overwrite, parents=parents, verbose=verbose, dry_run=dry_run
+        )
+
+    def report(messages: Iterator[_Message | None]) -> None:
+        nonlocal exitcode
+        for message in messages:
+            if message is None:
+                continue
+            error, text = message
+            if error:
+                cli_io.eprint(text)
+                exitcode = ExitCode(1)
+            else:
+                cli_io.print(text)
+
+    # A destination given twice must see its first copy, as it would in order
+    if jobs <= 1 or len(dests) == 1 or len(set(dests)) != len(dests):
+        report(map(run, dests))
+    else:
+        with ThreadPoolExecutor(max_workers=min(jobs, len(dests))) as executor:
+            report(executor.map(run, dests))
 
     return exitcode
@@ -0,0 +1,175 @@
+"""
+gitignore-style `.mkfileignore` support for template directories.
+
+A `.mkfileignore` file at the root of a template directory lists patterns,
+one per line, using the gitignore syntax:
+
+    # a trailing slash only matches directories
+    node_modules/
+    # a leading or inner slash anchors the pattern to the root
+    /build
+    # otherwise the pattern matches at any depth
+    *.pyc
+    # `**` matches across directories
+    docs/**/draft-*
+    # a leading `!` re-includes what an earlier pattern ignored
+    !keep.pyc
+
+All patterns are compiled once into a single regular expression per entry
+kind, so testing an entry is one `fullmatch` call regardless of how many
+patterns there are. As with git, the last matching pattern decides, and
+nothing inside an ignored directory can be re-included because ignored
+directories are never read.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import Final
+
+IGNORE_FILENAME: Final[str] = ".mkfileignore"
+
+
+def read_ignore_file(root: str | os.PathLike[str]) -> str:
+    """
+    Returns the contents of the `.mkfileignore` file of *root*.
+
+    Args:
+        root (str | os.PathLike[str]): Template directory.
+
+    Returns:
+        str: The file contents, or an empty string if there is no readable
+        ignore file.
+    """
+    try:
+        with open(os.path.join(root, IGNORE_FILENAME), encoding="utf-8", errors="surrogateescape") as file:
+            return file.read()
+    except OSError:
+        return ""
+
+
+def _translate_glob(glob: str) -> str:
+    """Translates the body of one gitignore pattern into a regular expression."""
+    parts: list[str] = []
+    index: int = 0
+    length: int = len(glob)
+
+    while index < length:
+        char: str = glob[index]
+
+        if glob.startswith("**/", index) and (index == 0 or glob[index - 1] == "/"):
+            parts.append("(?:.*/)?")
+            index += 3
+        elif glob.startswith("**", index) and index + 2 == length and (index == 0 or glob[index - 1] == "/"):
+            parts.append(".*")
+            index += 2
+        elif char == "*":
+            parts.append("[^/]*")
+            index += 1
+        elif char == "?":
+            parts.append("[^/]")
+            index += 1
+        elif char == "[":
+            end: int = glob.find("]", index + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+                index += 1
+                continue
+
+            body: str = glob[index + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            index = end + 1
+        elif char == "\\" and index + 1 < length:
+            parts.append(re.escape(glob[index + 1]))
+            index += 2
+        else:
+            parts.append(re.escape(char))
+            index += 1
+
+    return "".join(parts)
+
+
+class IgnoreMatcher:
+    """
+    Compiled set of gitignore-style patterns.
+
+    Arguments:
+        text (str): Contents of an ignore file.
+
+    Examples:
+        >>> matcher = IgnoreMatcher("node_modules/\\n*.pyc\\n!keep.pyc\\n")
+        >>> matcher.ignores("web/node_modules", is_dir=True)
+        True
+
+        >>> matcher.ignores("keep.pyc", is_dir=False)
+        False
+    """
+
+    def __init__(self, text: str) -> None:
+        file_alternatives: list[str] = []
+        dir_alternatives: list[str] = []
+
+        for number, line in enumerate(text.splitlines()):
+            if line.endswith(" ") and not line.endswith("\\ "):
+                line = line.rstrip(" ")
+            if not line or line.startswith("#"):
+                continue
+
+            negated: bool = line.startswith("!")
+            if negated:
+                line = line[1:]
+            elif line.startswith(("\\!", "\\#")):
+                line = line[1:]
+
+            dir_only: bool = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+
+            anchored: bool = "/" in line
+            body: str = _translate_glob(line.lstrip("/"))
+            regex: str = body if anchored else f"(?:.*/)?{body}"
+            try:
+                re.compile(regex)
+            except re.error:
+                continue  # e.g. a reversed character range; git ignores such patterns too
+
+            alternative: str = f"(?P<{'n' if negated else 'p'}{number}>{regex})"
+
+            dir_alternatives.append(alternative)
+            if not dir_only:
+                file_alternatives.append(alternative)
+
+        # Alternatives are tried left to right, so listing them in reverse
+        # makes the first successful alternative the last matching pattern.
+        self._file_regex: re.Pattern[str] | None = (
+            re.compile("|".join(reversed(file_alternatives)), re.DOTALL) if file_alternatives else None
+        )
+        self._dir_regex: re.Pattern[str] | None = (
+            re.compile("|".join(reversed(dir_alternatives)), re.DOTALL) if dir_alternatives else None
+        )
+
+    def __bool__(self) -> bool:
+        return self._dir_regex is not None
+
+    def ignores(self, path: str, *, is_dir: bool) -> bool:
+        """
+        Tells whether *path* is ignored.
+
+        Args:
+            path (str): Entry path relative to the template directory, using
+                `/` as separator.
+            is_dir (bool): Whether the entry is a directory.
+
+        Returns:
+            bool: *True* if the last pattern matching *path* is not negated.
+        """
+        regex: re.Pattern[str] | None = self._dir_regex if is_dir else self._file_regex
+        if regex is None:
+            return False
+
+        match: re.Match[str] | None = regex.fullmatch(path)
+        return match is not None and match.lastgroup is not None and match.lastgroup[0] == "p"
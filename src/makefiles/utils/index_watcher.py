@@ -0,0 +1,290 @@
+"""
+Keeps the cached template index of a directory current using inotify.
+
+While :func:`watch` runs, create, delete and rename events from every
+directory of the template tree are applied to the index as they arrive and
+the index file is rewritten after each burst of events. The watcher holds an
+exclusive lock on the index's `.watch` file and marks it ready once the
+initial scan is done; :func:`makefiles.utils.template_index.get_index` then
+serves the cached index directly instead of revalidating it.
+
+Records touched by the watcher are stored with an untrusted mtime, so once
+the watcher stops the next regular refresh rescans exactly those directories.
+Rewriting the root's `.mkfileignore` triggers a full resync.
+
+The watcher also keeps the per-template metadata of the index complete:
+it is collected for every template after a sync, and recollected whenever
+a template is created, moved in or rewritten.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import pathlib
+import threading
+import time
+from logging import Logger
+from typing import Final
+
+import makefiles.exceptions as exceptions
+import makefiles.utils.dirwalker as dirwalker
+import makefiles.utils.ignore as ignore
+import makefiles.utils.inotify as inotify
+import makefiles.utils.template_index as template_index
+from makefiles.logger import get_logger
+
+_logger: Logger = get_logger(__name__)
+
+_WATCH_MASK: Final[int] = (
+    inotify.IN_CREATE
+    | inotify.IN_DELETE
+    | inotify.IN_MOVED_FROM
+    | inotify.IN_MOVED_TO
+    | inotify.IN_DELETE_SELF
+    | inotify.IN_MOVE_SELF
+    | inotify.IN_CLOSE_WRITE  # the root's ignore file, or a template rewritten in place
+    | inotify.IN_ONLYDIR
+    | inotify.IN_DONT_FOLLOW
+)
+
+_POLL_INTERVAL: Final[float] = 0.5  # seconds between checks of the stop event
+_SETTLE_INTERVAL: Final[float] = 0.05  # quiet period that ends a burst of events
+_MAX_BURST: Final[float] = 1.0  # upper bound on how long a burst may delay a save
+
+
+def _classify(path: str) -> str | None:
+    """
+    Classifies a directory entry the same way :func:`dirwalker.scan` does.
+
+    Returns:
+        str | None: `"file"`, `"dir"` (a real directory to descend into) or
+        `None` when the entry vanished or is a symlink to a directory.
+    """
+    if not os.path.lexists(path):
+        return None
+
+    if not os.path.isdir(path):
+        return "file"
+
+    return None if os.path.islink(path) else "dir"
+
+
+class _Watcher:
+    def __init__(self, root: pathlib.Path, notifier: inotify.Inotify, *, jobs: int) -> None:
+        self.root: pathlib.Path = root.absolute()
+        self.notifier: inotify.Inotify = notifier
+        self.jobs: int = jobs
+        self.index: template_index.TemplateIndex = template_index.TemplateIndex.load(self.root)
+        self.reldir_by_wd: dict[int, str] = {}
+        self.wd_by_reldir: dict[str, int] = {}
+
+    def _add_watch(self, reldir: str) -> int | None:
+        try:
+            return self.notifier.add_watch(os.path.join(self.root, reldir), _WATCH_MASK)
+        except OSError as e:
+            _logger.warning("cannot watch %s: %s", os.path.join(self.root, reldir), e)
+            return None
+
+    def _register(self, reldir: str, wd: int | None) -> None:
+        if wd is None:
+            return
+        self.reldir_by_wd[wd] = reldir
+        self.wd_by_reldir[reldir] = wd
+
+    def sync(self) -> None:
+        """Refreshes the index until every indexed directory is watched."""
+        attempted: set[str] = set(self.wd_by_reldir)
+
+        while True:
+            self.index.refresh(jobs=self.jobs)
+            unwatched: list[str] = [reldir for reldir in self.index.dirs if reldir not in attempted]
+            if not unwatched:
+                break
+
+            # Changes made before a watch was in place are caught by the next refresh
+            for reldir in unwatched:
+                attempted.add(reldir)
+                self._register(reldir, self._add_watch(reldir))
+
+        for reldir in [reldir for reldir in self.wd_by_reldir if reldir not in self.index.dirs]:
+            self._unregister(reldir)
+
+        self.index.update_metadata(jobs=self.jobs)
+
+    def _unregister(self, reldir: str) -> None:
+        wd: int | None = self.wd_by_reldir.pop(reldir, None)
+        if wd is not None:
+            self.reldir_by_wd.pop(wd, None)
+            self.notifier.rm_watch(wd)
+
+    def _add_subtree(self, reldir: str) -> None:
+        def visit(subdir: str) -> tuple[tuple[int | None, list[str], list[str]], list[str]]:
+            current: str = os.path.join(reldir, subdir) if subdir else reldir
+            wd: int | None = self._add_watch(current)  # watch first, then list, so no entry is missed
+            files, subdirs = dirwalker.scan(
+                os.path.join(self.root, current), prefix=current + os.sep, ignore=self.index.ignore
+            )
+            return (wd, files, subdirs), subdirs
+
+        for subdir, (wd, files, subdirs) in dirwalker.traverse(visit, jobs=self.jobs):
+            current: str = os.path.join(reldir, subdir) if subdir else reldir
+            self._register(current, wd)
+            self.index.dirs[current] = (template_index.UNTRUSTED_MTIME, files, subdirs)
+            for name in files:
+                self._update_metadata(os.path.join(current, name))
+
+    def _drop_subtree(self, reldir: str) -> None:
+        prefix: str = reldir + os.sep
+        for known in [known for known in self.index.dirs if known == reldir or known.startswith(prefix)]:
+            del self.index.dirs[known]
+            self._unregister(known)
+        for name in [name for name in self.index.meta if name.startswith(prefix)]:
+            del self.index.meta[name]
+
+    def apply(self, events: list[inotify.Event]) -> bool:
+        """
+        Applies a batch of events to the index.
+
+        Returns:
+            bool: *True* when the index changed and should be saved.
+
+        Raises:
+            makefiles.exceptions.IndexWatchError: If the template directory
+                itself was deleted or moved away.
+        """
+        changed: bool = False
+
+        for event in events:
+            if event.mask & inotify.IN_Q_OVERFLOW:
+                _logger.warning("inotify queue overflowed, rescanning %s", self.root)
+                self.sync()
+                changed = True
+                continue
+
+            reldir: str | None = self.reldir_by_wd.get(event.wd)
+            if reldir is None:
+                continue
+
+            if event.mask & inotify.IN_IGNORED:
+                self.reldir_by_wd.pop(event.wd, None)
+                if self.wd_by_reldir.get(reldir) == event.wd:
+                    del self.wd_by_reldir[reldir]
+                continue
+
+            if event.mask & (inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF):
+                if not reldir:
+                    raise exceptions.IndexWatchError(f"template directory {self.root} was removed or moved")
+                continue
+
+            name: str = event.name
+            if not reldir and name == ignore.IGNORE_FILENAME:
+                self.sync()  # the index discards all records when the ignore file changed
+                changed = True
+                continue
+
+            record: template_index.DirRecord | None = self.index.dirs.get(reldir)
+            if not name or name.startswith(".") or record is None:
+                continue
+
+            _, files, subdirs = record
+            child: str = os.path.join(reldir, name)
+
+            if event.mask & inotify.IN_CLOSE_WRITE:
+                if name in files:
+                    self._update_metadata(child)
+                    changed = True
+                continue
+
+            if event.mask & (inotify.IN_DELETE | inotify.IN_MOVED_FROM):
+                if name in subdirs:
+                    subdirs.remove(name)
+                    self._drop_subtree(child)
+                elif name in files:
+                    files.remove(name)
+                    self.index.meta.pop(child, None)
+
+            if event.mask & (inotify.IN_CREATE | inotify.IN_MOVED_TO):
+                kind: str | None = _classify(os.path.join(self.root, child))
+                if kind is not None and self.index.ignore is not None:
+                    if self.index.ignore.ignores(child, is_dir=kind == "dir"):
+                        kind = None
+
+                if kind == "file":
+                    if name not in files:
+                        files.append(name)
+                    self._update_metadata(child)
+                elif kind == "dir" and name not in subdirs:
+                    subdirs.append(name)
+                    self._add_subtree(child)
+
+            self.index.dirs[reldir] = (template_index.UNTRUSTED_MTIME, files, subdirs)
+            changed = True
+
+        return changed
+
+    def _update_metadata(self, name: str) -> None:
+        file_meta: template_index.FileMeta | None = template_index.read_metadata(os.path.join(self.root, name))
+        if file_meta is None:
+            self.index.meta.pop(name, None)
+        else:
+            self.index.meta[name] = file_meta
+
+    def read_burst(self) -> list[inotify.Event]:
+        """Waits for events and keeps reading until the burst settles."""
+        events: list[inotify.Event] = self.notifier.read_events(_POLL_INTERVAL)
+        deadline: float = time.monotonic() + _MAX_BURST
+
+        while events and time.monotonic() < deadline:
+            more: list[inotify.Event] = self.notifier.read_events(_SETTLE_INTERVAL)
+            if not more:
+                break
+            events.extend(more)
+
+        return events
+
+
+def watch(root: pathlib.Path, *, jobs: int = 1, stop: threading.Event | None = None) -> None:
+    """
+    Watches *root* and keeps its cached template index current until stopped.
+
+    Args:
+        root (pathlib.Path): Template directory to watch.
+        jobs (int): Maximum number of directories scanned at the same time
+            during the initial scan and after a queue overflow.
+        stop (threading.Event | None): Ends the watch when set. Without it the
+            watch runs until interrupted.
+
+    Raises:
+        makefiles.exceptions.InvalidPathError: If *root* is not a directory
+            or a symlink to a directory.
+        makefiles.exceptions.IndexWatchError: If inotify is unavailable,
+            another watcher already runs for *root*, or *root* goes away.
+    """
+    lock_path: pathlib.Path = template_index.get_watch_lock_path(root)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(lock_path, "ab") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise exceptions.IndexWatchError(f"templates in {root} are already being watched") from None
+
+        lock_file.truncate(0)  # a crashed watcher may have left its ready mark behind
+
+        try:
+            with inotify.Inotify() as notifier:
+                watcher: _Watcher = _Watcher(root, notifier, jobs=jobs)
+                watcher.sync()
+                watcher.index.save()
+
+                lock_file.write(template_index.WATCH_READY_MARK)
+                lock_file.flush()
+                _logger.info("watching %s (%d directories)", watcher.root, len(watcher.wd_by_reldir))
+
+                while stop is None or not stop.is_set():
+                    events: list[inotify.Event] = watcher.read_burst()
+                    if events and watcher.apply(events):
+                        watcher.index.save()
+        finally:
+            lock_file.truncate(0)
@@ -0,0 +1,160 @@
+"""
+Minimal ctypes binding to the Linux inotify API.
+
+Only the pieces needed to watch template directories are exposed: creating
+an instance, adding and removing watches, and reading batches of events.
+See inotify(7) for the meaning of the individual event masks.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+from types import TracebackType
+from typing import Final, NamedTuple
+
+import makefiles.exceptions as exceptions
+
+IN_MODIFY: Final[int] = 0x00000002
+IN_ATTRIB: Final[int] = 0x00000004
+IN_CLOSE_WRITE: Final[int] = 0x00000008
+IN_MOVED_FROM: Final[int] = 0x00000040
+IN_MOVED_TO: Final[int] = 0x00000080
+IN_CREATE: Final[int] = 0x00000100
+IN_DELETE: Final[int] = 0x00000200
+IN_DELETE_SELF: Final[int] = 0x00000400
+IN_MOVE_SELF: Final[int] = 0x00000800
+IN_Q_OVERFLOW: Final[int] = 0x00004000
+IN_IGNORED: Final[int] = 0x00008000
+IN_ONLYDIR: Final[int] = 0x01000000
+IN_DONT_FOLLOW: Final[int] = 0x02000000
+IN_ISDIR: Final[int] = 0x40000000
+
+_IN_CLOEXEC: Final[int] = os.O_CLOEXEC
+_IN_NONBLOCK: Final[int] = os.O_NONBLOCK
+
+_EVENT_HEADER: Final[struct.Struct] = struct.Struct("iIII")  # wd, mask, cookie, len
+_READ_SIZE: Final[int] = 64 * 1024
+
+
+class Event(NamedTuple):
+    """A single inotify event."""
+
+    wd: int
+    mask: int
+    cookie: int
+    name: str
+
+
+def _load_libc() -> ctypes.CDLL:
+    try:
+        libc: ctypes.CDLL = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1.argtypes = (ctypes.c_int,)
+        libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        libc.inotify_rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+    except (OSError, AttributeError):
+        raise exceptions.IndexWatchError("inotify is not available on this platform") from None
+
+    return libc
+
+
+class Inotify:
+    """
+    An inotify instance.
+
+    The underlying file descriptor is non-blocking and close-on-exec. Use the
+    instance as a context manager to make sure it is closed.
+
+    Raises:
+        makefiles.exceptions.IndexWatchError: If inotify is unavailable or
+            the instance cannot be created.
+    """
+
+    def __init__(self) -> None:
+        self._libc: ctypes.CDLL = _load_libc()
+        self.fd: int = self._libc.inotify_init1(_IN_CLOEXEC | _IN_NONBLOCK)
+        if self.fd < 0:
+            raise exceptions.IndexWatchError(f"inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+
+    def __enter__(self) -> Inotify:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def add_watch(self, path: str, mask: int) -> int:
+        """
+        Starts watching *path* for the events in *mask*.
+
+        Args:
+            path (str): File or directory to watch.
+            mask (int): Bitwise OR of `IN_*` event flags.
+
+        Returns:
+            int: The watch descriptor reported in events for *path*.
+
+        Raises:
+            OSError: If the watch cannot be added (e.g. *path* vanished or the
+                per-user watch limit was reached).
+        """
+        wd: int = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno: int = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        """
+        Stops watching the path behind *wd*. Unknown descriptors are ignored.
+
+        Args:
+            wd (int): Watch descriptor returned by :meth:`add_watch`.
+        """
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, timeout: float | None = None) -> list[Event]:
+        """
+        Waits up to *timeout* seconds and returns all queued events.
+
+        Args:
+            timeout (float | None): Seconds to wait for the first event;
+                `None` waits forever.
+
+        Returns:
+            list[Event]: Events in the order the kernel queued them; empty on timeout.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+
+        try:
+            buffer: bytes = os.read(self.fd, _READ_SIZE)
+        except BlockingIOError:
+            return []
+
+        events: list[Event] = []
+        offset: int = 0
+
+        while offset < len(buffer):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name: str = os.fsdecode(buffer[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            events.append(Event(wd, mask, cookie, name))
+
+        return events
+
+    def close(self) -> None:
+        """Closes the inotify instance, dropping all of its watches."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
@@ -0,0 +1,99 @@
+"""
+On-disk copy of the template names of a template directory.
+
+The names are stored under:
+    $XDG_CACHE_HOME/makefiles-cli/names/<crc32 of the root path>.names
+
+as the root path followed by a serialised
+:class:`~makefiles.utils.name_store.NameStore`. The file is rewritten
+together with the template index, and exists so that shell completion can
+answer prefix queries by reading a single file, without parsing the index
+or importing the rest of the application. Keep this module's imports
+light: it is loaded on every completion request.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import struct
+import zlib
+from collections.abc import Iterable
+from typing import Final
+
+import makefiles.utils as utils
+from makefiles.utils.name_store import NameStore
+
+_NAMES_DIRNAME: Final[str] = "names"
+_ROOT_HEADER: Final[struct.Struct] = struct.Struct("=I")  # length of the encoded root path
+
+
+def _encode_root(root: pathlib.Path) -> bytes:
+    return str(root.absolute()).encode("utf-8", "surrogateescape")
+
+
+def get_names_path(root: pathlib.Path) -> pathlib.Path:
+    """
+    Returns the cache file that holds the template names of *root*.
+
+    A 32-bit checksum keeps the file name short and cheap to compute; the
+    file records the full root path, so a collision is detected on load.
+
+    Args:
+        root (pathlib.Path): Template directory the names belong to.
+
+    Returns:
+        pathlib.Path: Names file path (not guaranteed to exist yet).
+    """
+    return utils.get_cache_dir().joinpath(_NAMES_DIRNAME, f"{zlib.crc32(_encode_root(root)):08x}.names")
+
+
+def save(root: pathlib.Path, names: Iterable[str]) -> None:
+    """
+    Writes the template names of *root* to its cache file.
+
+    The file is replaced atomically, so concurrent readers never see a
+    partially written file.
+
+    Args:
+        root (pathlib.Path): Template directory the names belong to.
+        names (Iterable[str]): Relative template names.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    names_path: pathlib.Path = get_names_path(root)
+    encoded_root: bytes = _encode_root(root)
+    data: bytes = _ROOT_HEADER.pack(len(encoded_root)) + encoded_root + NameStore(names).to_bytes()
+
+    names_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path: pathlib.Path = names_path.with_name(f".tmp-{os.getpid()}-{names_path.name}")
+    try:
+        temp_path.write_bytes(data)
+        os.replace(temp_path, names_path)
+    except OSError:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def load(root: pathlib.Path) -> NameStore | None:
+    """
+    Reads the cached template names of *root*.
+
+    Args:
+        root (pathlib.Path): Template directory the names belong to.
+
+    Returns:
+        NameStore | None: The cached names, or `None` when there is no
+        usable cache file for *root*.
+    """
+    try:
+        data: bytes = get_names_path(root).read_bytes()
+        (root_length,) = _ROOT_HEADER.unpack_from(data)
+        root_end: int = _ROOT_HEADER.size + root_length
+        if data[_ROOT_HEADER.size : root_end] != _encode_root(root):
+            return None
+
+        return NameStore.from_bytes(data[root_end:])
+    except (OSError, ValueError, struct.error):
+        return None
@@ -0,0 +1,328 @@
+"""
+Compact, sorted storage for large sets of template names.
+
+Template names are relative paths, and names that sit next to each other
+in sorted order share most of their directory prefix. :class:`NameStore`
+keeps the names front-coded in a single `bytes` blob: every name is
+stored as the length of the prefix it shares with the previous name and
+the length of the rest (both as varints), followed by the remaining UTF-8
+bytes. That costs a couple of bytes per name instead of a full Python
+string object each, which for deeply nested catalogs is an order of
+magnitude less memory than a `list[str]`.
+
+Every `_RESTART_INTERVAL`-th name is stored in full, so any name can be
+rebuilt from the nearest restart point. Lookups binary-search the restart
+points and then scan at most one block.
+
+A store converts to and from a flat byte string, so it can be written to
+disk and loaded back without re-sorting or re-encoding any name.
+"""
+
+from __future__ import annotations
+
+import struct
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from typing import Final
+
+_RESTART_INTERVAL: Final[int] = 16
+_SEPARATOR: Final[bytes] = b"/"
+_SEPARATOR_SUCCESSOR: Final[bytes] = b"0"  # the byte right after "/"; bounds a directory's names
+
+_MAGIC: Final[bytes] = b"MKN1"
+_HEADER: Final[struct.Struct] = struct.Struct("=4sQQQ")  # magic, names, restart points, blob size
+
+
+def _encode(name: str) -> bytes:
+    return name.encode("utf-8", "surrogateescape")
+
+
+def _decode(key: bytes) -> str:
+    return key.decode("utf-8", "surrogateescape")
+
+
+def _common_prefix_length(first: bytes, second: bytes) -> int:
+    # Binary search over slice comparisons, which run in C, instead of a per-byte loop
+    low: int = 0
+    high: int = min(len(first), len(second))
+
+    while low < high:
+        middle: int = (low + high + 1) // 2
+        if first[:middle] == second[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+
+    return low
+
+
+def _write_varint(blob: bytearray, value: int) -> None:
+    while value >= 0x80:
+        blob.append(value & 0x7F | 0x80)
+        value >>= 7
+    blob.append(value)
+
+
+def _read_varint(blob: bytes, offset: int) -> tuple[int, int]:
+    """Returns the varint at *offset* and the offset right after it."""
+    value: int = 0
+    shift: int = 0
+
+    while True:
+        byte: int = blob[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class NameStore:
+    """
+    Immutable, sorted set of names with prefix queries.
+
+    Names are ordered by their UTF-8 encoding, which is code point order.
+    Duplicates are stored once.
+
+    Arguments:
+        names (Iterable[str]): Names to store, in any order.
+
+    Examples:
+        >>> store = NameStore(["python/script.py", "c/main.c", "python/module.py"])
+        >>> list(store)
+        ['c/main.c', 'python/module.py', 'python/script.py']
+
+        >>> list(store.iter_prefix("python/"))
+        ['python/module.py', 'python/script.py']
+
+        >>> "c/main.c" in store
+        True
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        blob: bytearray = bytearray()
+        self._restarts: array[int] = array("Q")  # blob offset of every restart name
+        self._length: int = 0
+
+        previous: bytes = b""
+        for key in sorted({_encode(name) for name in names}):
+            shared: int = 0
+            if self._length % _RESTART_INTERVAL:
+                shared = _common_prefix_length(previous, key)
+            else:
+                self._restarts.append(len(blob))
+
+            _write_varint(blob, shared)
+            _write_varint(blob, len(key) - shared)
+            blob += key[shared:]
+            self._length += 1
+            previous = key
+
+        self._blob: bytes = bytes(blob)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self._blob.__sizeof__() + self._restarts.__sizeof__()
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialises the store.
+
+        The result uses the machine's native byte order and is meant for
+        caches on the same machine.
+
+        Returns:
+            bytes: Data accepted by :meth:`from_bytes`.
+        """
+        header: bytes = _HEADER.pack(_MAGIC, self._length, len(self._restarts), len(self._blob))
+        return header + self._restarts.tobytes() + self._blob
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> NameStore:
+        """
+        Rebuilds a store serialised with :meth:`to_bytes`.
+
+        Args:
+            data (bytes): Serialised store.
+
+        Returns:
+            NameStore: The store.
+
+        Raises:
+            ValueError: If *data* is not a serialised store.
+        """
+        try:
+            magic, length, restarts, blob_size = _HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError("truncated name store header") from None
+
+        restarts_end: int = _HEADER.size + restarts * array("Q").itemsize
+        if magic != _MAGIC or len(data) != restarts_end + blob_size or restarts != -(-length // _RESTART_INTERVAL):
+            raise ValueError("not a name store")
+
+        store: NameStore = cls.__new__(cls)
+        store._restarts = array("Q")
+        store._restarts.frombytes(data[_HEADER.size : restarts_end])
+        store._blob = bytes(data[restarts_end:])
+        store._length = length
+        return store
+
+    def __iter__(self) -> Iterator[str]:
+        return (_decode(key) for _, key in self._iter_keys(0))
+
+    def __getitem__(self, position: int) -> str:
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("NameStore index out of range")
+
+        _, key = next(self._iter_keys(position))
+        return _decode(key)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._find(_encode(name)) >= 0
+
+    def index(self, name: str) -> int:
+        """
+        Returns the position of *name* in sorted order.
+
+        Args:
+            name (str): Name to look up.
+
+        Returns:
+            int: Position of *name*, usable with `store[position]`.
+
+        Raises:
+            ValueError: If *name* is not in the store.
+        """
+        position: int = self._find(_encode(name))
+        if position < 0:
+            raise ValueError(f"{name!r} is not in NameStore")
+
+        return position
+
+    def iter_prefix(self, prefix: str) -> Iterator[str]:
+        """
+        Yields the names that start with *prefix*, in sorted order.
+
+        Args:
+            prefix (str): Leading part of the names to return. An empty
+                prefix yields every name.
+
+        Returns:
+            Iterator[str]: Matching names.
+        """
+        key_prefix: bytes = _encode(prefix)
+        position, key = self._lower_bound(key_prefix)
+        if key is None:
+            return
+
+        for _, key in self._iter_keys(position):
+            if not key.startswith(key_prefix):
+                break
+            yield _decode(key)
+
+    def count_prefix(self, prefix: str) -> int:
+        """
+        Returns the number of names that start with *prefix*.
+
+        Takes two lookups, however many names match.
+
+        Args:
+            prefix (str): Leading part of the names, e.g. a directory with a
+                trailing `/`.
+
+        Returns:
+            int: Number of matching names.
+        """
+        key_prefix: bytes = _encode(prefix)
+        start, _ = self._lower_bound(key_prefix)
+
+        # Every key that starts with the prefix sorts below its successor
+        stem: bytes = key_prefix.rstrip(b"\xff")
+        end: int = self._lower_bound(stem[:-1] + bytes((stem[-1] + 1,)))[0] if stem else len(self)
+        return end - start
+
+    def iter_completions(self, prefix: str) -> Iterator[str]:
+        """
+        Yields the next path component of every name that starts with *prefix*.
+
+        Names are treated as `/`-separated paths. A name whose remainder
+        after *prefix* contains no separator is yielded whole; all names
+        below the same directory are reported once, as that directory with a
+        trailing `/`. Whole directories are skipped with a single lookup, so
+        the cost depends on the number of results, not on the number of names.
+
+        Args:
+            prefix (str): Leading part of the names.
+
+        Returns:
+            Iterator[str]: Distinct completions, in sorted order.
+
+        Examples:
+            >>> store = NameStore(["python/script.py", "python/lib/module.py", "pyproject.toml"])
+            >>> list(store.iter_completions("py"))
+            ['pyproject.toml', 'python/']
+
+            >>> list(store.iter_completions("python/"))
+            ['python/lib/', 'python/script.py']
+        """
+        key_prefix: bytes = _encode(prefix)
+        position, _ = self._lower_bound(key_prefix)
+        keys: Iterator[tuple[int, bytes]] = self._iter_keys(position)
+
+        while (item := next(keys, None)) is not None:
+            key: bytes = item[1]
+            if not key.startswith(key_prefix):
+                break
+
+            cut: int = key.find(_SEPARATOR, len(key_prefix))
+            if cut < 0:
+                yield _decode(key)
+                continue
+
+            yield _decode(key[: cut + 1])
+            position, _ = self._lower_bound(key[:cut] + _SEPARATOR_SUCCESSOR)
+            keys = self._iter_keys(position)
+
+    def _restart_key(self, block: int) -> bytes:
+        # Restart names share nothing with their predecessor, so the suffix is the whole name
+        _, offset = _read_varint(self._blob, self._restarts[block])
+        length, offset = _read_varint(self._blob, offset)
+        return self._blob[offset : offset + length]
+
+    def _iter_keys(self, position: int) -> Iterator[tuple[int, bytes]]:
+        """Yields `(position, key)` pairs from *position* to the end."""
+        if position >= len(self):
+            return
+
+        blob: bytes = self._blob
+        block: int = position // _RESTART_INTERVAL
+        offset: int = self._restarts[block]
+        key: bytes = b""
+
+        for current in range(block * _RESTART_INTERVAL, len(self)):
+            shared, offset = _read_varint(blob, offset)
+            length, offset = _read_varint(blob, offset)
+            key = key[:shared] + blob[offset : offset + length]
+            offset += length
+
+            if current >= position:
+                yield current, key
+
+    def _lower_bound(self, key: bytes) -> tuple[int, bytes | None]:
+        """Returns the position and value of the first name not less than *key*."""
+        block: int = max(bisect_right(range(len(self._restarts)), key, key=self._restart_key) - 1, 0)
+
+        for position, current in self._iter_keys(block * _RESTART_INTERVAL):
+            if current >= key:
+                return position, current
+
+        return len(self), None
+
+    def _find(self, key: bytes) -> int:
+        position, current = self._lower_bound(key)
+        return position if current == key else -1
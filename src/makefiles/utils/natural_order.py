@@ -0,0 +1,61 @@
+"""
+Natural, case-insensitive ordering of template names.
+
+Template names are listed the way people number files: `chapter2.md`
+before `chapter10.md`, and `Makefile` next to `main.c` rather than before
+every lower-case name. The order does not depend on the locale, so every
+user and every shell completion sees the same listing.
+
+A name's position in that order is captured by a plain string,
+:func:`sort_key`, so keys can be computed once, stored in the template
+index, and compared by the interpreter's string comparison afterwards.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from typing import Final
+
+_DIGITS: Final[re.Pattern[str]] = re.compile(r"\d+")
+_NUMBER_MARK: Final[str] = "\0"
+_NAME_MARK: Final[str] = "\0\0"  # sorts before any number, so a shorter name comes first
+
+
+def _encode_number(match: re.Match[str]) -> str:
+    digits: str = match.group().lstrip("0") or "0"
+    return f"{_NUMBER_MARK}{len(digits):04d}{digits}"
+
+
+def sort_key(name: str) -> str:
+    """
+    Returns the natural sort key of a template name.
+
+    Letters are compared case-insensitively and runs of digits by their
+    numeric value. Names that only differ in case or leading zeros are
+    ordered by code point, so no two names share a key.
+
+    Args:
+        name (str): Template name.
+
+    Returns:
+        str: Key whose string order is the natural order of the names.
+
+    Examples:
+        >>> sorted(["file10.txt", "File2.txt", "file1.txt"], key=sort_key)
+        ['file1.txt', 'File2.txt', 'file10.txt']
+    """
+    return _DIGITS.sub(_encode_number, name.casefold()) + _NAME_MARK + name
+
+
+def sort(names: Iterable[str]) -> list[str]:
+    """
+    Returns *names* in natural order.
+
+    Args:
+        names (Iterable[str]): Template names.
+
+    Returns:
+        list[str]: The names, sorted by :func:`sort_key`.
+    """
+    return sorted(names, key=sort_key)
@@ -0,0 +1,117 @@
+"""
+Index from destination file names to the templates that fit them.
+
+Every file name is reduced to a few lookup keys, most specific first:
+    the whole name                 Dockerfile -> dockerfile
+    prefix and suffix pattern      test_parser.py -> test_*.py
+    compound suffix pattern        backup.tar.gz -> *.tar.gz
+    last suffix pattern            backup.tar.gz -> *.gz
+
+Template names are reduced the same way, so a template called
+`python/test_module.py` serves `test_*.py` destinations and a template
+called `python/script.py` serves `*.py` ones. A template may also be named
+after the pattern itself, e.g. `test_*.py`. Picking a template for a
+destination is then a handful of dictionary lookups.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Final
+
+_WILDCARD: Final[str] = "*"
+_PREFIX_SEPARATORS: Final[tuple[str, ...]] = ("_", "-")
+
+
+def get_keys(filename: str) -> list[str]:
+    """
+    Returns the lookup keys of a file name, most specific first.
+
+    Keys are case-insensitive. A leading dot is part of the name, not a
+    suffix, so `.bashrc` only has itself as key.
+
+    Args:
+        filename (str): Base name of a file, without directories.
+
+    Returns:
+        list[str]: Distinct keys.
+
+    Examples:
+        >>> get_keys("test_parser.py")
+        ['test_parser.py', 'test_*.py', '*.py']
+
+        >>> get_keys("Dockerfile")
+        ['dockerfile']
+    """
+    name: str = filename.lower()
+    keys: list[str] = [name]
+
+    suffix_start: int = name.find(".", 1)
+    if suffix_start < 0:
+        return keys
+
+    stem: str = name[:suffix_start]
+    suffix: str = name[suffix_start:]
+
+    separators: list[int] = [index for index in map(stem.find, _PREFIX_SEPARATORS) if index > 0]
+    if separators:
+        keys.append(stem[: min(separators) + 1] + _WILDCARD + suffix)
+
+    keys.append(_WILDCARD + suffix)
+    keys.append(_WILDCARD + name[name.rfind(".") :])
+
+    return list(dict.fromkeys(keys))
+
+
+class PatternIndex:
+    """
+    Maps file name keys to the template that serves them.
+
+    When several templates share a key, the one closest to the root wins,
+    then the one with the shortest file name, then the first in iteration
+    order.
+
+    Arguments:
+        names (Iterable[str]): Relative template names; positions are
+            assigned in iteration order.
+
+    Examples:
+        >>> index = PatternIndex(["docker/Dockerfile", "python/script.py", "python/test_module.py"])
+        >>> index.lookup("main.py"), index.lookup("test_cli.py"), index.lookup("Dockerfile")
+        (1, 2, 0)
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self._positions: dict[str, int] = {}
+        preferences: dict[str, tuple[int, int]] = {}  # only lives while the index is built
+
+        for position, name in enumerate(names):
+            depth: int = name.count("/")
+            filename: str = name[name.rfind("/") + 1 :]
+            preference: tuple[int, int] = (depth, len(filename))
+
+            for key in get_keys(filename):
+                if key not in preferences or preference < preferences[key]:
+                    preferences[key] = preference
+                    self._positions[key] = position
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def lookup(self, filename: str) -> int | None:
+        """
+        Returns the template that fits a destination file name best.
+
+        Args:
+            filename (str): Base name of the destination file.
+
+        Returns:
+            int | None: Position of the template in the names the index was
+            built from, or `None` if no template fits.
+        """
+        for key in get_keys(filename):
+            position: int | None = self._positions.get(key)
+            if position is not None:
+                return position
+
+        return None
@@ -0,0 +1,359 @@
+"""
+Full-text index of template contents.
+
+The contents of every template are kept in a SQLite FTS5 table under:
+    $XDG_CACHE_HOME/makefiles-cli/search.sqlite3
+
+next to the size and mtime each template had when it was read. A sync
+`stat`s the visible templates of a template search path and only reads
+the ones whose size or mtime changed, or that are new; templates that
+disappeared or became shadowed by another root are dropped. A search is
+then a single indexed query, however many templates there are.
+
+Templates of a packed directory or of an archive are read through a
+callback instead, and stamped with the size and mtime of the pack or
+archive, so they are read again whenever it is rewritten.
+
+Binary templates (a NUL byte in their first bytes, as in
+:func:`makefiles.utils.template_index.read_metadata`) are recorded with
+empty contents, so they never match but are not read again either.
+
+Typical usage:
+
+    with search_index.SearchIndex() as index:
+        index.sync(
+            catalog.roots,
+            catalog.iter_sources(),
+            bundles=catalog.get_bundle_files(),
+            read_contents=catalog.read_contents,
+        )
+        names = index.search("argparse", catalog.roots)
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import sqlite3
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger
+from types import TracebackType
+from typing import Final, TypeVar
+
+import makefiles.exceptions as exceptions
+import makefiles.utils as utils
+from makefiles.logger import get_logger
+
+_logger: Logger = get_logger(__name__)
+
+_S = TypeVar("_S")
+_T = TypeVar("_T")
+
+_DATABASE_FILENAME: Final[str] = "search.sqlite3"
+_SCHEMA_VERSION: Final[int] = 1
+_BUSY_TIMEOUT: Final[float] = 30.0  # seconds to wait for another process syncing the index
+_BINARY_PROBE_SIZE: Final[int] = 8 * 1024
+
+_SCHEMA: Final[str] = """
+DROP TABLE IF EXISTS templates;
+DROP TABLE IF EXISTS contents;
+CREATE TABLE templates (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    UNIQUE (root, name)
+);
+CREATE VIRTUAL TABLE contents USING fts5(body);
+"""
+
+
+def get_search_index_path() -> pathlib.Path:
+    """
+    Returns the database file that holds the search index.
+
+    Returns:
+        pathlib.Path: Database path (not guaranteed to exist yet).
+    """
+    return utils.get_cache_dir().joinpath(_DATABASE_FILENAME)
+
+
+def build_query(text: str) -> str:
+    """
+    Turns a user query into an FTS5 query.
+
+    Every whitespace separated word must occur in a matching template. A
+    word is matched as a phrase of the tokens it contains, so punctuation
+    such as in `foo-bar` or `std::vector` needs no escaping; a trailing `*`
+    matches any token starting with the word.
+
+    Args:
+        text (str): Query as typed by the user.
+
+    Returns:
+        str: FTS5 query, empty if *text* has no words.
+
+    Examples:
+        >>> build_query("argparse sub*")
+        '"argparse" "sub"*'
+    """
+    terms: list[str] = []
+    for word in text.split():
+        stem: str = word.rstrip("*")
+        if not stem:
+            continue
+        terms.append('"' + stem.replace('"', '""') + '"' + ("*" if stem != word else ""))
+
+    return " ".join(terms)
+
+
+def _stat(path: str) -> tuple[int, int] | None:
+    try:
+        stat_result: os.stat_result = os.stat(path)
+    except OSError:
+        return None
+
+    return stat_result.st_size, stat_result.st_mtime_ns
+
+
+def _decode(data: bytes | memoryview) -> str:
+    if b"\0" in bytes(data[:_BINARY_PROBE_SIZE]):
+        return ""
+
+    return str(data, "utf-8", "replace")
+
+
+def _read_text(path: str) -> str | None:
+    try:
+        with open(path, "rb") as file:
+            data: bytes = file.read()
+    except OSError as e:
+        _logger.debug("cannot read %s for the search index: %s", path, e)
+        return None
+
+    return _decode(data)
+
+
+def _map(function: Callable[[_S], _T], items: list[_S], jobs: int) -> list[_T]:
+    if jobs <= 1 or len(items) <= 1:
+        return list(map(function, items))
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(function, items))
+
+
+class SearchIndex:
+    """
+    Connection to the search index database.
+
+    The database is created on first use. A database that cannot be read
+    or that was written by another version of the schema is rebuilt from
+    scratch; it only caches template contents. Use the instance as a
+    context manager to make sure the connection is closed.
+
+    Arguments:
+        path (pathlib.Path | None): Database file. Defaults to
+            :func:`get_search_index_path`.
+
+    Raises:
+        makefiles.exceptions.SearchIndexError: If SQLite lacks FTS5 or the
+            database cannot be opened.
+    """
+
+    def __init__(self, path: pathlib.Path | None = None) -> None:
+        self.path: pathlib.Path = get_search_index_path() if path is None else path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            self._connection: sqlite3.Connection = self._open()
+        except sqlite3.DatabaseError as e:
+            if isinstance(e, sqlite3.OperationalError) and "fts5" in str(e):
+                raise exceptions.SearchIndexError("cannot search templates: SQLite was built without FTS5") from None
+
+            _logger.warning("discarding unreadable search index %s: %s", self.path, e)
+            try:
+                for suffix in ("", "-wal", "-shm"):
+                    self.path.with_name(self.path.name + suffix).unlink(missing_ok=True)
+                self._connection = self._open()
+            except (OSError, sqlite3.Error) as e:
+                raise exceptions.SearchIndexError(f"cannot open search index {self.path}: {e}") from None
+
+    def __enter__(self) -> SearchIndex:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _open(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection = sqlite3.connect(self.path, timeout=_BUSY_TIMEOUT, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode = WAL")  # readers never wait for a sync
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                if connection.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                    for statement in filter(str.strip, _SCHEMA.split(";")):
+                        connection.execute(statement)
+                    connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except BaseException:
+            connection.close()
+            raise
+
+        return connection
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._connection.close()
+
+    def sync(
+        self,
+        roots: Sequence[pathlib.Path],
+        templates: Iterable[tuple[str, pathlib.Path]],
+        *,
+        jobs: int = 1,
+        bundles: Mapping[pathlib.Path, pathlib.Path] | None = None,
+        read_contents: Callable[[str], bytes | memoryview | None] | None = None,
+    ) -> int:
+        """
+        Brings the indexed contents of *roots* in line with *templates*.
+
+        Every template is `stat`-ed; only templates whose size or mtime
+        differ from the recorded ones are read. Templates of a root in
+        *bundles* are not `stat`-ed: they take the size and mtime of the
+        pack or archive they come from and are read with *read_contents*.
+        Records of *roots* that are not in *templates* are removed. Records
+        of other roots are left alone. Templates that cannot be read are
+        left out and retried on the next sync.
+
+        Args:
+            roots (Sequence[pathlib.Path]): Template directories the sync covers.
+            templates (Iterable[tuple[str, pathlib.Path]]): Every visible
+                template as a pair of name and the root that provides it.
+            jobs (int): Maximum number of templates read at the same time.
+            bundles (Mapping[pathlib.Path, pathlib.Path] | None): Pack or
+                archive file of every root whose templates are not files
+                below it.
+            read_contents (Callable[[str], bytes | memoryview | None] | None):
+                Returns the contents of a template of a root in *bundles*.
+                Required when *bundles* is not empty.
+
+        Returns:
+            int: Number of templates that were (re)read.
+
+        Raises:
+            makefiles.exceptions.SearchIndexError: If the index cannot be written.
+        """
+        current: dict[tuple[str, str], str] = {
+            (str(root.absolute()), name): os.path.join(root, name) for name, root in templates
+        }
+        root_keys: list[str] = [str(root.absolute()) for root in roots]
+        bundle_stats: dict[str, tuple[int, int] | None] = {
+            str(root.absolute()): _stat(str(path)) for root, path in (bundles or {}).items()
+        }
+
+        def read(key: tuple[str, str]) -> str | None:
+            if key[0] not in bundle_stats:
+                return _read_text(current[key])
+
+            data: bytes | memoryview | None = None if read_contents is None else read_contents(key[1])
+            return None if data is None else _decode(data)
+
+        try:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                known: dict[tuple[str, str], tuple[int, int, int]] = {
+                    (root, name): (row_id, size, mtime_ns)
+                    for row_id, root, name, size, mtime_ns in self._connection.execute(
+                        "SELECT id, root, name, size, mtime_ns FROM templates"
+                        f" WHERE root IN ({', '.join('?' * len(root_keys))})",
+                        root_keys,
+                    )
+                }
+
+                keys: list[tuple[str, str]] = list(current)
+                loose: list[tuple[str, str]] = [key for key in keys if key[0] not in bundle_stats]
+                loose_stats: dict[tuple[str, str], tuple[int, int] | None] = dict(
+                    zip(loose, _map(_stat, [current[key] for key in loose], jobs))
+                )
+                stats: list[tuple[int, int] | None] = [
+                    bundle_stats[key[0]] if key[0] in bundle_stats else loose_stats[key] for key in keys
+                ]
+                changed: list[tuple[tuple[str, str], tuple[int, int]]] = [
+                    (key, stat)
+                    for key, stat in zip(keys, stats)
+                    if stat is not None and (key not in known or known[key][1:] != stat)
+                ]
+                # Dropped, shadowed, vanished and changed templates lose their records
+                unchanged: set[tuple[str, str]] = {
+                    key
+                    for key, stat in zip(keys, stats)
+                    if stat is not None and key in known and known[key][1:] == stat
+                }
+                stale: list[tuple[int]] = [(known[key][0],) for key in known.keys() - unchanged]
+
+                bodies: list[str | None] = _map(read, [key for key, _ in changed], jobs)
+
+                self._connection.executemany("DELETE FROM contents WHERE rowid = ?", stale)
+                self._connection.executemany("DELETE FROM templates WHERE id = ?", stale)
+                for ((root, name), (size, mtime_ns)), body in zip(changed, bodies):
+                    if body is None:
+                        continue
+                    row_id: int | None = self._connection.execute(
+                        "INSERT INTO templates (root, name, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                        (root, name, size, mtime_ns),
+                    ).lastrowid
+                    self._connection.execute("INSERT INTO contents (rowid, body) VALUES (?, ?)", (row_id, body))
+
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            raise exceptions.SearchIndexError(f"cannot update search index {self.path}: {e}") from None
+
+        _logger.debug("search index: %d templates read, %d records dropped", len(changed), len(stale))
+        return len(changed)
+
+    def search(self, query: str, roots: Sequence[pathlib.Path], *, limit: int | None = None) -> list[str]:
+        """
+        Returns the templates of *roots* whose contents match *query*.
+
+        Args:
+            query (str): Words that must all occur in a template; see
+                :func:`build_query`.
+            roots (Sequence[pathlib.Path]): Template directories to search.
+            limit (int | None): Maximum number of templates returned.
+
+        Returns:
+            list[str]: Template names, best match first.
+
+        Raises:
+            makefiles.exceptions.SearchIndexError: If the index cannot be queried.
+        """
+        fts_query: str = build_query(query)
+        if not fts_query or not roots:
+            return []
+
+        root_keys: list[str] = [str(root.absolute()) for root in roots]
+        statement: str = (
+            "SELECT templates.name FROM contents JOIN templates ON templates.id = contents.rowid"
+            f" WHERE contents MATCH ? AND templates.root IN ({', '.join('?' * len(root_keys))})"
+            " ORDER BY contents.rank, templates.name"
+        )
+        if limit is not None:
+            statement += f" LIMIT {int(limit)}"
+
+        try:
+            return [name for (name,) in self._connection.execute(statement, (fts_query, *root_keys))]
+        except sqlite3.Error as e:
+            raise exceptions.SearchIndexError(f"cannot search templates: {e}") from None
@@ -0,0 +1,404 @@
+"""
+Zip and tar archives used as template directories.
+
+An entry of the template search path, `XDG_TEMPLATES_DIR` included, may be
+a zip or tar archive (plain or gzip, bzip2 or xz compressed) instead of a
+directory. The regular files of the archive are its templates, named after
+their member paths; hidden members are skipped as they are in a directory.
+
+Listing a zip archive only reads its central directory. Tar archives have
+no such directory, so the first run walks their member headers and caches
+the name, data offset, size and mtime of every member under:
+    $XDG_CACHE_HOME/makefiles-cli/archives/<sha1 of the archive path>.json
+
+together with the archive's size and mtime, and later runs list the
+archive from that file without opening it. Creating a template only reads
+the requested member, and streams it to the destinations in chunks
+instead of holding it in memory (see :meth:`TemplateArchive.open`): zip
+members are inflated on their own, and members of an uncompressed tar are
+read with a single seek to their recorded offset. Compressed tars have to
+be decompressed up to the member; when every member is read, as for
+metadata, they are read in archive order in a single pass.
+"""
+
+from __future__ import annotations
+
+import abc
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import tarfile
+import threading
+import time
+import zipfile
+import zlib
+from collections.abc import Iterable, Iterator
+from functools import cached_property
+from logging import Logger
+from types import TracebackType
+from typing import IO, Any, Final
+
+import makefiles.exceptions as exceptions
+import makefiles.utils as utils
+import makefiles.utils.natural_order as natural_order
+import makefiles.utils.template_index as template_index
+from makefiles.logger import get_logger
+from makefiles.utils.name_store import NameStore
+
+_logger: Logger = get_logger(__name__)
+
+_ARCHIVES_DIRNAME: Final[str] = "archives"
+_TAR_INDEX_VERSION: Final[int] = 1
+_COMPRESSION_MAGICS: Final[tuple[bytes, ...]] = (b"\x1f\x8b", b"BZh", b"\xfd7zXZ\x00")
+_BINARY_PROBE_SIZE: Final[int] = 8 * 1024
+# Errors of a damaged archive, as opposed to errors of the file that holds it
+_EXTRACT_ERRORS: Final = (EOFError, zipfile.BadZipFile, tarfile.TarError, zlib.error)
+
+
+def _is_template_name(name: str) -> bool:
+    parts: list[str] = name.split("/")
+    return all(part and not part.startswith(".") for part in parts)
+
+
+def _read_meta(data: bytes, mtime_ns: int) -> template_index.FileMeta:
+    if b"\0" in data[:_BINARY_PROBE_SIZE]:
+        return template_index.FileMeta(len(data), mtime_ns, None)
+
+    lines: int = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+    return template_index.FileMeta(len(data), mtime_ns, lines)
+
+
+class TemplateArchive(abc.ABC):
+    """
+    Templates of an archive.
+
+    Iterating over the archive yields the template names in sorted order,
+    leaving out those deeper than *max_depth*, so an archive can stand in
+    for a :class:`~makefiles.utils.template_index.TemplateIndex`. Use the
+    instance as a context manager, or call :meth:`close`, to release the
+    archive file once no more templates are read.
+
+    Arguments:
+        root (pathlib.Path): Archive file.
+        names (Iterable[str]): Names of the templates in the archive.
+        max_depth (int | None): Maximum number of path components of a
+            listed template.
+        max_entries (int | None): Number of templates the archive may
+            hold; see :attr:`truncated`.
+
+    Attributes:
+        truncated (bool): *True* when more than *max_entries* templates
+            are listed.
+    """
+
+    def __init__(
+        self,
+        root: pathlib.Path,
+        names: Iterable[str],
+        *,
+        max_depth: int | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self.root: pathlib.Path = root.absolute()
+        self.names: NameStore = NameStore(names)
+        self._max_depth: int | None = max_depth
+        self.truncated: bool = max_entries is not None and sum(1 for _ in self) > max_entries
+
+    def __iter__(self) -> Iterator[str]:
+        if self._max_depth is None:
+            return iter(self.names)
+
+        return (name for name in self.names if name.count("/") < self._max_depth)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __enter__(self) -> TemplateArchive:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the archive file if a template was read from it."""
+
+    @cached_property
+    def meta(self) -> dict[str, template_index.FileMeta]:
+        """Metadata of every template, read from the archive on first use."""
+        meta: dict[str, template_index.FileMeta] = {}
+        try:
+            for name, data in self._read_members(list(self)):
+                meta[name] = _read_meta(data, self._get_mtime_ns(name))
+        except (
+            OSError,
+            EOFError,
+            zipfile.BadZipFile,
+            tarfile.TarError,
+            zlib.error,
+            exceptions.TemplateArchiveError,
+        ) as e:
+            _logger.warning("cannot read the templates of %s: %s", self.root, e)
+
+        return meta
+
+    @cached_property
+    def sort_keys(self) -> dict[str, str]:
+        """Natural sort key of every template, computed on first use."""
+        return {name: natural_order.sort_key(name) for name in self.names}
+
+    @contextlib.contextmanager
+    def open(self, name: str) -> Iterator[IO[bytes]]:
+        """
+        Opens a single template for reading, without extracting it first.
+
+        Args:
+            name (str): Relative template name.
+
+        Returns:
+            Iterator[IO[bytes]]: Context manager giving the contents as a
+            binary file object.
+
+        Raises:
+            KeyError: If the archive has no template *name*.
+            makefiles.exceptions.TemplateArchiveError: If the archive cannot
+                be opened or the template cannot be extracted from it.
+        """
+        if name not in self.names:
+            raise KeyError(name)
+
+        with contextlib.ExitStack() as stack:
+            try:
+                member: IO[bytes] = stack.enter_context(self._open_member(name))
+            except (OSError, *_EXTRACT_ERRORS) as e:
+                raise exceptions.TemplateArchiveError(f"cannot extract {name} from {self.root}: {e}") from None
+
+            try:
+                yield member
+            except _EXTRACT_ERRORS as e:
+                raise exceptions.TemplateArchiveError(f"cannot extract {name} from {self.root}: {e}") from None
+
+    def read(self, name: str) -> bytes | None:
+        """
+        Extracts a single template into memory.
+
+        Args:
+            name (str): Relative template name.
+
+        Returns:
+            bytes | None: The contents, or `None` if the archive has no
+            template *name* or it cannot be read.
+        """
+        if name not in self.names:
+            return None
+
+        try:
+            with self.open(name) as member:
+                return member.read()
+        except exceptions.TemplateArchiveError as e:
+            _logger.warning("cannot extract %s from %s: %s", name, self.root, e)
+            return None
+
+    def _read_members(self, names: list[str]) -> Iterator[tuple[str, bytes]]:
+        """Yields the contents of every template of *names*, in any order."""
+        for name in names:
+            data: bytes | None = self.read(name)
+            if data is not None:
+                yield name, data
+
+    @abc.abstractmethod
+    def _open_member(self, name: str) -> contextlib.AbstractContextManager[IO[bytes]]:
+        """Opens the member *name* for reading."""
+
+    @abc.abstractmethod
+    def _get_mtime_ns(self, name: str) -> int:
+        """Returns the modification time of the member *name*, in nanoseconds."""
+
+
+class ZipTemplateArchive(TemplateArchive):
+    """
+    Templates of a zip archive, listed from its central directory.
+
+    Arguments:
+        root (pathlib.Path): Archive file.
+        max_depth (int | None): See :class:`TemplateArchive`.
+        max_entries (int | None): See :class:`TemplateArchive`.
+
+    Raises:
+        zipfile.BadZipFile: If *root* is not a zip archive.
+        OSError: If *root* cannot be read.
+    """
+
+    def __init__(self, root: pathlib.Path, *, max_depth: int | None = None, max_entries: int | None = None) -> None:
+        with zipfile.ZipFile(root) as archive:
+            self._infos: dict[str, zipfile.ZipInfo] = {
+                info.filename: info
+                for info in archive.infolist()
+                if not info.is_dir() and _is_template_name(info.filename)
+            }
+        # Only opened once a template is read, so listing leaves no file open
+        self._zip: zipfile.ZipFile | None = None
+        self._lock: threading.Lock = threading.Lock()
+        super().__init__(root, self._infos, max_depth=max_depth, max_entries=max_entries)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+
+    def _open_member(self, name: str) -> contextlib.AbstractContextManager[IO[bytes]]:
+        with self._lock:
+            if self._zip is None:
+                self._zip = zipfile.ZipFile(self.root)
+            return self._zip.open(self._infos[name])
+
+    def _get_mtime_ns(self, name: str) -> int:
+        # Zip timestamps are local time without a time zone
+        return int(time.mktime((*self._infos[name].date_time, 0, 0, -1))) * 1_000_000_000
+
+
+class TarTemplateArchive(TemplateArchive):
+    """
+    Templates of a tar archive, listed from its cached member index.
+
+    Arguments:
+        root (pathlib.Path): Archive file.
+        max_depth (int | None): See :class:`TemplateArchive`.
+        max_entries (int | None): See :class:`TemplateArchive`.
+
+    Raises:
+        tarfile.TarError: If *root* is not a tar archive.
+        OSError: If *root* cannot be read.
+    """
+
+    def __init__(self, root: pathlib.Path, *, max_depth: int | None = None, max_entries: int | None = None) -> None:
+        stat_result: os.stat_result = os.stat(root)
+        stamp: list[int] = [stat_result.st_size, stat_result.st_mtime_ns]
+
+        data: dict[str, Any] | None = _load_tar_index(root)
+        if data is None or data.get("version") != _TAR_INDEX_VERSION or data.get("stamp") != stamp:
+            data = _build_tar_index(root, stamp)
+            _save_tar_index(root, data)
+
+        self._compressed: bool = data["compressed"]
+        self._members: dict[str, tuple[int, int, int]] = {
+            name: (offset, size, mtime_ns) for name, offset, size, mtime_ns in data["members"]
+        }
+        super().__init__(root, self._members, max_depth=max_depth, max_entries=max_entries)
+
+    def _get_member(self, name: str) -> tarfile.TarInfo:
+        """Rebuilds the header of the member *name* from the member index."""
+        offset, size, _ = self._members[name]
+        member: tarfile.TarInfo = tarfile.TarInfo(name)
+        member.offset_data = offset
+        member.size = size
+        return member
+
+    def _extract(self, archive: tarfile.TarFile, name: str) -> IO[bytes]:
+        extracted: IO[bytes] | None = archive.extractfile(self._get_member(name))
+        if extracted is None:
+            raise KeyError(name)
+        return extracted
+
+    @contextlib.contextmanager
+    def _open_member(self, name: str) -> Iterator[IO[bytes]]:
+        # The member is read at its indexed offset, so its header is never searched for
+        with tarfile.open(self.root, "r:*") as archive, self._extract(archive, name) as extracted:
+            yield extracted
+
+    def _read_members(self, names: list[str]) -> Iterator[tuple[str, bytes]]:
+        # In archive order a compressed tar is decompressed once, instead of up to every member
+        with tarfile.open(self.root, "r:*") as archive:
+            for name in sorted(names, key=lambda name: self._members[name][0]):
+                with self._extract(archive, name) as extracted:
+                    yield name, extracted.read()
+
+    def _get_mtime_ns(self, name: str) -> int:
+        return self._members[name][2]
+
+
+def get_tar_index_path(root: pathlib.Path) -> pathlib.Path:
+    """
+    Returns the cache file that holds the member index of the tar archive *root*.
+
+    Args:
+        root (pathlib.Path): Archive file.
+
+    Returns:
+        pathlib.Path: Index file path (not guaranteed to exist yet).
+    """
+    key: str = hashlib.sha1(str(root.absolute()).encode("utf-8", "surrogateescape")).hexdigest()
+    return utils.get_cache_dir().joinpath(_ARCHIVES_DIRNAME, f"{key}.json")
+
+
+def _load_tar_index(root: pathlib.Path) -> dict[str, Any] | None:
+    try:
+        with open(get_tar_index_path(root), "rb") as file:
+            data: Any = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    return data if isinstance(data, dict) else None
+
+
+def _build_tar_index(root: pathlib.Path, stamp: list[int]) -> dict[str, Any]:
+    with open(root, "rb") as file:
+        compressed: bool = file.read(6).startswith(_COMPRESSION_MAGICS)
+
+    members: list[list[Any]] = []
+    with tarfile.open(root, "r:*") as archive:
+        for member in archive:
+            name: str = member.name.removeprefix("./")
+            if member.isreg() and _is_template_name(name):
+                members.append([name, member.offset_data, member.size, int(member.mtime) * 1_000_000_000])
+
+    _logger.debug("indexed %d members of %s", len(members), root)
+    return {"version": _TAR_INDEX_VERSION, "stamp": stamp, "compressed": compressed, "members": members}
+
+
+def _save_tar_index(root: pathlib.Path, data: dict[str, Any]) -> None:
+    index_path: pathlib.Path = get_tar_index_path(root)
+    temp_path: pathlib.Path = index_path.with_name(f".tmp-{os.getpid()}-{index_path.name}")
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(temp_path, index_path)
+    except OSError as e:
+        temp_path.unlink(missing_ok=True)
+        _logger.warning("cannot save member index of %s: %s", root, e)
+
+
+def load(root: pathlib.Path, *, max_depth: int | None = None, max_entries: int | None = None) -> TemplateArchive | None:
+    """
+    Opens *root* as a template archive, if it is one.
+
+    Args:
+        root (pathlib.Path): Entry of the template search path.
+        max_depth (int | None): See :class:`TemplateArchive`.
+        max_entries (int | None): See :class:`TemplateArchive`.
+
+    Returns:
+        TemplateArchive | None: The archive, or `None` if *root* is not a
+        readable zip or tar archive.
+    """
+    if not root.is_file():
+        return None
+
+    try:
+        if zipfile.is_zipfile(root):
+            return ZipTemplateArchive(root, max_depth=max_depth, max_entries=max_entries)
+        if tarfile.is_tarfile(root):
+            return TarTemplateArchive(root, max_depth=max_depth, max_entries=max_entries)
+    except (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError) as e:
+        _logger.warning("cannot read template archive %s: %s", root, e)
+        return None
+
+    _logger.debug("%s is neither a directory nor a template archive", root)
+    return None
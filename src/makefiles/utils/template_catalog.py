@@ -0,0 +1,548 @@
+"""
+Merged view over the template indexes of several template directories.
+
+Template directories form a search path: earlier roots shadow later ones,
+so a template that exists under the same relative name in several roots
+resolves to the first root that has it. The per-root indexes are
+refreshed concurrently and merged into a compact
+:class:`~makefiles.utils.name_store.NameStore` of template names, with
+the providing root of every name kept in a parallel array, so even
+catalogs with millions of templates stay small in memory.
+
+Partial names are looked up through the trigram index of every root, see
+:mod:`makefiles.utils.trigram_index`, and templates for destination file
+names through a :class:`~makefiles.utils.pattern_index.PatternIndex` built
+from the merged names on first use.
+
+Listings are in natural order (see :mod:`makefiles.utils.natural_order`).
+The order is sorted from the keys cached in the template indexes and then
+cached itself under:
+    $XDG_CACHE_HOME/makefiles-cli/order/<sha1 of the roots>.bin
+
+together with a digest of the names it orders, so listing a page of an
+unchanged catalog neither computes keys nor sorts.
+
+A root that holds a pack file (see :mod:`makefiles.utils.template_pack`)
+is served from its pack instead of its index, including the contents of
+its templates, and so is a root that is a zip or tar archive (see
+:mod:`makefiles.utils.template_archive`). Archive templates can be
+streamed with :meth:`TemplateCatalog.get_opener`, and the archives are
+closed with the catalog.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import hashlib
+import heapq
+import os
+import pathlib
+from array import array
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger
+from types import TracebackType
+from typing import IO, Final
+
+import makefiles.exceptions as exceptions
+import makefiles.utils as utils
+import makefiles.utils.name_cache as name_cache
+import makefiles.utils.natural_order as natural_order
+import makefiles.utils.pattern_index as pattern_index
+import makefiles.utils.template_archive as template_archive
+import makefiles.utils.template_index as template_index
+import makefiles.utils.template_pack as template_pack
+import makefiles.utils.trigram_index as trigram_index
+from makefiles.logger import get_logger
+from makefiles.utils.name_store import NameStore
+
+_logger: Logger = get_logger(__name__)
+
+_FIND_LIMIT: Final[int] = 10
+_UNKNOWN_SIZE: Final[int] = -1  # the template could not be read when its metadata was collected
+_BINARY_LINES: Final[int] = -1
+_ORDER_DIRNAME: Final[str] = "order"
+_ORDER_TYPECODE: Final[str] = "I"
+
+
+class TemplateCatalog:
+    """
+    Precedence-aware union of template indexes.
+
+    Iterating over the catalog yields every visible template name once, in
+    code point order; :meth:`iter_natural` lists them in natural order. Use
+    the catalog as a context manager, or call :meth:`close`, to close the
+    archives it reads templates from.
+
+    Arguments:
+        indexes (list[template_index.TemplateIndex | template_pack.TemplatePack | template_archive.TemplateArchive]):
+            Indexes, packs or archives of the roots, highest precedence first.
+        max_entries (int | None): Maximum number of templates the catalog
+            holds. Beyond it, the first *max_entries* templates in natural
+            order are kept.
+        metadata (bool): Also keep the recorded metadata of every template
+            (see :meth:`iter_metadata`). The indexes must have been refreshed
+            with metadata.
+
+    Attributes:
+        names (NameStore): Every visible template name.
+        truncated (bool): *True* when templates were left out because of
+            *max_entries*, either here or while indexing one of the roots.
+    """
+
+    def __init__(
+        self,
+        indexes: list[template_index.TemplateIndex | template_pack.TemplatePack | template_archive.TemplateArchive],
+        *,
+        max_entries: int | None = None,
+        metadata: bool = False,
+    ) -> None:
+        self.roots: tuple[pathlib.Path, ...] = tuple(index.root for index in indexes)
+        self.truncated: bool = any(index.truncated for index in indexes)
+        # Roots whose templates are read from a single file rather than the directory tree
+        self._bundles: dict[int, template_pack.TemplatePack | template_archive.TemplateArchive] = {
+            root_number: index
+            for root_number, index in enumerate(indexes)
+            if isinstance(index, (template_pack.TemplatePack, template_archive.TemplateArchive))
+        }
+
+        owners: dict[str, int] = {}  # only lives while the catalog is built
+        for root_number, index in enumerate(indexes):
+            for name in index:
+                owners.setdefault(name, root_number)
+
+        if max_entries is not None and len(owners) > max_entries:
+            # Keep the first names of the listing, not the first ones the indexes happened to yield
+            kept: list[str] = heapq.nsmallest(
+                max_entries,
+                owners,
+                key=lambda name: indexes[owners[name]].sort_keys.get(name) or natural_order.sort_key(name),
+            )
+            owners = {name: owners[name] for name in kept}
+            self.truncated = True
+
+        self.names: NameStore = NameStore(owners)
+        self._owners: array[int] = array("H", (owners[name] for name in self.names))
+        self._patterns: pattern_index.PatternIndex | None = None
+        self._order: array[int] | None = None
+        # Only kept until the natural order is known, for the sort keys of the roots
+        self._key_sources: list[
+            template_index.TemplateIndex | template_pack.TemplatePack | template_archive.TemplateArchive
+        ] = indexes
+
+        # Metadata lives in flat arrays aligned with the names, not in a tuple per template
+        self._sizes: array[int] | None = None
+        self._mtimes: array[int] = array("q")
+        self._lines: array[int] = array("q")
+        if metadata:
+            self._sizes = array("q")
+            for name, owner in zip(self.names, self._owners):
+                file_meta: template_index.FileMeta | None = indexes[owner].meta.get(name)
+                if file_meta is None:
+                    file_meta = template_index.FileMeta(_UNKNOWN_SIZE, 0, 0)
+                self._sizes.append(file_meta.size)
+                self._mtimes.append(file_meta.mtime_ns)
+                self._lines.append(_BINARY_LINES if file_meta.lines is None else file_meta.lines)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.names
+
+    def __enter__(self) -> TemplateCatalog:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the archives of the archive roots."""
+        for bundle in self._bundles.values():
+            if isinstance(bundle, template_archive.TemplateArchive):
+                bundle.close()
+
+    def iter_prefix(self, prefix: str) -> Iterator[str]:
+        """
+        Yields the template names that start with *prefix*, in sorted order.
+
+        Args:
+            prefix (str): Leading part of the names, e.g. a directory with a
+                trailing separator.
+
+        Returns:
+            Iterator[str]: Matching template names.
+        """
+        return self.names.iter_prefix(prefix)
+
+    def resolve(self, name: str) -> pathlib.Path | None:
+        """
+        Returns the path of the template *name* in the root that provides it.
+
+        Args:
+            name (str): Relative template name.
+
+        Returns:
+            pathlib.Path | None: Absolute template path, or `None` if no root
+            provides *name*.
+        """
+        try:
+            position: int = self.names.index(name)
+        except ValueError:
+            return None
+
+        return self.roots[self._owners[position]].joinpath(name)
+
+    def read_contents(self, name: str) -> bytes | memoryview | None:
+        """
+        Returns the contents of the template *name* if its root is a pack or archive.
+
+        Args:
+            name (str): Relative template name.
+
+        Returns:
+            bytes | memoryview | None: The contents, or `None` if no root
+            provides *name* or the root that does is a plain directory, whose
+            templates are copied from their paths.
+        """
+        try:
+            position: int = self.names.index(name)
+        except ValueError:
+            return None
+
+        bundle: template_pack.TemplatePack | template_archive.TemplateArchive | None = self._bundles.get(
+            self._owners[position]
+        )
+        return None if bundle is None else bundle.read(name)
+
+    def get_opener(self, name: str) -> Callable[[], contextlib.AbstractContextManager[IO[bytes]]] | None:
+        """
+        Returns a function that opens the template *name* if its root is an archive.
+
+        Archive templates are better streamed than read with
+        :meth:`read_contents`, as they are extracted anyway and need not be
+        held in memory. Pack templates are already mapped in memory.
+
+        Args:
+            name (str): Relative template name.
+
+        Returns:
+            Callable[[], contextlib.AbstractContextManager[IO[bytes]]] | None:
+            Opener for :meth:`template_archive.TemplateArchive.open`, or `None`
+            if no root provides *name* or the root that does is not an archive.
+        """
+        try:
+            position: int = self.names.index(name)
+        except ValueError:
+            return None
+
+        bundle: template_pack.TemplatePack | template_archive.TemplateArchive | None = self._bundles.get(
+            self._owners[position]
+        )
+        if not isinstance(bundle, template_archive.TemplateArchive):
+            return None
+
+        return functools.partial(bundle.open, name)
+
+    def is_bundled(self, root: pathlib.Path) -> bool:
+        """
+        Returns whether the templates of *root* are read from a pack or archive.
+
+        Args:
+            root (pathlib.Path): One of :attr:`roots`.
+
+        Returns:
+            bool: *True* when the templates of *root* come from
+            :meth:`read_contents` rather than from files below *root*.
+        """
+        return any(self.roots[root_number] == root for root_number in self._bundles)
+
+    def get_bundle_files(self) -> dict[pathlib.Path, pathlib.Path]:
+        """
+        Returns the pack or archive file of every root whose templates are read from one.
+
+        Returns:
+            dict[pathlib.Path, pathlib.Path]: Pack or archive file, keyed by
+            root. Plain directories are left out.
+        """
+        return {
+            self.roots[root_number]: (
+                template_pack.get_pack_path(bundle.root)
+                if isinstance(bundle, template_pack.TemplatePack)
+                else bundle.root
+            )
+            for root_number, bundle in self._bundles.items()
+        }
+
+    def iter_sources(self) -> Iterator[tuple[str, pathlib.Path]]:
+        """
+        Yields every template name with the root that provides it, in sorted order.
+
+        Returns:
+            Iterator[tuple[str, pathlib.Path]]: Pairs of template name and root.
+        """
+        for name, owner in zip(self.names, self._owners):
+            yield name, self.roots[owner]
+
+    def natural_order(self) -> array[int]:
+        """
+        Returns the positions of the template names in natural order.
+
+        The order is read from its cache when the catalog holds the same
+        names as when it was cached; otherwise it is sorted from the sort
+        keys recorded in the indexes of the roots and cached again.
+
+        Returns:
+            array[int]: Positions into :attr:`names`, usable with `names[position]`.
+        """
+        if self._order is not None:
+            return self._order
+
+        fingerprint: bytes = hashlib.sha1(self.names.to_bytes()).digest()
+        order_path: pathlib.Path = _get_order_path(self.roots)
+        order: array[int] = array(_ORDER_TYPECODE)
+        try:
+            data: bytes = order_path.read_bytes()
+        except OSError:
+            data = b""
+
+        if data[: len(fingerprint)] == fingerprint and len(data) - len(fingerprint) == len(self) * order.itemsize:
+            order.frombytes(data[len(fingerprint) :])
+        else:
+            keys: list[str] = [
+                self._key_sources[owner].sort_keys.get(name) or natural_order.sort_key(name)
+                for name, owner in zip(self.names, self._owners)
+            ]
+            order.extend(sorted(range(len(keys)), key=keys.__getitem__))
+            _save_order(order_path, fingerprint + order.tobytes())
+
+        self._order = order
+        self._key_sources = []
+        return order
+
+    def _iter_page(self, offset: int, limit: int | None) -> Iterator[tuple[int, str]]:
+        page: array[int] = self.natural_order()[offset : None if limit is None else offset + limit]
+        # A name looked up by position is decoded from the start of its block, so big pages decode all names once
+        names: NameStore | list[str] = list(self.names) if len(page) > len(self) // 8 else self.names
+        for position in page:
+            yield position, names[position]
+
+    def iter_natural(self, *, offset: int = 0, limit: int | None = None) -> Iterator[str]:
+        """
+        Yields the template names in natural order, optionally a page of them.
+
+        Args:
+            offset (int): Number of names skipped at the start.
+            limit (int | None): Maximum number of names yielded.
+
+        Returns:
+            Iterator[str]: Template names.
+        """
+        return (name for _, name in self._iter_page(offset, limit))
+
+    def iter_metadata(
+        self, *, offset: int = 0, limit: int | None = None
+    ) -> Iterator[tuple[str, template_index.FileMeta | None]]:
+        """
+        Yields the template names with their recorded metadata, in natural order.
+
+        Args:
+            offset (int): Number of templates skipped at the start.
+            limit (int | None): Maximum number of templates yielded.
+
+        Returns:
+            Iterator[tuple[str, template_index.FileMeta | None]]: Pairs of
+            template name and metadata; the metadata is `None` for templates
+            that could not be read.
+
+        Raises:
+            ValueError: If the catalog was built without metadata.
+        """
+        if self._sizes is None:
+            raise ValueError("catalog was built without metadata")
+
+        sizes: array[int] = self._sizes
+        for position, name in self._iter_page(offset, limit):
+            size: int = sizes[position]
+            mtime_ns: int = self._mtimes[position]
+            lines: int = self._lines[position]
+            if size == _UNKNOWN_SIZE:
+                yield name, None
+            else:
+                yield name, template_index.FileMeta(size, mtime_ns, None if lines == _BINARY_LINES else lines)
+
+    def match_filename(self, filename: str) -> str | None:
+        """
+        Returns the template that fits a destination file name.
+
+        See :mod:`makefiles.utils.pattern_index` for how names are matched.
+
+        Args:
+            filename (str): Base name of the destination, e.g. `test_cli.py`.
+
+        Returns:
+            str | None: Template name, or `None` if no template fits.
+        """
+        if self._patterns is None:
+            self._patterns = pattern_index.PatternIndex(self.names)
+
+        position: int | None = self._patterns.lookup(filename)
+        return None if position is None else self.names[position]
+
+    def find(self, query: str, *, limit: int = _FIND_LIMIT) -> list[str]:
+        """
+        Looks up the templates whose names fuzzily match a partial name.
+
+        Candidates come from the trigram indexes stored with the names cache
+        of every root (built on the fly for packs and archives) and are ranked with
+        :func:`makefiles.utils.trigram_index.rank`.
+
+        Args:
+            query (str): Partial template name, e.g. `pyscr`.
+            limit (int): Maximum number of candidates returned when the
+                match is ambiguous.
+
+        Returns:
+            list[str]: A single name when one template matches better than
+            all others, otherwise up to *limit* candidates, best first. Empty
+            when nothing matches.
+        """
+        found: set[str] = set()
+        for root_number, root in enumerate(self.roots):
+            bundle: template_pack.TemplatePack | template_archive.TemplateArchive | None = self._bundles.get(
+                root_number
+            )
+            names: NameStore | None = name_cache.load(root) if bundle is None else bundle.names
+            if names is None:
+                _logger.debug("no cached names for %s, skipping it in fuzzy lookup", root)
+                continue
+
+            trigrams: trigram_index.TrigramIndex = (
+                trigram_index.get_trigram_index(root, names) if bundle is None else trigram_index.TrigramIndex(names)
+            )
+            found.update(name for name in trigrams.search(query, names) if name in self.names)
+
+        ranked: list[tuple[int, str]] = trigram_index.rank(query, found)
+        if len(ranked) == 1 or (len(ranked) > 1 and ranked[0][0] < ranked[1][0]):
+            return [ranked[0][1]]
+
+        return [name for _, name in ranked[:limit]]
+
+
+def _get_order_path(roots: tuple[pathlib.Path, ...]) -> pathlib.Path:
+    key: str = hashlib.sha1("\0".join(map(str, roots)).encode("utf-8", "surrogateescape")).hexdigest()
+    return utils.get_cache_dir().joinpath(_ORDER_DIRNAME, f"{key}.bin")
+
+
+def _save_order(order_path: pathlib.Path, data: bytes) -> None:
+    temp_path: pathlib.Path = order_path.with_name(f".tmp-{os.getpid()}-{order_path.name}")
+    try:
+        order_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.write_bytes(data)
+        os.replace(temp_path, order_path)
+    except OSError as e:
+        temp_path.unlink(missing_ok=True)
+        _logger.warning("could not cache template order %s: %s", order_path, e)
+
+
+def _get_index_or_none(
+    root: pathlib.Path, jobs: int, max_depth: int | None, max_entries: int | None, follow_links: bool, metadata: bool
+) -> template_index.TemplateIndex | template_pack.TemplatePack | template_archive.TemplateArchive | None:
+    pack: template_pack.TemplatePack | None = template_pack.load(root, max_depth=max_depth, max_entries=max_entries)
+    if pack is not None and pack.is_current(jobs=jobs):
+        _logger.debug("serving templates of %s from its pack", root)
+        return pack
+    if pack is not None:
+        _logger.warning(
+            "template pack %s is out of date, reading the directory instead; run mkfile --pack-templates again",
+            template_pack.get_pack_path(root),
+        )
+
+    archive: template_archive.TemplateArchive | None = template_archive.load(
+        root, max_depth=max_depth, max_entries=max_entries
+    )
+    if archive is not None:
+        _logger.debug("serving templates of %s from the archive", root)
+        return archive
+
+    try:
+        return template_index.get_index(
+            root,
+            jobs=jobs,
+            max_depth=max_depth,
+            max_entries=max_entries,
+            follow_links=follow_links,
+            metadata=metadata,
+        )
+    except exceptions.InvalidPathError:
+        _logger.debug("skipping missing template directory %s", root)
+        return None
+
+
+def get_catalog(
+    roots: tuple[pathlib.Path, ...],
+    *,
+    jobs: int = 1,
+    max_depth: int | None = None,
+    max_entries: int | None = None,
+    follow_links: bool = False,
+    metadata: bool = False,
+) -> TemplateCatalog:
+    """
+    Refreshes the indexes of all *roots* concurrently and merges them.
+
+    Roots that do not exist are skipped. Archives are served from their
+    file without being revalidated, and so are packed roots whose
+    directories did not change since they were packed. The budgets apply to
+    every root while it is indexed, and *max_entries* also caps the merged
+    catalog.
+
+    Args:
+        roots (tuple[pathlib.Path, ...]): Template directories or archives,
+            highest precedence first.
+        jobs (int): Maximum number of directories revalidated at the same
+            time within each root.
+        max_depth (int | None): Maximum number of path components of a
+            template name.
+        max_entries (int | None): Maximum number of templates; see
+            :attr:`TemplateCatalog.truncated`.
+        follow_links (bool): Descend into symbolic links to directories.
+        metadata (bool): Collect the metadata of templates that have none
+            recorded yet and keep it in the catalog.
+
+    Returns:
+        TemplateCatalog: The merged catalog.
+
+    Raises:
+        ValueError: If *roots* is empty.
+        makefiles.exceptions.InvalidPathError: If none of the roots is a
+            directory or a symlink to a directory.
+    """
+    if not roots:
+        raise ValueError(f"at least 1 root expected. Got {len(roots)}")
+
+    with ThreadPoolExecutor(max_workers=len(roots)) as executor:
+        found: list[
+            template_index.TemplateIndex | template_pack.TemplatePack | template_archive.TemplateArchive | None
+        ] = list(
+            executor.map(
+                lambda root: _get_index_or_none(root, jobs, max_depth, max_entries, follow_links, metadata), roots
+            )
+        )
+
+    indexes: list[template_index.TemplateIndex | template_pack.TemplatePack | template_archive.TemplateArchive] = [
+        index for index in found if index is not None
+    ]
+    if not indexes:
+        raise exceptions.InvalidPathError("none of the template directories is a directory or link to directory")
+
+    return TemplateCatalog(indexes, max_entries=max_entries, metadata=metadata)
@@ -0,0 +1,170 @@
+"""
+Regular expression search over template files, without an index.
+
+Every template is memory-mapped and searched with a compiled bytes
+pattern, so the regex engine runs over the page cache directly instead of
+a Python loop over decoded lines. Templates are searched concurrently by a
+bounded thread pool, which overlaps the filesystem round trips of opening
+and mapping them, and results are produced in the order the templates
+were given as soon as each is done.
+
+Templates served from a pack or archive are searched in memory, from
+the contents the pack or archive returns.
+
+Templates with a NUL byte in their first bytes are treated as binary, like
+:func:`makefiles.utils.template_index.read_metadata` does, and skipped
+before the pattern runs.
+"""
+
+from __future__ import annotations
+
+import itertools
+import mmap
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger
+from typing import Final, NamedTuple
+
+from makefiles.logger import get_logger
+
+_logger: Logger = get_logger(__name__)
+
+_BINARY_PROBE_SIZE: Final[int] = 8 * 1024
+
+
+class LineMatch(NamedTuple):
+    """A line of a template that matches the pattern."""
+
+    number: int
+    line: bytes
+
+
+def compile_pattern(pattern: str) -> re.Pattern[bytes]:
+    """
+    Compiles a pattern given on the command line into a bytes pattern.
+
+    `^` and `$` match at line boundaries.
+
+    Args:
+        pattern (str): Regular expression in Python `re` syntax.
+
+    Returns:
+        re.Pattern[bytes]: The compiled pattern.
+
+    Raises:
+        re.error: If *pattern* is not a valid regular expression.
+    """
+    return re.compile(os.fsencode(pattern), re.MULTILINE)
+
+
+def grep_file(path: str, pattern: re.Pattern[bytes]) -> list[LineMatch]:
+    """
+    Returns the lines of a file that *pattern* matches.
+
+    The file is memory-mapped and searched by :func:`grep_buffer`. Empty and
+    unreadable files have no matching lines.
+
+    Args:
+        path (str): Path to the file.
+        pattern (re.Pattern[bytes]): Compiled pattern.
+
+    Returns:
+        list[LineMatch]: Matching lines without their line terminator, in
+        file order.
+    """
+    try:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return []
+            buffer: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        _logger.debug("cannot map %s for grep: %s", path, e)
+        return []
+
+    with buffer:
+        return grep_buffer(buffer, pattern)
+
+
+def grep_buffer(buffer: bytes | memoryview | mmap.mmap, pattern: re.Pattern[bytes]) -> list[LineMatch]:
+    """
+    Returns the lines of a template's contents that *pattern* matches.
+
+    Each line is reported once, however many matches it holds; a match
+    that spans lines reports the line it starts on. Binary contents have no
+    matching lines.
+
+    Args:
+        buffer (bytes | memoryview | mmap.mmap): Contents of the template.
+        pattern (re.Pattern[bytes]): Compiled pattern.
+
+    Returns:
+        list[LineMatch]: Matching lines without their line terminator, in
+        order.
+    """
+    if isinstance(buffer, memoryview):
+        buffer = buffer.tobytes()  # memoryview has no find() or count()
+    if buffer.find(b"\0", 0, _BINARY_PROBE_SIZE) >= 0:
+        return []
+
+    matches: list[LineMatch] = []
+    line_number: int = 1  # number of the line that holds offset `counted_to`
+    counted_to: int = 0
+    line_end: int = -1
+    for match in pattern.finditer(buffer):
+        start: int = match.start()
+        if start <= line_end:
+            continue  # another match on a line that was already reported
+        if start == len(buffer) and buffer[start - 1] == ord("\n"):
+            break  # an empty match after the final newline is not on a line
+
+        line_number += buffer[counted_to:start].count(b"\n")
+        counted_to = start
+
+        line_end = buffer.find(b"\n", start)
+        if line_end < 0:
+            line_end = len(buffer)
+
+        matches.append(LineMatch(line_number, buffer[buffer.rfind(b"\n", 0, start) + 1 : line_end]))
+
+    return matches
+
+
+def _grep_source(source: str | Callable[[], bytes | memoryview | None], pattern: re.Pattern[bytes]) -> list[LineMatch]:
+    if isinstance(source, str):
+        return grep_file(source, pattern)
+
+    contents: bytes | memoryview | None = source()
+    return [] if contents is None else grep_buffer(contents, pattern)
+
+
+def grep(
+    sources: Iterable[str | Callable[[], bytes | memoryview | None]], pattern: re.Pattern[bytes], *, jobs: int = 1
+) -> Iterator[list[LineMatch]]:
+    """
+    Searches many templates, yielding the matches of each in the given order.
+
+    With *jobs* greater than 1 templates are searched by a thread pool; the
+    matches of a template are yielded as soon as it and all templates
+    before it are done.
+
+    Args:
+        sources (Iterable[str | Callable[[], bytes | memoryview | None]]):
+            Paths to the template files, or, for templates served from a
+            pack or archive, functions that return their contents (`None`
+            when they cannot be read).
+        pattern (re.Pattern[bytes]): Compiled pattern.
+        jobs (int): Maximum number of templates searched at the same time.
+
+    Returns:
+        Iterator[list[LineMatch]]: Matching lines of every template, aligned
+        with *sources*.
+    """
+    if jobs <= 1:
+        for source in sources:
+            yield _grep_source(source, pattern)
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(_grep_source, sources, itertools.repeat(pattern))
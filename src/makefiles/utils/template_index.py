@@ -0,0 +1,606 @@
+"""
+Persistent, incrementally revalidated listing of a template directory.
+
+The index is stored as JSON under:
+    $XDG_CACHE_HOME/makefiles-cli/index/<sha1 of the root path>.json
+
+It records, for every directory of the template tree, the directory's
+mtime together with its non-hidden, non-ignored files and subdirectories,
+plus the contents of the root's `.mkfileignore` file and whether symbolic
+links to directories were followed. Adding, removing or renaming an entry
+updates the mtime of the directory that holds it, so a later run only has
+to `stat` each known directory and rescan the ones whose mtime changed
+instead of walking the whole tree; a changed ignore file or link mode
+discards all records.
+
+The natural sort key of every template (see
+:mod:`makefiles.utils.natural_order`) is recorded as well, so listings are
+ordered without computing a key per name on every run.
+
+On request the index also records the size, mtime and line count of each
+template, and whether it is binary (see :class:`FileMeta`). A template is
+read once to collect them. Afterwards they are only checked again, with a
+`stat`, when the directory that holds the template is rescanned; the index
+watcher drops them when a template is rewritten in place.
+
+Every save also refreshes the directory's names file (see
+:mod:`makefiles.utils.name_cache`), which shell completion reads.
+
+While `mkfile --watch-index` runs for a directory it keeps the index
+current and holds an exclusive lock on `<index>.watch`, marking the file
+ready once its initial scan is done. Readers that see a held, ready lock
+use the cached index as-is, without revalidating it.
+
+Typical usage:
+
+    index = template_index.get_index(templates_dir)
+    for template in index:
+        ...
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger
+from typing import Any, Final, NamedTuple
+
+import makefiles.exceptions as exceptions
+import makefiles.utils as utils
+import makefiles.utils.dirwalker as dirwalker
+import makefiles.utils.ignore as ignore
+import makefiles.utils.name_cache as name_cache
+import makefiles.utils.natural_order as natural_order
+from makefiles.logger import get_logger
+
+_logger: Logger = get_logger(__name__)
+
+_INDEX_VERSION: Final[int] = 5
+_INDEX_DIRNAME: Final[str] = "index"
+_WATCH_LOCK_SUFFIX: Final[str] = ".watch"
+WATCH_READY_MARK: Final[bytes] = b"ready\n"
+
+# Directory mtimes are taken from a coarse kernel clock, so an entry added
+# shortly after a scan can leave the mtime unchanged. Directories modified
+# this recently are recorded as untrusted and rescanned on the next run.
+_RACY_WINDOW_NS: Final[int] = 2_000_000_000
+UNTRUSTED_MTIME: Final[int] = -1
+
+_BINARY_PROBE_SIZE: Final[int] = 8 * 1024  # a NUL byte in this many leading bytes marks a binary file
+_READ_CHUNK_SIZE: Final[int] = 1024 * 1024
+
+# (mtime_ns, file names, subdirectory names)
+DirRecord = tuple[int, list[str], list[str]]
+
+
+class FileMeta(NamedTuple):
+    """Recorded metadata of a single template."""
+
+    size: int
+    mtime_ns: int
+    lines: int | None  # `None` for binary files
+
+    @property
+    def binary(self) -> bool:
+        return self.lines is None
+
+
+def read_metadata(path: str) -> FileMeta | None:
+    """
+    Collects the metadata of a template file.
+
+    A file with a NUL byte in its first `_BINARY_PROBE_SIZE` bytes is
+    treated as binary, like git does, and is not read any further. Text
+    files are read in chunks to count their lines; a last line without a
+    trailing newline counts as a line.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        FileMeta | None: The metadata, or `None` if the file cannot be read.
+    """
+    try:
+        with open(path, "rb") as file:
+            stat_result: os.stat_result = os.fstat(file.fileno())
+            chunk: bytes = file.read(_BINARY_PROBE_SIZE)
+            if b"\0" in chunk:
+                return FileMeta(stat_result.st_size, stat_result.st_mtime_ns, None)
+
+            lines: int = 0
+            last: bytes = b""
+            while chunk:
+                lines += chunk.count(b"\n")
+                last = chunk[-1:]
+                chunk = file.read(_READ_CHUNK_SIZE)
+    except OSError as e:
+        _logger.debug("cannot read metadata of %s: %s", path, e)
+        return None
+
+    if last and last != b"\n":
+        lines += 1
+
+    return FileMeta(stat_result.st_size, stat_result.st_mtime_ns, lines)
+
+
+def get_index_path(root: pathlib.Path) -> pathlib.Path:
+    """
+    Returns the cache file that holds the index of *root*.
+
+    Args:
+        root (pathlib.Path): Template directory the index describes.
+
+    Returns:
+        pathlib.Path: Index file path (not guaranteed to exist yet).
+    """
+    key: str = hashlib.sha1(str(root.absolute()).encode("utf-8", "surrogateescape")).hexdigest()
+    return utils.get_cache_dir().joinpath(_INDEX_DIRNAME, f"{key}.json")
+
+
+def get_watch_lock_path(root: pathlib.Path) -> pathlib.Path:
+    """
+    Returns the lock file held by the index watcher of *root*.
+
+    Args:
+        root (pathlib.Path): Template directory the index describes.
+
+    Returns:
+        pathlib.Path: Lock file path (not guaranteed to exist yet).
+    """
+    index_path: pathlib.Path = get_index_path(root)
+    return index_path.with_name(index_path.name + _WATCH_LOCK_SUFFIX)
+
+
+def is_watched(root: pathlib.Path) -> bool:
+    """
+    Tells whether an index watcher is currently running for *root*.
+
+    Args:
+        root (pathlib.Path): Template directory the index describes.
+
+    Returns:
+        bool: *True* if the watcher lock of *root* is held by a live process
+        that finished its initial scan.
+    """
+    try:
+        with open(get_watch_lock_path(root), "rb") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return lock_file.read(len(WATCH_READY_MARK)) == WATCH_READY_MARK
+    except OSError:
+        return False
+
+    return False
+
+
+class TemplateIndex:
+    """
+    Listing of a template directory, split into one record per directory.
+
+    Iterating over the index yields the relative paths of all non-hidden
+    files, exactly as :func:`makefiles.utils.dirwalker.listf` would return
+    them with the root's `.mkfileignore` patterns applied.
+
+    Arguments:
+        root (pathlib.Path): Template directory the index describes.
+        dirs (dict[str, DirRecord] | None): Known directory records, keyed by
+            their path relative to *root* (`""` for *root* itself).
+        ignore_text (str): Contents of the `.mkfileignore` file the records
+            were scanned with.
+        follow_links (bool): Whether the records were scanned following
+            symbolic links to directories.
+
+    Attributes:
+        truncated (bool): *True* when the last :meth:`refresh` stopped early
+            because the tree holds more files than its entry budget allows.
+        complete (bool): *False* when the last :meth:`refresh` or
+            :meth:`restrict` left directories out because of a depth or
+            entry budget. Such an index is not saved, so the cache files
+            keep describing the whole directory.
+        meta (dict[str, FileMeta]): Recorded metadata, keyed by template
+            name. Templates whose metadata was never collected are missing;
+            see :meth:`update_metadata`.
+        sort_keys (dict[str, str]): Natural sort key of every template,
+            keyed by template name; see :meth:`update_sort_keys`.
+    """
+
+    def __init__(
+        self,
+        root: pathlib.Path,
+        dirs: dict[str, DirRecord] | None = None,
+        ignore_text: str = "",
+        follow_links: bool = False,
+    ) -> None:
+        self.root: pathlib.Path = root.absolute()
+        self.dirs: dict[str, DirRecord] = dirs if dirs is not None else {}
+        self.ignore_text: str = ignore_text
+        self.ignore: ignore.IgnoreMatcher | None = ignore.IgnoreMatcher(ignore_text) or None
+        self.follow_links: bool = follow_links
+        self.meta: dict[str, FileMeta] = {}
+        self.sort_keys: dict[str, str] = {}
+        self.truncated: bool = False
+        self.complete: bool = True
+
+    def __iter__(self) -> Iterator[str]:
+        for reldir, (_, files, _) in self.dirs.items():
+            prefix: str = reldir + os.sep if reldir else ""
+            for name in files:
+                yield prefix + name
+
+    def __len__(self) -> int:
+        return sum(len(files) for _, files, _ in self.dirs.values())
+
+    @classmethod
+    def load(cls, root: pathlib.Path) -> TemplateIndex:
+        """
+        Reads the cached index of *root*.
+
+        A missing, unreadable, corrupt or outdated cache file yields an empty
+        index, which the next :meth:`refresh` fills with a full scan.
+
+        Args:
+            root (pathlib.Path): Template directory the index describes.
+
+        Returns:
+            TemplateIndex: The cached index, possibly empty.
+        """
+        index: TemplateIndex = cls(root)
+        index_path: pathlib.Path = get_index_path(index.root)
+
+        try:
+            with open(index_path, encoding="utf-8") as file:
+                data: Any = json.load(file)
+
+            if data["version"] != _INDEX_VERSION or data["root"] != str(index.root):
+                raise ValueError("index does not match")
+
+            index.dirs = {
+                reldir: (int(mtime_ns), files, subdirs) for reldir, (mtime_ns, files, subdirs) in data["dirs"].items()
+            }
+            index.set_ignore_text(str(data["ignore"]))
+            index.follow_links = bool(data["follow_links"])
+            index.meta = {name: FileMeta(*meta) for name, meta in data["meta"].items()}
+            index.sort_keys = dict(data["sort_keys"])
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            _logger.warning("discarding template index %s: %s", index_path, e)
+            index.dirs = {}
+            index.set_ignore_text("")
+            index.follow_links = False
+            index.meta = {}
+            index.sort_keys = {}
+
+        return index
+
+    def set_ignore_text(self, ignore_text: str) -> None:
+        """
+        Replaces the ignore patterns the index is scanned with.
+
+        Args:
+            ignore_text (str): Contents of a `.mkfileignore` file.
+        """
+        self.ignore_text = ignore_text
+        self.ignore = ignore.IgnoreMatcher(ignore_text) or None
+
+    def save(self) -> None:
+        """
+        Writes the index to its cache file, and the template names to the
+        names file read by shell completion.
+
+        The files are replaced atomically, so concurrent readers never see a
+        partially written index. Failures are logged and otherwise ignored:
+        the cache is an optimisation, not a requirement.
+        """
+        index_path: pathlib.Path = get_index_path(self.root)
+        data: dict[str, Any] = {
+            "version": _INDEX_VERSION,
+            "root": str(self.root),
+            "ignore": self.ignore_text,
+            "follow_links": self.follow_links,
+            "dirs": self.dirs,
+            "meta": self.meta,
+            "sort_keys": self.sort_keys,
+        }
+
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=index_path.parent, prefix=".tmp-", delete=False
+            ) as file:
+                json.dump(data, file, separators=(",", ":"))
+            os.replace(file.name, index_path)
+            name_cache.save(self.root, self)
+        except OSError as e:
+            _logger.warning("could not write template index %s: %s", index_path, e)
+            return
+
+        _logger.debug("saved template index %s (%d directories)", index_path, len(self.dirs))
+
+    def refresh(
+        self,
+        *,
+        jobs: int = 1,
+        max_depth: int | None = None,
+        max_entries: int | None = None,
+        follow_links: bool = False,
+    ) -> bool:
+        """
+        Brings the index up to date with the template directory.
+
+        Every known directory is `stat`-ed once. Directories whose mtime is
+        unchanged reuse their record; new or modified directories are
+        rescanned, and directories that disappeared are dropped. If the
+        root's `.mkfileignore` or *follow_links* changed, every directory is
+        rescanned.
+
+        With *follow_links*, symbolic links to directories are descended
+        into. The `stat` that revalidates a directory also identifies it, so
+        link cycles and subtrees shared by several links cost nothing extra:
+        each directory is recorded once, under the first path that reaches it.
+
+        Directories deeper than *max_depth* are left out of the index, and
+        the walk stops as soon as more than *max_entries* files are known,
+        setting :attr:`truncated`. The index then only covers part of the
+        directory and must not be saved; see :attr:`complete`.
+
+        Args:
+            jobs (int): Maximum number of directories revalidated at the same time.
+            max_depth (int | None): Maximum number of path components of an
+                indexed file.
+            max_entries (int | None): Number of files after which the walk
+                stops.
+            follow_links (bool): Descend into symbolic links to directories.
+
+        Returns:
+            bool: *True* when any record changed and the index should be saved.
+
+        Raises:
+            makefiles.exceptions.InvalidPathError: If the root is not a directory
+                or a symlink to a directory.
+        """
+        if not (utils.isdir(self.root) or utils.islinkd(self.root)):
+            raise exceptions.InvalidPathError("given path is not a directory or link to directory")
+
+        scan_start_ns: int = time.time_ns()
+        known: dict[str, DirRecord] = self.dirs
+
+        ignore_text: str = ignore.read_ignore_file(self.root)
+        ignore_changed: bool = ignore_text != self.ignore_text
+        if ignore_changed:
+            self.set_ignore_text(ignore_text)
+            known = {}
+        links_changed: bool = follow_links != self.follow_links
+        if links_changed:
+            self.follow_links = follow_links
+            known = {}
+        matcher: ignore.IgnoreMatcher | None = self.ignore
+        seen: dirwalker.DirectorySet | None = dirwalker.DirectorySet() if follow_links else None
+
+        def visit(reldir: str) -> tuple[DirRecord | None, list[str]]:
+            dirpath: str = os.path.join(self.root, reldir)
+
+            try:
+                stat_result: os.stat_result = os.stat(dirpath)
+            except OSError:
+                return None, []
+
+            if seen is not None and not seen.add(dirpath, stat_result):
+                return None, []
+
+            mtime_ns: int = stat_result.st_mtime_ns
+
+            record: DirRecord | None = known.get(reldir)
+            if record is not None and record[0] == mtime_ns:
+                return record, record[2]
+
+            files, subdirs = dirwalker.scan(
+                dirpath, prefix=reldir + os.sep if reldir else "", ignore=matcher, follow_links=follow_links
+            )
+            if scan_start_ns - mtime_ns < _RACY_WINDOW_NS:
+                mtime_ns = UNTRUSTED_MTIME
+
+            return (mtime_ns, files, subdirs), subdirs
+
+        changed: bool = ignore_changed or links_changed
+        rescanned: int = 0
+        entries: int = 0
+        dirs: dict[str, DirRecord] = {}
+        self.truncated = False
+
+        for reldir, record in dirwalker.traverse(visit, jobs=jobs, max_depth=max_depth):
+            if record is None:
+                continue
+            if record is not known.get(reldir):
+                rescanned += 1
+                changed = True
+            dirs[reldir] = record
+
+            entries += len(record[1])
+            if max_entries is not None and entries > max_entries:
+                _logger.warning("stopped indexing %s after more than %d templates", self.root, max_entries)
+                self.truncated = True
+                break
+
+        if dirs.keys() != known.keys():
+            changed = True
+
+        _logger.debug("refreshed template index of %s: %d/%d directories rescanned", self.root, rescanned, len(dirs))
+        self.dirs = dirs
+        self.complete = max_depth is None and not self.truncated
+        if self._revalidate_metadata({reldir for reldir, record in dirs.items() if record is not known.get(reldir)}):
+            changed = True
+
+        return changed
+
+    def _revalidate_metadata(self, rescanned: set[str]) -> bool:
+        """
+        Drops the metadata of templates that are gone or may have changed.
+
+        Metadata in directories whose record was reused is kept as is; in
+        *rescanned* directories it is kept only while the size and mtime of
+        the template still match.
+
+        Returns:
+            bool: *True* when any metadata was dropped.
+        """
+        meta: dict[str, FileMeta] = {}
+        files_by_reldir: dict[str, set[str]] = {}
+
+        for name, file_meta in self.meta.items():
+            reldir, _, filename = name.rpartition(os.sep)
+            record: DirRecord | None = self.dirs.get(reldir)
+            if record is None:
+                continue
+
+            if reldir not in files_by_reldir:
+                files_by_reldir[reldir] = set(record[1])
+            if filename not in files_by_reldir[reldir]:
+                continue
+
+            if reldir in rescanned:
+                try:
+                    stat_result: os.stat_result = os.stat(os.path.join(self.root, name))
+                except OSError:
+                    continue
+                if (stat_result.st_size, stat_result.st_mtime_ns) != (file_meta.size, file_meta.mtime_ns):
+                    continue
+
+            meta[name] = file_meta
+
+        dropped: bool = len(meta) != len(self.meta)
+        self.meta = meta
+        return dropped
+
+    def update_metadata(self, *, jobs: int = 1) -> bool:
+        """
+        Collects the metadata of every template that has none yet.
+
+        Args:
+            jobs (int): Maximum number of templates read at the same time.
+
+        Returns:
+            bool: *True* when metadata was added and the index should be saved.
+        """
+        missing: list[str] = [name for name in self if name not in self.meta]
+        if not missing:
+            return False
+
+        paths: list[str] = [os.path.join(self.root, name) for name in missing]
+        if jobs <= 1:
+            found: list[FileMeta | None] = list(map(read_metadata, paths))
+        else:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                found = list(executor.map(read_metadata, paths))
+
+        for name, file_meta in zip(missing, found):
+            if file_meta is not None:
+                self.meta[name] = file_meta
+
+        _logger.debug("collected metadata of %d templates in %s", len(missing), self.root)
+        return True
+
+    def update_sort_keys(self) -> bool:
+        """
+        Records the natural sort key of every template that has none yet, and
+        drops the keys of templates that are gone.
+
+        Returns:
+            bool: *True* when keys were added or dropped and the index should
+            be saved.
+        """
+        names: set[str] = set(self)
+        if self.sort_keys.keys() == names:
+            return False
+
+        self.sort_keys = {
+            name: self.sort_keys[name] if name in self.sort_keys else natural_order.sort_key(name) for name in names
+        }
+        return True
+
+    def restrict(self, *, max_depth: int | None = None, max_entries: int | None = None) -> None:
+        """
+        Applies discovery budgets to an index that is not refreshed.
+
+        Records deeper than *max_depth* are dropped and :attr:`truncated` is
+        set when more than *max_entries* files remain, giving the same result
+        as a budgeted :meth:`refresh` without touching the template directory.
+
+        Args:
+            max_depth (int | None): Maximum number of path components of an
+                indexed file.
+            max_entries (int | None): Number of files the index may hold.
+        """
+        if max_depth is not None:
+            self.dirs = {
+                reldir: record
+                for reldir, record in self.dirs.items()
+                if not reldir or reldir.count(os.sep) + 1 < max_depth
+            }
+
+        self.truncated = max_entries is not None and len(self) > max_entries
+        self.complete = max_depth is None and not self.truncated
+
+
+def get_index(
+    root: pathlib.Path,
+    *,
+    jobs: int = 1,
+    max_depth: int | None = None,
+    max_entries: int | None = None,
+    follow_links: bool = False,
+    metadata: bool = False,
+) -> TemplateIndex:
+    """
+    Returns an up-to-date index of *root*, updating its cache files if needed.
+
+    When an index watcher is running for *root*, the cached index is already
+    current and is returned without touching the template directory, unless
+    it was built with a different *follow_links* mode.
+
+    Args:
+        root (pathlib.Path): Template directory to index.
+        jobs (int): Maximum number of directories revalidated at the same time.
+        max_depth (int | None): Maximum number of path components of an
+            indexed file.
+        max_entries (int | None): Number of files after which indexing stops;
+            see :attr:`TemplateIndex.truncated`.
+        follow_links (bool): Descend into symbolic links to directories.
+        metadata (bool): Make sure :attr:`TemplateIndex.meta` covers every
+            template, reading the templates that have no metadata yet.
+
+    Returns:
+        TemplateIndex: The refreshed index.
+
+    Raises:
+        makefiles.exceptions.InvalidPathError: If *root* is not a directory
+            or a symlink to a directory.
+    """
+    index: TemplateIndex = TemplateIndex.load(root)
+
+    if index.dirs and index.follow_links == follow_links and is_watched(index.root):
+        _logger.debug("using watched template index of %s", index.root)
+        index.restrict(max_depth=max_depth, max_entries=max_entries)
+        if metadata:
+            index.update_metadata(jobs=jobs)  # the watcher keeps metadata current, so this rarely reads anything
+        index.update_sort_keys()
+        return index
+
+    changed: bool = index.refresh(jobs=jobs, max_depth=max_depth, max_entries=max_entries, follow_links=follow_links)
+    if metadata and index.update_metadata(jobs=jobs):
+        changed = True
+    if index.update_sort_keys():
+        changed = True
+    # A budgeted walk left directories out; saving it would drop them from the cache and from shell completion
+    if index.complete and (changed or not name_cache.get_names_path(index.root).exists()):
+        index.save()
+
+    return index
@@ -0,0 +1,211 @@
+"""
+Local read-through mirror of a slow template directory.
+
+When the templates directory lives on NFS, sshfs or a similar filesystem,
+every template that is copied costs network round trips. With
+`MKFILE_MIRROR_TTL` set, templates are copied from a local mirror under:
+    $XDG_CACHE_HOME/makefiles-cli/mirror/<sha1 of the directory path>/
+
+and only fetched from the templates directory when they are missing from
+the mirror or their size or mtime changed. The size and mtime of every
+mirrored template, and when they were last compared, are kept next to the
+mirror in `<sha1 of the directory path>.json`.
+
+`MKFILE_MIRROR_TTL` is a number of seconds: a mirrored template that was
+compared less than that long ago is used without even a `stat` of the
+original, so `0` compares on every use. The mirror is a cache; removing
+it is always safe.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import time
+from logging import Logger
+from typing import Any, Final
+
+import makefiles.utils as utils
+from makefiles.logger import get_logger
+
+_logger: Logger = get_logger(__name__)
+
+_MIRROR_DIRNAME: Final[str] = "mirror"
+_TTL_VARIABLE: Final[str] = "MKFILE_MIRROR_TTL"
+_STATE_VERSION: Final[int] = 1
+
+
+def get_ttl() -> float | None:
+    """
+    Returns the mirror TTL configured through `MKFILE_MIRROR_TTL`.
+
+    Returns:
+        float | None: Seconds a compared template is trusted without
+        comparing it again, or `None` if mirroring is disabled because the
+        variable is unset, empty or not a non-negative number.
+    """
+    value: str = os.environ.get(_TTL_VARIABLE, "").strip()
+    if not value:
+        return None
+
+    try:
+        ttl: float = float(value)
+    except ValueError:
+        ttl = -1.0
+    if not ttl >= 0:  # also rejects nan
+        _logger.warning("ignoring %s=%s, expected a number of seconds", _TTL_VARIABLE, value)
+        return None
+
+    return ttl
+
+
+def get_mirror_dir(root: pathlib.Path) -> pathlib.Path:
+    """
+    Returns the directory that mirrors the template directory *root*.
+
+    Args:
+        root (pathlib.Path): Template directory.
+
+    Returns:
+        pathlib.Path: Mirror directory (not guaranteed to exist yet).
+    """
+    key: str = hashlib.sha1(str(root.absolute()).encode("utf-8", "surrogateescape")).hexdigest()
+    return utils.get_cache_dir().joinpath(_MIRROR_DIRNAME, key)
+
+
+def _get_state_path(root: pathlib.Path) -> pathlib.Path:
+    mirror_dir: pathlib.Path = get_mirror_dir(root)
+    return mirror_dir.with_name(f"{mirror_dir.name}.json")
+
+
+def _load_state(root: pathlib.Path) -> dict[str, list[Any]]:
+    try:
+        with open(_get_state_path(root), "rb") as file:
+            data: Any = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(data, dict) or data.get("version") != _STATE_VERSION:
+        return {}
+
+    templates: Any = data.get("templates")
+    if not isinstance(templates, dict):
+        return {}
+
+    return {name: stamp for name, stamp in templates.items() if isinstance(stamp, list) and len(stamp) == 3}
+
+
+def _save_state(root: pathlib.Path, templates: dict[str, list[Any]]) -> None:
+    state_path: pathlib.Path = _get_state_path(root)
+    temp_path: pathlib.Path = state_path.with_name(f".tmp-{os.getpid()}-{state_path.name}")
+    try:
+        temp_path.write_text(
+            json.dumps({"version": _STATE_VERSION, "templates": templates}, separators=(",", ":")), encoding="utf-8"
+        )
+        os.replace(temp_path, state_path)
+    except OSError as e:
+        temp_path.unlink(missing_ok=True)
+        _logger.warning("cannot save template mirror state of %s: %s", root, e)
+
+
+def _stamp(path: pathlib.Path | str) -> tuple[int, int] | None:
+    try:
+        stat_result: os.stat_result = os.stat(path)
+    except OSError:
+        return None
+
+    return stat_result.st_size, stat_result.st_mtime_ns
+
+
+def _is_safe_name(name: str) -> bool:
+    return not (os.path.isabs(name) or os.pardir in pathlib.PurePath(name).parts)
+
+
+def _lookup(root: pathlib.Path, name: str, templates: dict[str, list[Any]], ttl: float) -> pathlib.Path | None:
+    mirrored: pathlib.Path = get_mirror_dir(root).joinpath(name)
+    recorded: list[Any] | None = templates.get(name)
+    if recorded is None or _stamp(mirrored) != tuple(recorded[:2]) or not time.time() - recorded[2] < ttl:
+        return None
+
+    _logger.debug("using mirrored %s without checking %s", name, root)
+    return mirrored
+
+
+def lookup(root: pathlib.Path, name: str, *, ttl: float) -> pathlib.Path | None:
+    """
+    Returns the mirrored copy of the template *name* of *root* if it is trusted.
+
+    Only the mirror is read, never *root*, so a caller can skip the
+    templates directory altogether while the TTL lasts.
+
+    Args:
+        root (pathlib.Path): Template directory.
+        name (str): Relative template name.
+        ttl (float): Seconds a compared copy is trusted without a `stat`
+            of the original.
+
+    Returns:
+        pathlib.Path | None: Path of the mirrored copy, or `None` if *name*
+        is not mirrored or was compared *ttl* or more seconds ago.
+    """
+    if not _is_safe_name(name):
+        return None
+
+    return _lookup(root, name, _load_state(root), ttl)
+
+
+def fetch(root: pathlib.Path, name: str, *, ttl: float = 0.0) -> pathlib.Path | None:
+    """
+    Returns a fresh local copy of the template *name* of *root*.
+
+    The mirrored copy is used as is when it was compared with the original
+    less than *ttl* seconds ago. Otherwise the original is `stat`-ed and
+    copied again only if its size or mtime differ from the mirrored copy.
+
+    Args:
+        root (pathlib.Path): Template directory.
+        name (str): Relative template name.
+        ttl (float): Seconds a compared copy is trusted without a `stat`
+            of the original.
+
+    Returns:
+        pathlib.Path | None: Path of the mirrored copy, or `None` if the
+        template does not exist or cannot be mirrored; read the original
+        then.
+    """
+    if not _is_safe_name(name):
+        return None
+
+    templates: dict[str, list[Any]] = _load_state(root)
+    trusted: pathlib.Path | None = _lookup(root, name, templates, ttl)
+    if trusted is not None:
+        return trusted
+
+    mirrored: pathlib.Path = get_mirror_dir(root).joinpath(name)
+    local: tuple[int, int] | None = _stamp(mirrored)
+    now: float = time.time()
+    original: str = os.path.join(root, name)
+    remote: tuple[int, int] | None = _stamp(original)
+    if remote is None:
+        return None
+
+    if local != remote:
+        temp_path: pathlib.Path = mirrored.with_name(f".tmp-{os.getpid()}-{mirrored.name}")
+        try:
+            mirrored.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(original, temp_path)  # keeps the mtime the copy is compared by
+            os.replace(temp_path, mirrored)
+        except OSError as e:
+            temp_path.unlink(missing_ok=True)
+            _logger.warning("cannot mirror %s, reading it from %s: %s", name, root, e)
+            return None
+
+        remote = _stamp(mirrored) or remote
+        _logger.debug("mirrored %s of %s", name, root)
+
+    templates[name] = [*remote, now]
+    _save_state(root, templates)
+    return mirrored
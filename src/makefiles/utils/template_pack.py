@@ -0,0 +1,440 @@
+"""
+Single-file snapshot of a template directory.
+
+`mkfile --pack-templates` stores every template of a directory, with its
+name and metadata, in one file inside that directory:
+    <templates dir>/.mkfile.pack
+
+While the pack exists, the directory is listed from it and templates are
+copied out of it, so a run opens and maps a single file instead of
+walking the tree and opening every template. On network home directories,
+where each open and `stat` is a round trip, that is one sequential read
+instead of thousands. Being a hidden file, the pack itself is never listed
+as a template.
+
+The pack also records the mtime of every directory it was built from.
+Those directories are `stat`-ed before the pack is used, as revalidating a
+template index would, and when a template was added, removed or renamed
+since, the pack is out of date and the directory is read instead until it
+is packed again (see :meth:`TemplatePack.is_current`). Templates edited in
+place keep their packed contents until then.
+
+The file holds, in the machine's native byte order:
+    header      magic, number of templates, size of the names block,
+                number of directories, size of the directory names block
+    names       a serialised :class:`~makefiles.utils.name_store.NameStore`
+    dir names   a serialised :class:`~makefiles.utils.name_store.NameStore`
+                of the directories, relative to the template directory
+    entries     offset, size, mtime and line count (-1 for binary) of
+                every template, in name order, as 64-bit integers
+    dir mtimes  mtime of every directory, in directory name order, as
+                64-bit integers
+    contents    the templates, back to back
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import pathlib
+import shutil
+import struct
+import tempfile
+from array import array
+from collections import deque
+from collections.abc import Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property
+from logging import Logger
+from typing import Final
+
+import makefiles.exceptions as exceptions
+import makefiles.utils.natural_order as natural_order
+import makefiles.utils.template_index as template_index
+from makefiles.logger import get_logger
+from makefiles.utils.name_store import NameStore
+
+_logger: Logger = get_logger(__name__)
+
+PACK_FILENAME: Final[str] = ".mkfile.pack"
+
+_MAGIC: Final[bytes] = b"MKP2"
+# magic, templates, names block size, directories, directory names block size
+_HEADER: Final[struct.Struct] = struct.Struct("=4s4xQQQQ")
+_MTIME: Final[struct.Struct] = struct.Struct("=q")
+_ENTRY_FIELDS: Final[int] = 4  # offset, size, mtime_ns, lines
+_ALIGNMENT: Final[int] = 8
+_BINARY_LINES: Final[int] = -1
+_BINARY_PROBE_SIZE: Final[int] = 8 * 1024
+_COPY_CHUNK_SIZE: Final[int] = 1024 * 1024
+
+
+def get_pack_path(root: pathlib.Path) -> pathlib.Path:
+    """
+    Returns the pack file of the template directory *root*.
+
+    Args:
+        root (pathlib.Path): Template directory.
+
+    Returns:
+        pathlib.Path: Pack file path (not guaranteed to exist).
+    """
+    return root.joinpath(PACK_FILENAME)
+
+
+def _padding(size: int) -> int:
+    return -size % _ALIGNMENT
+
+
+class TemplatePack:
+    """
+    Templates of a directory, served from its pack file.
+
+    Iterating over the pack yields the template names in sorted order,
+    leaving out those deeper than *max_depth*, so a pack can stand in for
+    a :class:`~makefiles.utils.template_index.TemplateIndex`.
+
+    Arguments:
+        root (pathlib.Path): Template directory the pack belongs to.
+        names (NameStore): Names of the packed templates.
+        entries (array[int] | memoryview): `_ENTRY_FIELDS` integers per
+            template, in name order.
+        contents (bytes | memoryview): Contents of all templates.
+        dirs (NameStore): Directories the pack was built from, relative to
+            *root* (`""` for *root* itself).
+        dir_mtimes (array[int] | memoryview): mtime of every directory of
+            *dirs*, in the same order.
+        max_depth (int | None): Maximum number of path components of a
+            listed template.
+        max_entries (int | None): Number of templates the directory may
+            hold; see :attr:`truncated`.
+
+    Attributes:
+        truncated (bool): *True* when more than *max_entries* templates
+            are listed.
+    """
+
+    def __init__(
+        self,
+        root: pathlib.Path,
+        names: NameStore,
+        entries: array[int] | memoryview,
+        contents: bytes | memoryview,
+        *,
+        dirs: NameStore | None = None,
+        dir_mtimes: array[int] | memoryview | None = None,
+        max_depth: int | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self.root: pathlib.Path = root.absolute()
+        self.names: NameStore = names
+        self.dirs: NameStore = NameStore() if dirs is None else dirs
+        self._entries: array[int] | memoryview = entries
+        self._contents: bytes | memoryview = contents
+        self._dir_mtimes: array[int] | memoryview = array("q") if dir_mtimes is None else dir_mtimes
+        self._max_depth: int | None = max_depth
+        self.truncated: bool = max_entries is not None and sum(1 for _ in self) > max_entries
+
+    def __iter__(self) -> Iterator[str]:
+        if self._max_depth is None:
+            return iter(self.names)
+
+        return (name for name in self.names if name.count(os.sep) < self._max_depth)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @cached_property
+    def meta(self) -> dict[str, template_index.FileMeta]:
+        """Recorded metadata of every packed template, keyed by name."""
+        meta: dict[str, template_index.FileMeta] = {}
+        for position, name in enumerate(self.names):
+            _, size, mtime_ns, lines = self._entries[position * _ENTRY_FIELDS : (position + 1) * _ENTRY_FIELDS]
+            meta[name] = template_index.FileMeta(size, mtime_ns, None if lines == _BINARY_LINES else lines)
+
+        return meta
+
+    @cached_property
+    def sort_keys(self) -> dict[str, str]:
+        """Natural sort key of every template, computed on first use."""
+        return {name: natural_order.sort_key(name) for name in self.names}
+
+    def is_current(self, *, jobs: int = 1) -> bool:
+        """
+        Returns whether the directories of the pack are unchanged since it was written.
+
+        Every recorded directory is `stat`-ed, *jobs* at a time.
+
+        Args:
+            jobs (int): Maximum number of directories checked at the same time.
+
+        Returns:
+            bool: *False* when a directory was modified or removed, so
+            templates may have been added, removed or renamed.
+        """
+        paths: list[str] = [os.path.join(self.root, reldir) for reldir in self.dirs]
+        if jobs <= 1 or len(paths) <= 1:
+            mtimes: list[int | None] = list(map(_get_mtime_ns, paths))
+        else:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                mtimes = list(executor.map(_get_mtime_ns, paths))
+
+        return all(mtime_ns == recorded for mtime_ns, recorded in zip(mtimes, self._dir_mtimes))
+
+    def read(self, name: str) -> bytes | memoryview | None:
+        """
+        Returns the contents of a packed template without copying them.
+
+        Args:
+            name (str): Relative template name.
+
+        Returns:
+            bytes | memoryview | None: The contents, or `None` if *name* is
+            not packed.
+        """
+        try:
+            position: int = self.names.index(name)
+        except ValueError:
+            return None
+
+        offset: int = self._entries[position * _ENTRY_FIELDS]
+        return self._contents[offset : offset + self._entries[position * _ENTRY_FIELDS + 1]]
+
+    @classmethod
+    def from_buffer(
+        cls,
+        root: pathlib.Path,
+        buffer: bytes | memoryview | mmap.mmap,
+        *,
+        max_depth: int | None = None,
+        max_entries: int | None = None,
+    ) -> TemplatePack:
+        """
+        Serves a pack from its serialised form, without copying the contents.
+
+        Args:
+            root (pathlib.Path): Template directory the pack belongs to.
+            buffer (bytes | memoryview | mmap.mmap): Contents of a pack file.
+            max_depth (int | None): See :class:`TemplatePack`.
+            max_entries (int | None): See :class:`TemplatePack`.
+
+        Returns:
+            TemplatePack: The pack.
+
+        Raises:
+            ValueError: If *buffer* is not a pack.
+        """
+        view: memoryview = memoryview(buffer)
+        try:
+            magic, count, names_size, dir_count, dir_names_size = _HEADER.unpack_from(view)
+        except struct.error:
+            raise ValueError("truncated pack header") from None
+        if magic != _MAGIC:
+            raise ValueError("not a template pack")
+
+        names_end: int = _HEADER.size + names_size
+        dir_names_end: int = names_end + dir_names_size
+        entries_start: int = dir_names_end + _padding(dir_names_end)
+        dir_mtimes_start: int = entries_start + count * _ENTRY_FIELDS * array("q").itemsize
+        contents_start: int = dir_mtimes_start + dir_count * _MTIME.size
+        if len(view) < contents_start:
+            raise ValueError("truncated template pack")
+
+        names: NameStore = NameStore.from_bytes(bytes(view[_HEADER.size : names_end]))
+        dirs: NameStore = NameStore.from_bytes(bytes(view[names_end:dir_names_end]))
+        entries: memoryview = view[entries_start:dir_mtimes_start].cast("q")
+        contents: memoryview = view[contents_start:]
+        if (
+            len(names) != count
+            or len(dirs) != dir_count
+            or any(
+                entries[position] + entries[position + 1] > len(contents)
+                for position in range(0, len(entries), _ENTRY_FIELDS)
+            )
+        ):
+            raise ValueError("corrupt template pack")
+
+        return cls(
+            root,
+            names,
+            entries,
+            contents,
+            dirs=dirs,
+            dir_mtimes=view[dir_mtimes_start:contents_start].cast("q"),
+            max_depth=max_depth,
+            max_entries=max_entries,
+        )
+
+
+def load(root: pathlib.Path, *, max_depth: int | None = None, max_entries: int | None = None) -> TemplatePack | None:
+    """
+    Maps the pack of *root*, if it has one.
+
+    Args:
+        root (pathlib.Path): Template directory.
+        max_depth (int | None): See :class:`TemplatePack`.
+        max_entries (int | None): See :class:`TemplatePack`.
+
+    Returns:
+        TemplatePack | None: The pack, or `None` if *root* has no readable
+        pack and should be read directly.
+    """
+    pack_path: pathlib.Path = get_pack_path(root)
+    try:
+        with open(pack_path, "rb") as file:
+            buffer: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    except (OSError, ValueError) as e:
+        _logger.warning("cannot read template pack %s, reading the directory instead: %s", pack_path, e)
+        return None
+
+    try:
+        return TemplatePack.from_buffer(root, buffer, max_depth=max_depth, max_entries=max_entries)
+    except ValueError as e:
+        _logger.warning("ignoring template pack %s: %s", pack_path, e)
+        return None
+
+
+def _get_mtime_ns(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_template(path: str) -> tuple[bytes, int] | None:
+    try:
+        with open(path, "rb") as file:
+            return file.read(), os.fstat(file.fileno()).st_mtime_ns
+    except OSError as e:
+        _logger.warning("leaving %s out of the template pack: %s", path, e)
+        return None
+
+
+def _read_templates(paths: Sequence[str], jobs: int) -> Iterator[tuple[bytes, int] | None]:
+    """
+    Reads *paths* in order, *jobs* at a time, keeping at most twice *jobs* templates in memory.
+
+    Args:
+        paths (Sequence[str]): Template paths.
+        jobs (int): Maximum number of templates read at the same time.
+
+    Returns:
+        Iterator[tuple[bytes, int] | None]: Contents and mtime of every template, or `None` for
+        templates that cannot be read.
+    """
+    if jobs <= 1:
+        yield from map(_read_template, paths)
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending: deque[Future[tuple[bytes, int] | None]] = deque()
+        for path in paths:
+            pending.append(executor.submit(_read_template, path))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_pack(
+    root: pathlib.Path,
+    *,
+    jobs: int = 1,
+    max_depth: int | None = None,
+    max_entries: int | None = None,
+    follow_links: bool = False,
+) -> int:
+    """
+    Packs the templates of *root* into its pack file, replacing any previous pack.
+
+    The templates are listed from the template index of *root*, never from
+    an existing pack, and read *jobs* at a time. Each template is written
+    out as soon as it is read, so only a few templates are held in memory
+    however large the directory is. Templates that cannot be read are left
+    out. The pack is replaced atomically, so concurrent runs see either the
+    old or the new pack. The mtimes of the directories are taken from the
+    index where it trusts them, and `stat`-ed otherwise. *root* changes
+    when the pack is written, so its mtime is recorded afterwards.
+
+    Args:
+        root (pathlib.Path): Template directory.
+        jobs (int): Maximum number of directories revalidated and templates
+            read at the same time.
+        max_depth (int | None): Maximum number of path components of a
+            packed template.
+        max_entries (int | None): Maximum number of templates.
+        follow_links (bool): Descend into symbolic links to directories.
+
+    Returns:
+        int: Number of packed templates.
+
+    Raises:
+        makefiles.exceptions.InvalidPathError: If *root* is not a directory
+            or a symlink to a directory.
+        makefiles.exceptions.EntryLimitExceededError: If *root* holds more
+            than *max_entries* templates. Nothing is written then.
+        makefiles.exceptions.TemplatePackError: If the pack cannot be written.
+    """
+    index: template_index.TemplateIndex = template_index.get_index(
+        root, jobs=jobs, max_depth=max_depth, max_entries=max_entries, follow_links=follow_links
+    )
+    if index.truncated:
+        raise exceptions.EntryLimitExceededError(f"more than {max_entries} templates found in {root}")
+
+    candidates: list[str] = sorted(index, key=lambda name: name.encode("utf-8", "surrogateescape"))
+    paths: list[str] = [os.path.join(root, name) for name in candidates]
+
+    dirs: NameStore = NameStore(index.dirs)
+    dir_mtimes: array[int] = array("q")
+    for reldir in dirs:
+        mtime_ns: int | None = index.dirs[reldir][0]
+        if mtime_ns == template_index.UNTRUSTED_MTIME:
+            mtime_ns = _get_mtime_ns(os.path.join(root, reldir))
+        dir_mtimes.append(template_index.UNTRUSTED_MTIME if mtime_ns is None else mtime_ns)
+
+    pack_path: pathlib.Path = get_pack_path(root)
+    temp_path: pathlib.Path = pack_path.with_name(f".tmp-{os.getpid()}-{pack_path.name}")
+    packed: list[str] = []
+    try:
+        # The names and entries precede the contents, but are only known once every template has been read,
+        # so the contents are spooled to an anonymous file and appended after them.
+        with tempfile.TemporaryFile() as contents, open(temp_path, "wb") as file:
+            entries: array[int] = array("q")
+            offset: int = 0
+            for name, template in zip(candidates, _read_templates(paths, jobs)):
+                if template is None:
+                    continue
+
+                data, mtime_ns = template
+                lines: int = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+                binary: bool = b"\0" in data[:_BINARY_PROBE_SIZE]
+                entries.extend((offset, len(data), mtime_ns, _BINARY_LINES if binary else lines))
+                contents.write(data)
+                offset += len(data)
+                packed.append(name)
+
+            names_block: bytes = NameStore(packed).to_bytes()
+            dirs_block: bytes = dirs.to_bytes()
+            header: bytes = _HEADER.pack(_MAGIC, len(packed), len(names_block), len(dirs), len(dirs_block))
+            file.write(header + names_block + dirs_block)
+            file.write(bytes(_padding(len(header) + len(names_block) + len(dirs_block))))
+            file.write(entries.tobytes())
+            dir_mtimes_offset: int = file.tell()
+            file.write(dir_mtimes.tobytes())
+            contents.seek(0)
+            shutil.copyfileobj(contents, file, _COPY_CHUNK_SIZE)
+        os.replace(temp_path, pack_path)
+
+        # Writing the pack modified root, so its mtime is only known now
+        if "" in dirs:
+            with open(pack_path, "r+b") as file:
+                file.seek(dir_mtimes_offset + dirs.index("") * _MTIME.size)
+                file.write(_MTIME.pack(os.stat(root).st_mtime_ns))
+    except OSError as e:
+        temp_path.unlink(missing_ok=True)
+        raise exceptions.TemplatePackError(f"cannot write template pack {pack_path}: {e}") from None
+
+    _logger.info("packed %d templates of %s into %s", len(packed), root, pack_path)
+    return len(packed)
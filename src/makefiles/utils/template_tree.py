@@ -0,0 +1,69 @@
+"""
+Directory tree rendering of a template catalog.
+
+The tree is drawn straight from the catalog's
+:class:`~makefiles.utils.name_store.NameStore`: the entries of a directory
+are its completions (:meth:`~makefiles.utils.name_store.NameStore.iter_completions`),
+which skip over whole subdirectories, and the number of templates below a
+directory is the size of its prefix range
+(:meth:`~makefiles.utils.name_store.NameStore.count_prefix`). Neither the
+template directories nor the individual names are split or walked, and
+lines are produced branch by branch, so the first lines of a huge catalog
+appear immediately.
+
+Entries of every directory are listed in natural order, like `--list`.
+
+Example output:
+
+    . (4)
+    ├── Dockerfile
+    └── python/ (3)
+        ├── cli/ (1)
+        │   └── main.py
+        ├── script2.py
+        └── script10.py
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Final
+
+import makefiles.utils.natural_order as natural_order
+from makefiles.utils.name_store import NameStore
+
+_BRANCH: Final[str] = "├── "
+_LAST_BRANCH: Final[str] = "└── "
+_PIPE: Final[str] = "│   "
+_SPACE: Final[str] = "    "
+
+
+def _iter_branch(names: NameStore, prefix: str, indent: str) -> Iterator[str]:
+    entries: list[str] = natural_order.sort(names.iter_completions(prefix))
+    for number, entry in enumerate(entries, start=1):
+        last: bool = number == len(entries)
+        label: str = entry[len(prefix) :]
+        connector: str = _LAST_BRANCH if last else _BRANCH
+        if not entry.endswith("/"):
+            yield f"{indent}{connector}{label}"
+            continue
+
+        yield f"{indent}{connector}{label} ({names.count_prefix(entry)})"
+        yield from _iter_branch(names, entry, indent + (_SPACE if last else _PIPE))
+
+
+def iter_tree(names: NameStore) -> Iterator[str]:
+    """
+    Yields the lines of the directory tree of *names*.
+
+    The first line stands for the template search path and, like every
+    directory line, carries the number of templates below it.
+
+    Args:
+        names (NameStore): Template names, as `/`-separated relative paths.
+
+    Returns:
+        Iterator[str]: Lines without line terminators.
+    """
+    yield f". ({len(names)})"
+    yield from _iter_branch(names, "", "")
@@ -0,0 +1,309 @@
+"""
+Trigram index for fuzzy template name lookups.
+
+Every template name is case-folded and split into the overlapping 3-byte
+sequences of its UTF-8 encoding. The index maps each trigram to the sorted
+positions (in a :class:`~makefiles.utils.name_store.NameStore`) of the
+names containing it, so the names that contain every trigram of a query
+are found by intersecting a few short posting lists, starting from the
+rarest, instead of scanning the whole catalog.
+
+The index of a template directory is built the first time it is needed
+and stored next to the directory's names file:
+    $XDG_CACHE_HOME/makefiles-cli/names/<crc32 of the root path>.trigrams
+
+stamped with the size and mtime of the names file it was built from. The
+stored index is memory-mapped, so a lookup only touches the posting lists
+it reads.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import pathlib
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from logging import Logger
+from typing import Final, TypeAlias
+
+import makefiles.utils.name_cache as name_cache
+from makefiles.logger import get_logger
+from makefiles.utils.name_store import NameStore
+
+_logger: Logger = get_logger(__name__)
+
+_MAGIC: Final[bytes] = b"MKT1"
+_HEADER: Final[struct.Struct] = struct.Struct("=4s4xQQ")  # magic, trigrams, postings
+_STAMP: Final[struct.Struct] = struct.Struct("=QQ")  # size and mtime_ns of the names file
+_TRIGRAMS_SUFFIX: Final[str] = ".trigrams"
+
+_IntBuffer: TypeAlias = "array[int] | memoryview"  # built in memory, or cast from a mapped file
+
+# Match tiers, best first. Names of a better tier always rank higher.
+_TIER_EXACT: Final[int] = 0  # the file name, with or without extension, is the query
+_TIER_PREFIX: Final[int] = 1  # the file name starts with the query
+_TIER_SUBSTRING: Final[int] = 2  # the file name contains the query
+_TIER_PATH_SUBSTRING: Final[int] = 3  # the relative path contains the query
+_TIER_SUBSEQUENCE: Final[int] = 4  # the query's characters appear in order in the file name
+_TIER_PATH_SUBSEQUENCE: Final[int] = 5  # the query's characters appear in order in the path
+
+
+def _fold(text: str) -> bytes:
+    return text.lower().encode("utf-8", "surrogateescape")
+
+
+def _trigrams(key: bytes) -> set[int]:
+    return {int.from_bytes(key[index : index + 3], "big") for index in range(len(key) - 2)}
+
+
+def _is_subsequence(needle: str, haystack: str) -> bool:
+    characters = iter(haystack)
+    return all(character in characters for character in needle)
+
+
+def match_tier(query: str, name: str) -> int | None:
+    """
+    Classifies how well *name* matches *query*, ignoring case.
+
+    Args:
+        query (str): Partial template name.
+        name (str): Relative template name.
+
+    Returns:
+        int | None: Match tier, lower is better, or `None` if the characters
+        of *query* do not appear in *name* in order.
+    """
+    query = query.lower()
+    path: str = name.lower()
+    filename: str = path.rsplit("/", 1)[-1]
+
+    if query in (filename, filename.split(".", 1)[0]):
+        return _TIER_EXACT
+    if filename.startswith(query):
+        return _TIER_PREFIX
+    if query in filename:
+        return _TIER_SUBSTRING
+    if query in path:
+        return _TIER_PATH_SUBSTRING
+    if _is_subsequence(query, filename):
+        return _TIER_SUBSEQUENCE
+    if _is_subsequence(query, path):
+        return _TIER_PATH_SUBSEQUENCE
+
+    return None
+
+
+def rank(query: str, names: Iterable[str]) -> list[tuple[int, str]]:
+    """
+    Orders the names matching *query* from best to worst.
+
+    Names are ordered by match tier, then shorter names first, then
+    alphabetically. Names that do not match are dropped.
+
+    Args:
+        query (str): Partial template name.
+        names (Iterable[str]): Candidate template names.
+
+    Returns:
+        list[tuple[int, str]]: `(tier, name)` pairs, best first.
+    """
+    ranked: list[tuple[int, str]] = []
+    for name in names:
+        tier: int | None = match_tier(query, name)
+        if tier is not None:
+            ranked.append((tier, name))
+
+    ranked.sort(key=lambda item: (item[0], len(item[1]), item[1]))
+    return ranked
+
+
+class TrigramIndex:
+    """
+    Maps case-folded trigrams to the positions of the names that contain them.
+
+    Arguments:
+        names (Iterable[str]): Names to index; positions are assigned in
+            iteration order, so indexing a NameStore gives store positions.
+
+    Examples:
+        >>> names = NameStore(["python/pyscript.py", "shell/script.sh"])
+        >>> TrigramIndex(names).search("pyscr", names)
+        ['python/pyscript.py']
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        postings: dict[int, array[int]] = {}
+        for position, name in enumerate(names):
+            for trigram in _trigrams(_fold(name)):
+                postings.setdefault(trigram, array("I")).append(position)
+
+        keys: array[int] = array("I", sorted(postings))
+        offsets: array[int] = array("Q", [0])  # posting list of keys[i] is postings[offsets[i]:offsets[i + 1]]
+        flat: array[int] = array("I")
+        for trigram in keys:
+            flat.extend(postings[trigram])
+            offsets.append(len(flat))
+
+        self._keys: _IntBuffer = keys
+        self._offsets: _IntBuffer = offsets
+        self._postings: _IntBuffer = flat
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialises the index.
+
+        The result uses the machine's native byte order and is meant for
+        caches on the same machine.
+
+        Returns:
+            bytes: Data accepted by :meth:`from_buffer`.
+        """
+        header: bytes = _HEADER.pack(_MAGIC, len(self._keys), len(self._postings))
+        return header + self._offsets.tobytes() + self._keys.tobytes() + self._postings.tobytes()
+
+    @classmethod
+    def from_buffer(cls, buffer: bytes | memoryview) -> TrigramIndex:
+        """
+        Wraps an index serialised with :meth:`to_bytes` without copying it.
+
+        Args:
+            buffer (bytes | memoryview): Serialised index, e.g. a view of a
+                memory-mapped file.
+
+        Returns:
+            TrigramIndex: An index reading straight from *buffer*.
+
+        Raises:
+            ValueError: If *buffer* is not a serialised index.
+        """
+        view: memoryview = memoryview(buffer)
+        try:
+            magic, keys, postings = _HEADER.unpack_from(view)
+        except struct.error:
+            raise ValueError("truncated trigram index header") from None
+
+        offsets_end: int = _HEADER.size + 8 * (keys + 1)
+        keys_end: int = offsets_end + 4 * keys
+        if magic != _MAGIC or len(view) != keys_end + 4 * postings:
+            raise ValueError("not a trigram index")
+
+        index: TrigramIndex = cls.__new__(cls)
+        index._offsets = view[_HEADER.size : offsets_end].cast("Q")
+        index._keys = view[offsets_end:keys_end].cast("I")
+        index._postings = view[keys_end:].cast("I")
+        return index
+
+    def _posting_list(self, trigram: int) -> _IntBuffer:
+        slot: int = bisect_left(self._keys, trigram)
+        if slot == len(self._keys) or self._keys[slot] != trigram:
+            return array("I")
+
+        return self._postings[self._offsets[slot] : self._offsets[slot + 1]]
+
+    def candidates(self, query: str) -> list[int] | None:
+        """
+        Returns the positions of the names that contain every trigram of *query*.
+
+        Args:
+            query (str): Partial name.
+
+        Returns:
+            list[int] | None: Sorted positions, or `None` when *query* is too
+            short to have a trigram and every name is a candidate.
+        """
+        trigrams: set[int] = _trigrams(_fold(query))
+        if not trigrams:
+            return None
+
+        lists: list[_IntBuffer] = sorted(map(self._posting_list, trigrams), key=len)
+        found: list[int] = list(lists[0])
+
+        # Walk the rarest list and probe the others, so the cost follows the shortest list
+        for other in lists[1:]:
+            found = [position for position in found if _contains(other, position)]
+            if not found:
+                break
+
+        return found
+
+    def search(self, query: str, names: NameStore) -> list[str]:
+        """
+        Returns the names of *names* that fuzzily match *query*, best first.
+
+        Args:
+            query (str): Partial name.
+            names (NameStore): The names this index was built from.
+
+        Returns:
+            list[str]: Matching names, ranked with :func:`rank`.
+        """
+        positions: list[int] | None = self.candidates(query)
+        found: Iterable[str] = names if positions is None else (names[position] for position in positions)
+        return [name for _, name in rank(query, found)]
+
+
+def _contains(sorted_positions: _IntBuffer, position: int) -> bool:
+    slot: int = bisect_left(sorted_positions, position)
+    return slot < len(sorted_positions) and sorted_positions[slot] == position
+
+
+def get_trigrams_path(root: pathlib.Path) -> pathlib.Path:
+    """
+    Returns the cache file that holds the trigram index of *root*.
+
+    Args:
+        root (pathlib.Path): Template directory the index belongs to.
+
+    Returns:
+        pathlib.Path: Trigram index path (not guaranteed to exist yet).
+    """
+    names_path: pathlib.Path = name_cache.get_names_path(root)
+    return names_path.with_suffix(_TRIGRAMS_SUFFIX)
+
+
+def get_trigram_index(root: pathlib.Path, names: NameStore) -> TrigramIndex:
+    """
+    Returns the trigram index of the cached names of *root*.
+
+    The stored index is used while it matches the current names file;
+    otherwise the index is rebuilt from *names* and stored for next time.
+
+    Args:
+        root (pathlib.Path): Template directory the names belong to.
+        names (NameStore): The cached names of *root*, as returned by
+            :func:`makefiles.utils.name_cache.load`.
+
+    Returns:
+        TrigramIndex: Index whose positions refer to *names*.
+    """
+    trigrams_path: pathlib.Path = get_trigrams_path(root)
+
+    try:
+        names_stat: os.stat_result = name_cache.get_names_path(root).stat()
+    except OSError:
+        return TrigramIndex(names)
+
+    stamp: bytes = _STAMP.pack(names_stat.st_size, names_stat.st_mtime_ns)
+
+    try:
+        with open(trigrams_path, "rb") as file:
+            mapped: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[: _STAMP.size] == stamp:
+            return TrigramIndex.from_buffer(memoryview(mapped)[_STAMP.size :])
+        mapped.close()
+    except (OSError, ValueError) as e:
+        _logger.debug("rebuilding trigram index %s: %s", trigrams_path, e)
+
+    index: TrigramIndex = TrigramIndex(names)
+    temp_path: pathlib.Path = trigrams_path.with_name(f".tmp-{os.getpid()}-{trigrams_path.name}")
+    try:
+        temp_path.write_bytes(stamp + index.to_bytes())
+        os.replace(temp_path, trigrams_path)
+    except OSError as e:
+        temp_path.unlink(missing_ok=True)
+        _logger.warning("could not write trigram index %s: %s", trigrams_path, e)
+
+    return index
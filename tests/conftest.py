@@ -1,9 +1,10 @@
 """
 Session-level pytest configuration.
 
-Redirects XDG_STATE_HOME to a temporary directory for the entire test
-session so that no log files are ever written to the real user state
-directory (~/.local/state/makefiles-cli/) during test runs.
+Redirects XDG_STATE_HOME and XDG_CACHE_HOME to temporary directories for
+the entire test session so that no log or cache files are ever written to
+the real user directories (~/.local/state/makefiles-cli/ and
+~/.cache/makefiles-cli/) during test runs.
 
 The temporary directory is created once per session and removed
 automatically when pytest exits.
@@ -36,6 +37,25 @@ def _redirect_xdg_state_home(tmp_path_factory: pytest.TempPathFactory) -> None:
     os.environ["XDG_STATE_HOME"] = str(tmp_state)
 
 
+@pytest.fixture(autouse=True, scope="session")
+def _redirect_xdg_cache_home(tmp_path_factory: pytest.TempPathFactory) -> None:
+    """
+    Points XDG_CACHE_HOME at a throwaway directory for the whole session.
+
+    Template indexes are keyed by the absolute template directory, and every
+    test uses its own temporary directory, so one shared cache is safe.
+
+    Args:
+        tmp_path_factory (pytest.TempPathFactory): Built-in pytest factory
+            for session-scoped temporary directories.
+    """
+    tmp_cache: pathlib.Path = tmp_path_factory.mktemp("xdg_cache_home", numbered=False)
+
+    import os
+
+    os.environ["XDG_CACHE_HOME"] = str(tmp_cache)
+
+
 @pytest.fixture(autouse=True)
 def _reset_app_logger() -> None:
     """
@@ -45,6 +45,103 @@ class TestGetCliArgs:
 
         assert namespace.list is True
 
+    def test_watch_index_without_files_does_not_raise(self) -> None:
+        """--watch-index alone should not raise even without file arguments."""
+        with mock.patch("sys.argv", ["mkfile", "--watch-index"]):
+            namespace: Namespace = cli_parser.get_cli_args(self.parser)
+
+        assert namespace.watch_index is True
+
+    def test_search_without_files_does_not_raise(self) -> None:
+        """--search alone should not raise even without file arguments."""
+        with mock.patch("sys.argv", ["mkfile", "--search", "argparse"]):
+            namespace: Namespace = cli_parser.get_cli_args(self.parser)
+
+        assert namespace.search == ["argparse"]
+
+    def test_blank_search_raises(self) -> None:
+        """A --search query without words should trigger parser.error() -> SystemExit."""
+        with mock.patch("sys.argv", ["mkfile", "--search", "  "]):
+            with pytest.raises(SystemExit):
+                cli_parser.get_cli_args(self.parser)
+
+    def test_grep_without_files_does_not_raise(self) -> None:
+        """--grep alone should not raise even without file arguments."""
+        with mock.patch("sys.argv", ["mkfile", "--grep", "^import"]):
+            namespace: Namespace = cli_parser.get_cli_args(self.parser)
+
+        assert namespace.grep == ["^import"]
+
+    @pytest.mark.parametrize("pattern", ["(unclosed", r"\N{DIGIT ONE}"])
+    def test_invalid_grep_pattern_raises(self, pattern: str) -> None:
+        """A --grep pattern that does not compile as bytes should trigger parser.error() -> SystemExit."""
+        with mock.patch("sys.argv", ["mkfile", "--grep", pattern]):
+            with pytest.raises(SystemExit):
+                cli_parser.get_cli_args(self.parser)
+
+    def test_pack_templates_without_files_does_not_raise(self) -> None:
+        """--pack-templates alone should not raise even without file arguments."""
+        with mock.patch("sys.argv", ["mkfile", "--pack-templates"]):
+            namespace: Namespace = cli_parser.get_cli_args(self.parser)
+
+        assert namespace.pack_templates is True
+
+    def test_long_without_list_raises(self) -> None:
+        """--long without --list should trigger parser.error() -> SystemExit."""
+        with mock.patch("sys.argv", ["mkfile", "out.py", "--long"]):
+            with pytest.raises(SystemExit):
+                cli_parser.get_cli_args(self.parser)
+
+    @pytest.mark.parametrize("option", [["--offset", "5"], ["--limit", "5"]])
+    def test_page_without_list_raises(self, option: list[str]) -> None:
+        """--offset and --limit without --list should trigger parser.error() -> SystemExit."""
+        with mock.patch("sys.argv", ["mkfile", "out.py", *option]):
+            with pytest.raises(SystemExit):
+                cli_parser.get_cli_args(self.parser)
+
+    @pytest.mark.parametrize(
+        "argv", [["out.py", "--tree"], ["--list", "--tree", "--long"], ["--list", "--tree", "--limit", "5"]]
+    )
+    def test_invalid_tree_combinations_raise(self, argv: list[str]) -> None:
+        """--tree without --list, or with --long or a page, should trigger parser.error() -> SystemExit."""
+        with mock.patch("sys.argv", ["mkfile", *argv]):
+            with pytest.raises(SystemExit):
+                cli_parser.get_cli_args(self.parser)
+
+    def test_negative_offset_raises(self) -> None:
+        """A negative --offset should trigger parser.error() -> SystemExit."""
+        with mock.patch("sys.argv", ["mkfile", "--list", "--offset=-1"]):
+            with pytest.raises(SystemExit):
+                cli_parser.get_cli_args(self.parser)
+
+    def test_list_with_page(self) -> None:
+        """--list with --offset and --limit should parse both values."""
+        with mock.patch("sys.argv", ["mkfile", "--list", "--offset", "20", "--limit", "10"]):
+            namespace: Namespace = cli_parser.get_cli_args(self.parser)
+
+        assert namespace.offset == [20]
+        assert namespace.limit == [10]
+
+    def test_auto_with_template_raises(self) -> None:
+        """--auto together with --template should trigger parser.error() -> SystemExit."""
+        with mock.patch("sys.argv", ["mkfile", "out.py", "--auto", "--template=pytemplate.py"]):
+            with pytest.raises(SystemExit):
+                cli_parser.get_cli_args(self.parser)
+
+    def test_link_without_template_raises(self) -> None:
+        """--link without --template or --auto should trigger parser.error() -> SystemExit."""
+        with mock.patch("sys.argv", ["mkfile", "out.py", "--link=hard"]):
+            with pytest.raises(SystemExit):
+                cli_parser.get_cli_args(self.parser)
+
+    @pytest.mark.parametrize("argv", [["--template=LICENSE", "--link=reflink"], ["--auto", "--link", "auto"]])
+    def test_link_with_template(self, argv: list[str]) -> None:
+        """--link with --template or --auto should parse its mode."""
+        with mock.patch("sys.argv", ["mkfile", "out.py", *argv]):
+            namespace: Namespace = cli_parser.get_cli_args(self.parser)
+
+        assert namespace.link[0] in ("reflink", "auto")
+
     def test_multiple_files_parsed_correctly(self) -> None:
         """Multiple file arguments should all appear in namespace.files."""
         with mock.patch("sys.argv", ["mkfile", "a.txt", "b.txt", "c.txt"]):
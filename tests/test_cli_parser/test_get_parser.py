@@ -156,6 +156,74 @@ class TestGetParser:
         with pytest.raises(SystemExit):
             self.parser.parse_args(["file.txt", "--height=0"])
 
+    # --- --jobs / -j argument ---
+
+    def test_jobs_defaults_to_1(self) -> None:
+        """--jobs should default to [NaturalNumber(1)]."""
+        namespace: Namespace = self.parser.parse_args(["file.txt"])
+
+        assert namespace.jobs == [NaturalNumber(1)]
+
+    def test_jobs_short_flag(self) -> None:
+        """-j 8 should set jobs to [NaturalNumber(8)]."""
+        namespace: Namespace = self.parser.parse_args(["--list", "-j", "8"])
+
+        assert namespace.jobs == [NaturalNumber(8)]
+
+    def test_jobs_zero_raises(self) -> None:
+        """--jobs=0 should raise SystemExit because NaturalNumber(0) is invalid."""
+        with pytest.raises(SystemExit):
+            self.parser.parse_args(["file.txt", "--jobs=0"])
+
+    # --- --max-depth / --max-entries arguments ---
+
+    def test_budgets_default_to_none(self) -> None:
+        """--max-depth and --max-entries should default to [None]."""
+        namespace: Namespace = self.parser.parse_args(["file.txt"])
+
+        assert namespace.max_depth == [None]
+        assert namespace.max_entries == [None]
+
+    def test_budgets_are_parsed(self) -> None:
+        """--max-depth 2 --max-entries 100 should be parsed as natural numbers."""
+        namespace: Namespace = self.parser.parse_args(["--list", "--max-depth", "2", "--max-entries", "100"])
+
+        assert namespace.max_depth == [NaturalNumber(2)]
+        assert namespace.max_entries == [NaturalNumber(100)]
+
+    def test_max_entries_zero_raises(self) -> None:
+        """--max-entries=0 should raise SystemExit because NaturalNumber(0) is invalid."""
+        with pytest.raises(SystemExit):
+            self.parser.parse_args(["--list", "--max-entries=0"])
+
+    # --- --auto / -a flag ---
+
+    def test_auto_defaults_to_false(self) -> None:
+        """--auto should default to False."""
+        namespace: Namespace = self.parser.parse_args(["file.txt"])
+
+        assert namespace.auto is False
+
+    def test_auto_short_flag(self) -> None:
+        """-a flag should set auto=True."""
+        namespace: Namespace = self.parser.parse_args(["-a", "file.py"])
+
+        assert namespace.auto is True
+
+    # --- --follow-links / -L flag ---
+
+    def test_follow_links_defaults_to_false(self) -> None:
+        """--follow-links should default to False."""
+        namespace: Namespace = self.parser.parse_args(["file.txt"])
+
+        assert namespace.follow_links is False
+
+    def test_follow_links_short_flag(self) -> None:
+        """-L flag should set follow_links=True."""
+        namespace: Namespace = self.parser.parse_args(["-L", "--list"])
+
+        assert namespace.follow_links is True
+
     # --- --list / -l flag ---
 
     def test_list_defaults_to_false(self) -> None:
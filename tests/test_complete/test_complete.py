@@ -0,0 +1,121 @@
+import os
+import subprocess
+import sys
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+import makefiles.complete as complete
+import makefiles.utils.template_index as template_index
+import tests.utils as utils
+
+
+class TestComplete:
+    @pytest.fixture
+    def roots(self, tempdir: Path) -> tuple[Path, Path]:
+        """Creates a user root and a team root with overlapping names."""
+        user: Path = tempdir.joinpath("user")
+        team: Path = tempdir.joinpath("team")
+
+        utils.create_file(user.joinpath("python", "script.py"))
+        utils.create_file(user.joinpath("python", "lib", "module.py"))
+        utils.create_file(user.joinpath("pyproject.toml"))
+        utils.create_file(team.joinpath("python", "script.py"))
+        utils.create_file(team.joinpath("python", "team.py"))
+        utils.create_file(team.joinpath("shell", "run.sh"))
+
+        return user, team
+
+    def test_completes_one_component_at_a_time(self, roots: tuple[Path, Path]) -> None:
+        """Names below a directory should be offered as the directory itself."""
+        assert list(complete.complete("py", roots)) == ["pyproject.toml", "python/"]
+        assert list(complete.complete("python/", roots)) == ["python/lib/", "python/script.py", "python/team.py"]
+
+    def test_empty_prefix_lists_top_level(self, roots: tuple[Path, Path]) -> None:
+        """An empty prefix should list the top level of every root once."""
+        assert list(complete.complete("", roots)) == ["pyproject.toml", "python/", "shell/"]
+
+    def test_missing_roots_are_skipped(self, tempdir: Path, roots: tuple[Path, Path]) -> None:
+        """Template directories that do not exist should not produce completions or errors."""
+        missing: Path = tempdir.joinpath(utils.get_random_name())
+
+        assert list(complete.complete("sh", (missing, *roots))) == ["shell/"]
+
+    def test_completes_archive_roots(self, tempdir: Path, roots: tuple[Path, Path]) -> None:
+        """Templates of a zip archive in the search path should be completed too."""
+        archive_path: Path = tempdir.joinpath("shared.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("shell/deploy.sh", "")
+            archive.writestr("setup.cfg", "")
+
+        assert list(complete.complete("s", (*roots, archive_path))) == ["setup.cfg", "shell/"]
+        assert list(complete.complete("shell/", (*roots, archive_path))) == ["shell/deploy.sh", "shell/run.sh"]
+
+    def test_uses_names_file_without_walking(self, roots: tuple[Path, Path]) -> None:
+        """Once the names files exist, completion should not touch the indexer."""
+        list(complete.complete("", roots))
+
+        with mock.patch.object(template_index, "get_index") as mock_get_index:
+            assert list(complete.complete("shell/", roots)) == ["shell/run.sh"]
+
+        mock_get_index.assert_not_called()
+
+    def test_names_file_follows_index_saves(self, roots: tuple[Path, Path]) -> None:
+        """A new template should be completed after the index is saved again."""
+        user, _ = roots
+        list(complete.complete("", roots))
+
+        utils.create_file(user.joinpath("python", "new.py"))
+        template_index.get_index(user)
+
+        assert "python/new.py" in complete.complete("python/", roots)
+
+    def test_does_not_import_heavy_modules(self) -> None:
+        """The completion entry point should not load the CLI, argparse, logging or the pickers."""
+        code: str = (
+            "import sys, makefiles.complete\n"
+            "heavy = ('makefiles.mkfile', 'argparse', 'logging', 'makefiles.utils.picker')\n"
+            "print(','.join(name for name in heavy if name in sys.modules))\n"
+        )
+        env: dict[str, str] = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+
+        result: subprocess.CompletedProcess[str] = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+        )
+
+        assert result.stdout.strip() == ""
+
+
+class TestMain:
+    @pytest.fixture
+    def templates_env(self, tempdir: Path) -> Iterator[Path]:
+        """Points XDG_TEMPLATES_DIR at a fresh templates directory without fallback directories."""
+        utils.create_file(tempdir.joinpath("python", "script.py"))
+        env: dict[str, str] = {
+            "XDG_TEMPLATES_DIR": str(tempdir),
+            "MKFILE_TEMPLATES_PATH": "",
+            "XDG_DATA_DIRS": str(tempdir.joinpath(utils.get_random_name())),
+        }
+
+        with mock.patch.dict(os.environ, env):
+            yield tempdir
+
+    def test_prints_completions(self, templates_env: Path, capsys: pytest.CaptureFixture[str]) -> None:
+        """mkfile-complete PREFIX should print one completion per line."""
+        assert complete.main(["--", "py"]) == 0
+        assert capsys.readouterr().out == "python/\n"
+
+    @pytest.mark.parametrize("shell", ["bash", "zsh", "fish"])
+    def test_prints_shell_script(self, shell: str, capsys: pytest.CaptureFixture[str]) -> None:
+        """--shell should print a script that calls back into mkfile-complete."""
+        assert complete.main(["--shell", shell]) == 0
+        assert "mkfile-complete --" in capsys.readouterr().out
+
+    @pytest.mark.parametrize("argv", [["--shell"], ["--shell", "tcsh"], ["a", "b"]])
+    def test_invalid_usage_returns_2(self, argv: list[str], capsys: pytest.CaptureFixture[str]) -> None:
+        """Unknown shells and extra arguments should print usage and return 2."""
+        assert complete.main(argv) == 2
+        assert capsys.readouterr().err.startswith("usage:")
@@ -1,9 +1,15 @@
+import os
+import tarfile
 from pathlib import Path
+from unittest import mock
 
 import pytest
 
 import makefiles.exceptions as exceptions
 import makefiles.mkfile as mkfile
+import makefiles.utils as utils
+import makefiles.utils.template_mirror as template_mirror
+import makefiles.utils.template_pack as template_pack
 import tests.utils as test_utils
 from makefiles.types import ExitCode
 
@@ -57,6 +63,72 @@ class TestCreateTemplate:
                 dry_run=False,
             )
 
+    @pytest.mark.parametrize("template", [".hidden", "linked/a.py"])
+    def test_copies_direct_template_with_fallback_dirs(self, tempdir: Path, templates_dir: Path, template: str) -> None:
+        """Templates the catalog does not list should still be copied by path when fallback dirs exist."""
+        fallback: Path = tempdir.joinpath("fallback")
+        fallback.mkdir()
+        linked: Path = tempdir.joinpath("linked")
+        linked.mkdir()
+        linked.joinpath("a.py").write_bytes(b"linked")
+        templates_dir.joinpath("linked").symlink_to(linked, target_is_directory=True)
+        templates_dir.joinpath(".hidden").write_bytes(b"hidden")
+        dest: Path = tempdir.joinpath("out")
+
+        with mock.patch.object(mkfile, "_get_catalog") as mock_catalog:
+            result: ExitCode = mkfile._create_template(
+                template,
+                (dest,),
+                templates_dir,
+                overwrite=False,
+                parents=False,
+                verbose=False,
+                dry_run=False,
+                fallback_dirs=(fallback,),
+            )
+
+        assert result == ExitCode(0)
+        assert dest.read_bytes() == templates_dir.joinpath(template).read_bytes()
+        mock_catalog.assert_not_called()
+
+    def test_resolves_partial_template_name(self, tempdir: Path, templates_dir: Path) -> None:
+        """A partial name that matches one template best should create that template."""
+        test_utils.create_file(templates_dir.joinpath("python", "pyscript.py"))
+        test_utils.create_file(templates_dir.joinpath("shell", "script.sh"))
+        dest: Path = tempdir.joinpath("output.py")
+
+        result: ExitCode = mkfile._create_template(
+            "pyscr",
+            (dest,),
+            templates_dir,
+            overwrite=False,
+            parents=False,
+            verbose=False,
+            dry_run=False,
+        )
+
+        assert result == ExitCode(0)
+        assert dest.read_bytes() == templates_dir.joinpath("python", "pyscript.py").read_bytes()
+
+    def test_ambiguous_partial_template_name_lists_candidates(self, tempdir: Path, templates_dir: Path) -> None:
+        """A partial name that matches several templates equally well should list them, best first."""
+        test_utils.create_file(templates_dir.joinpath("python", "pyscript.py"))
+        test_utils.create_file(templates_dir.joinpath("python", "pyscraper.py"))
+        dest: Path = tempdir.joinpath("output.py")
+
+        with pytest.raises(exceptions.AmbiguousTemplateError, match="python/pyscript.py, python/pyscraper.py"):
+            mkfile._create_template(
+                "pyscr",
+                (dest,),
+                templates_dir,
+                overwrite=False,
+                parents=False,
+                verbose=False,
+                dry_run=False,
+            )
+
+        assert not dest.exists()
+
     def test_returns_exit_code_1_when_dest_exists_no_overwrite(
         self,
         tempdir: Path,
@@ -104,3 +176,92 @@ class TestCreateTemplate:
         )
         assert result == ExitCode(0)
         assert dest.read_bytes() == templates_content
+
+    def test_copies_template_from_pack(self, tempdir: Path, templates_dir: Path) -> None:
+        """A packed templates directory should serve template contents from its pack."""
+        templates_dir.joinpath("script.py").write_bytes(b"packed\n")
+        template_pack.write_pack(templates_dir)
+        templates_dir.joinpath("script.py").write_bytes(b"changed after packing\n")
+        dest: Path = tempdir.joinpath("output.py")
+
+        result: ExitCode = mkfile._create_template(
+            "script.py",
+            (dest,),
+            templates_dir,
+            overwrite=False,
+            parents=False,
+            verbose=False,
+            dry_run=False,
+        )
+
+        assert result == ExitCode(0)
+        assert dest.read_bytes() == b"packed\n"
+
+    def test_copies_template_from_archive(self, tempdir: Path, templates_dir: Path) -> None:
+        """A tar archive used as templates directory should serve the requested member."""
+        archive_path: Path = tempdir.joinpath("templates.tar.gz")
+        with tarfile.open(archive_path, "w:gz") as archive:
+            archive.add(templates_dir.joinpath("script.py"), arcname="python/script.py")
+        dest: Path = tempdir.joinpath("output.py")
+
+        result: ExitCode = mkfile._create_template(
+            "python/script.py",
+            (dest,),
+            archive_path,
+            overwrite=False,
+            parents=False,
+            verbose=False,
+            dry_run=False,
+        )
+
+        assert result == ExitCode(0)
+        assert dest.read_bytes() == templates_dir.joinpath("script.py").read_bytes()
+
+    def test_copies_template_through_mirror(self, tempdir: Path, templates_dir: Path) -> None:
+        """With MKFILE_MIRROR_TTL set the template should be mirrored and copied from the mirror."""
+        dest: Path = tempdir.joinpath("output.py")
+
+        with mock.patch.dict(os.environ, {"MKFILE_MIRROR_TTL": "60"}):
+            result: ExitCode = mkfile._create_template(
+                "script.py",
+                (dest,),
+                templates_dir,
+                overwrite=False,
+                parents=False,
+                verbose=False,
+                dry_run=False,
+            )
+
+        assert result == ExitCode(0)
+        assert dest.read_bytes() == templates_dir.joinpath("script.py").read_bytes()
+        assert template_mirror.get_mirror_dir(templates_dir).joinpath("script.py").is_file()
+
+    def test_mirrored_template_skips_templates_dir(self, tempdir: Path, templates_dir: Path) -> None:
+        """Within the TTL a mirrored template should be copied without checking the templates directory."""
+        dests: list[Path] = [tempdir.joinpath("first.py"), tempdir.joinpath("second.py")]
+
+        with mock.patch.dict(os.environ, {"MKFILE_MIRROR_TTL": "60"}):
+            mkfile._create_template(
+                "script.py", (dests[0],), templates_dir, overwrite=False, parents=False, verbose=False, dry_run=False
+            )
+
+            with (
+                mock.patch.object(utils, "isfile") as mock_isfile,
+                mock.patch.object(utils, "islinkf") as mock_islinkf,
+                mock.patch.object(template_pack, "get_pack_path") as mock_get_pack_path,
+            ):
+                result: ExitCode = mkfile._create_template(
+                    "script.py",
+                    (dests[1],),
+                    templates_dir,
+                    overwrite=False,
+                    parents=False,
+                    verbose=False,
+                    dry_run=False,
+                )
+
+        assert result == ExitCode(0)
+        assert dests[1].read_bytes() == templates_dir.joinpath("script.py").read_bytes()
+        assert not any(call.args[0].is_relative_to(templates_dir) for call in mock_isfile.call_args_list)
+        assert not any(call.args[0].is_relative_to(templates_dir) for call in mock_islinkf.call_args_list)
+        mock_get_pack_path.assert_not_called()
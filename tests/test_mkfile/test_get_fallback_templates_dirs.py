@@ -0,0 +1,49 @@
+import os
+import unittest.mock as mock
+from pathlib import Path
+
+import makefiles.mkfile as mkfile
+
+
+class TestGetFallbackTemplatesDirs:
+    def test_templates_path_entries_come_first(self, tempdir: Path) -> None:
+        "MKFILE_TEMPLATES_PATH entries should precede the system-wide directories, in order"
+        team: Path = tempdir.joinpath("team")
+        shared: Path = tempdir.joinpath("shared")
+        for directory in (team, shared, tempdir.joinpath("data", "makefiles-cli", "templates")):
+            directory.mkdir(parents=True)
+        env: dict[str, str] = {
+            "MKFILE_TEMPLATES_PATH": f"{team}{os.pathsep}{os.pathsep}{shared}",
+            "XDG_DATA_DIRS": str(tempdir.joinpath("data")),
+        }
+
+        with mock.patch.dict(os.environ, env):
+            assert mkfile._get_fallback_templates_dirs() == (
+                team,
+                shared,
+                tempdir.joinpath("data", "makefiles-cli", "templates"),
+            )
+
+    def test_defaults_without_env(self) -> None:
+        "Without any variable set, only the default system-wide directories should be returned"
+        env: dict[str, str] = {
+            k: v for k, v in os.environ.items() if k not in ("MKFILE_TEMPLATES_PATH", "XDG_DATA_DIRS")
+        }
+
+        with mock.patch.dict(os.environ, env, clear=True), mock.patch.object(Path, "exists", return_value=True):
+            assert mkfile._get_fallback_templates_dirs() == (
+                Path("/usr/local/share/makefiles-cli/templates"),
+                Path("/usr/share/makefiles-cli/templates"),
+            )
+
+    def test_missing_directories_are_left_out(self, tempdir: Path) -> None:
+        "Entries that do not exist should not be part of the search path"
+        team: Path = tempdir.joinpath("team")
+        team.mkdir()
+        env: dict[str, str] = {
+            "MKFILE_TEMPLATES_PATH": f"{tempdir.joinpath('missing')}{os.pathsep}{team}",
+            "XDG_DATA_DIRS": str(tempdir.joinpath("data")),
+        }
+
+        with mock.patch.dict(os.environ, env):
+            assert mkfile._get_fallback_templates_dirs() == (team,)
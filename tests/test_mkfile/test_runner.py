@@ -1,3 +1,4 @@
+import zipfile
 from argparse import Namespace
 from pathlib import Path
 from typing import Any
@@ -8,6 +9,7 @@ import pytest
 import makefiles.exceptions as exceptions
 import makefiles.mkfile as mkfile
 import makefiles.utils.cli_io as cli_io
+import makefiles.utils.template_index as template_index
 import tests.utils as test_utils
 from makefiles.types import ExitCode, NaturalNumber
 
@@ -18,11 +20,25 @@ def _make_namespace(**kwargs: Any) -> Namespace:
         files=[],
         version=False,
         list=False,
+        long=False,
+        tree=False,
+        offset=[0],
+        limit=[None],
+        search=[None],
+        grep=[None],
+        pack_templates=False,
+        watch_index=False,
+        auto=False,
         template=None,
         parents=False,
         force=False,
+        link=[None],
         picker=["manual"],
         height=[NaturalNumber(10)],
+        jobs=[NaturalNumber(1)],
+        max_depth=[None],
+        max_entries=[None],
+        follow_links=False,
         verbose=False,
         dry_run=False,
     )
@@ -66,6 +82,262 @@ class TestRunner:
         printed: list[str] = mock_print.call_args[0][0]
         assert "sample_template.txt" in printed
 
+    def test_list_long_shows_metadata(self, tempdir: Path) -> None:
+        """--list --long should print size, line count and kind next to each template."""
+        tempdir.joinpath("script.sh").write_bytes(b"#!/bin/sh\necho hi\n")
+        tempdir.joinpath("logo.png").write_bytes(b"\x89PNG\x00\x00")
+        namespace: Namespace = _make_namespace(list=True, long=True)
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(namespace, tempdir)
+
+        assert result == ExitCode(0)
+        rows: list[list[str]] = [line.split() for line in mock_print.call_args[0][0].splitlines()]
+        assert [row[0] for row in rows] == ["6", "18"]
+        assert [row[3:] for row in rows] == [["-", "binary", "logo.png"], ["2", "text", "script.sh"]]
+
+    def test_search_prints_matching_templates(self, tempdir: Path) -> None:
+        """--search should print the templates whose contents match and exit with 0."""
+        tempdir.joinpath("cli.py").write_text("import argparse\n")
+        tempdir.joinpath("script.sh").write_text("echo hi\n")
+        namespace: Namespace = _make_namespace(search=["argparse"])
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(namespace, tempdir)
+
+        assert result == ExitCode(0)
+        mock_print.assert_called_once_with("cli.py\n")
+
+    def test_search_without_matches_returns_one(self, tempdir: Path) -> None:
+        """--search should print nothing and exit with 1 when no template matches."""
+        tempdir.joinpath("script.sh").write_text("echo hi\n")
+        namespace: Namespace = _make_namespace(search=["argparse"])
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(namespace, tempdir)
+
+        assert result == ExitCode(1)
+        mock_print.assert_not_called()
+
+    def test_search_reads_archive_roots(self, tempdir: Path) -> None:
+        """--search should find the templates of an archive in the search path."""
+        templates_dir: Path = tempdir.joinpath("templates")
+        templates_dir.mkdir()
+        templates_dir.joinpath("a.sh").write_text("echo hi\n")
+        archive_path: Path = tempdir.joinpath("shared.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("b.py", "import os\nimport argparse\n")
+        namespace: Namespace = _make_namespace(search=["argparse"])
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(namespace, templates_dir, (archive_path,))
+
+        assert result == ExitCode(0)
+        mock_print.assert_called_once_with("b.py\n")
+
+    def test_grep_prints_matching_lines(self, tempdir: Path) -> None:
+        """--grep should print template:line:text for every matching line, template by template."""
+        tempdir.joinpath("b.py").write_text("import argparse\n")
+        tempdir.joinpath("a.py").write_text("import os\nimport argparse as ap\n")
+        tempdir.joinpath("c.sh").write_text("echo hi\n")
+        namespace: Namespace = _make_namespace(grep=["^import arg"], jobs=[NaturalNumber(2)])
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(namespace, tempdir)
+
+        assert result == ExitCode(0)
+        assert [call[0][0] for call in mock_print.call_args_list] == [
+            "a.py:2:import argparse as ap\n",
+            "b.py:1:import argparse\n",
+        ]
+
+    def test_grep_searches_archive_roots(self, tempdir: Path) -> None:
+        """--grep should search the templates of an archive in the search path."""
+        templates_dir: Path = tempdir.joinpath("templates")
+        templates_dir.mkdir()
+        templates_dir.joinpath("a.py").write_text("import argparse\n")
+        archive_path: Path = tempdir.joinpath("shared.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("b.py", "import os\nimport argparse\n")
+        namespace: Namespace = _make_namespace(grep=["argparse"])
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(namespace, templates_dir, (archive_path,))
+
+        assert result == ExitCode(0)
+        assert [call[0][0] for call in mock_print.call_args_list] == [
+            "a.py:1:import argparse\n",
+            "b.py:2:import argparse\n",
+        ]
+
+    def test_grep_without_matches_returns_one(self, tempdir: Path) -> None:
+        """--grep should exit with 1 when no line matches."""
+        tempdir.joinpath("c.sh").write_text("echo hi\n")
+        namespace: Namespace = _make_namespace(grep=["argparse"])
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(namespace, tempdir)
+
+        assert result == ExitCode(1)
+        mock_print.assert_not_called()
+
+    def test_pack_templates_serves_listing_from_pack(self, tempdir: Path) -> None:
+        """--pack-templates should write a pack that later listings are served from."""
+        test_utils.create_file(tempdir.joinpath("a.txt"))
+        test_utils.create_file(tempdir.joinpath("lang", "b.py"))
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(_make_namespace(pack_templates=True), tempdir)
+
+        assert result == ExitCode(0)
+        mock_print.assert_called_once_with(f"packed 2 templates into '{tempdir.joinpath('.mkfile.pack')}'\n")
+
+        with (
+            mock.patch.object(cli_io, "print") as mock_print,
+            mock.patch.object(template_index, "get_index") as mock_get_index,
+        ):
+            mkfile.runner(_make_namespace(list=True), tempdir)
+
+        assert mock_print.call_args[0][0].splitlines() == ["a.txt", "lang/b.py"]
+        mock_get_index.assert_not_called()
+
+    def test_hidden_template_of_packed_directory_is_created(self, tempdir: Path) -> None:
+        """A template the pack leaves out, such as a hidden one, should be copied from its file."""
+        test_utils.create_file(tempdir.joinpath("a.txt"))
+        tempdir.joinpath(".hidden").write_text("hidden\n")
+        mkfile.runner(_make_namespace(pack_templates=True), tempdir)
+        dest: Path = tempdir.joinpath("out", "hidden")
+
+        result: ExitCode = mkfile.runner(_make_namespace(files=[str(dest)], template=".hidden", parents=True), tempdir)
+
+        assert result == ExitCode(0)
+        assert dest.read_text() == "hidden\n"
+
+    def test_template_added_after_packing_is_created(self, tempdir: Path) -> None:
+        """A template added after --pack-templates should still be found."""
+        test_utils.create_file(tempdir.joinpath("a.txt"))
+        mkfile.runner(_make_namespace(pack_templates=True), tempdir)
+        tempdir.joinpath("lang").mkdir()
+        tempdir.joinpath("lang", "new.py").write_text("new\n")
+        dest: Path = tempdir.joinpath("out", "new.py")
+
+        result: ExitCode = mkfile.runner(
+            _make_namespace(files=[str(dest)], template="lang/new.py", parents=True), tempdir
+        )
+
+        assert result == ExitCode(0)
+        assert dest.read_text() == "new\n"
+
+    def test_list_streams_in_batches(self, tempdir: Path) -> None:
+        """--list should write templates in bounded chunks rather than one big string."""
+        for index in range(5):
+            test_utils.create_file(tempdir.joinpath(f"template_{index}.txt"))
+
+        namespace: Namespace = _make_namespace(list=True)
+
+        with mock.patch.object(mkfile, "_LIST_BATCH_SIZE", 2), mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(namespace, tempdir)
+
+        assert result == ExitCode(0)
+        chunks: list[str] = [call[0][0] for call in mock_print.call_args_list]
+        assert [chunk.count("\n") for chunk in chunks] == [2, 2, 1]
+        assert sorted("".join(chunks).splitlines()) == [f"template_{index}.txt" for index in range(5)]
+
+    def test_list_is_in_natural_order(self, tempdir: Path) -> None:
+        """--list should order numbers by value and ignore case."""
+        for name in ("file10.txt", "File2.txt", "file1.txt", "alpha.txt"):
+            test_utils.create_file(tempdir.joinpath(name))
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(_make_namespace(list=True), tempdir)
+
+        assert result == ExitCode(0)
+        printed: str = "".join(call[0][0] for call in mock_print.call_args_list)
+        assert printed.splitlines() == ["alpha.txt", "file1.txt", "File2.txt", "file10.txt"]
+
+    def test_list_with_offset_and_limit_prints_page(self, tempdir: Path) -> None:
+        """--offset and --limit should select a page of the natural-order listing."""
+        for index in range(12):
+            test_utils.create_file(tempdir.joinpath(f"template_{index}.txt"))
+        namespace: Namespace = _make_namespace(list=True, offset=[8], limit=[NaturalNumber(3)])
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(namespace, tempdir)
+
+        assert result == ExitCode(0)
+        printed: str = "".join(call[0][0] for call in mock_print.call_args_list)
+        assert printed.splitlines() == ["template_8.txt", "template_9.txt", "template_10.txt"]
+
+    def test_list_tree_prints_directory_tree(self, tempdir: Path) -> None:
+        """--list --tree should draw the templates as a tree with per-directory counts."""
+        for name in ("Dockerfile", "python/script10.py", "python/script2.py", "python/cli/main.py"):
+            test_utils.create_file(tempdir.joinpath(name))
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(_make_namespace(list=True, tree=True), tempdir)
+
+        assert result == ExitCode(0)
+        printed: str = "".join(call[0][0] for call in mock_print.call_args_list)
+        assert printed.splitlines() == [
+            ". (4)",
+            "├── Dockerfile",
+            "└── python/ (3)",
+            "    ├── cli/ (1)",
+            "    │   └── main.py",
+            "    ├── script2.py",
+            "    └── script10.py",
+        ]
+
+    def test_list_with_jobs_lists_all_templates(self, tempdir: Path) -> None:
+        """--list with --jobs should list the same templates as a serial scan."""
+        expected: list[str] = test_utils.generate_tree(tempdir, max_depth=3, max_children=3, max_files=3)
+        namespace: Namespace = _make_namespace(list=True, jobs=[NaturalNumber(4)])
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(namespace, tempdir)
+
+        assert result == ExitCode(0)
+        printed: str = "".join(call[0][0] for call in mock_print.call_args_list)
+        assert sorted(printed.splitlines()) == sorted(expected)
+
+    def test_list_with_max_entries_is_truncated(self, tempdir: Path) -> None:
+        """--list beyond --max-entries should print the budget, mark the listing truncated and return 1."""
+        for index in range(5):
+            test_utils.create_file(tempdir.joinpath(f"template_{index}.txt"))
+
+        namespace: Namespace = _make_namespace(list=True, max_entries=[NaturalNumber(3)])
+
+        with mock.patch.object(cli_io, "print") as mock_print, mock.patch.object(cli_io, "eprint") as mock_eprint:
+            result: ExitCode = mkfile.runner(namespace, tempdir)
+
+        assert result == ExitCode(1)
+        assert "".join(call[0][0] for call in mock_print.call_args_list).count("\n") == 3
+        assert "truncated" in mock_eprint.call_args[0][0]
+
+    def test_list_with_max_depth_skips_deeper_templates(self, tempdir: Path) -> None:
+        """--list --max-depth 1 should only list top-level templates."""
+        test_utils.create_file(tempdir.joinpath("top.txt"))
+        test_utils.create_file(tempdir.joinpath("sub", "deep.txt"))
+        namespace: Namespace = _make_namespace(list=True, max_depth=[NaturalNumber(1)])
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            result: ExitCode = mkfile.runner(namespace, tempdir)
+
+        assert result == ExitCode(0)
+        assert mock_print.call_args[0][0] == "top.txt\n"
+
+    def test_picker_fails_beyond_max_entries(self, tempdir: Path) -> None:
+        """The template picker should fail fast instead of offering a truncated list."""
+        for index in range(5):
+            test_utils.create_file(tempdir.joinpath(f"template_{index}.txt"))
+
+        namespace: Namespace = _make_namespace(
+            files=[str(tempdir.joinpath("dest.txt"))], template=object(), max_entries=[NaturalNumber(3)]
+        )
+
+        with pytest.raises(exceptions.EntryLimitExceededError):
+            mkfile.runner(namespace, tempdir)
+
     def test_list_raises_when_no_templates(self, tempdir: Path) -> None:
         """--list should raise NoTemplatesAvailableError if template dir is empty."""
         namespace: Namespace = _make_namespace(list=True)
@@ -73,6 +345,16 @@ class TestRunner:
         with pytest.raises(exceptions.NoTemplatesAvailableError):
             mkfile.runner(namespace, tempdir)
 
+    def test_watch_index_runs_watcher(self, tempdir: Path) -> None:
+        """--watch-index should hand the templates directory to the index watcher."""
+        namespace: Namespace = _make_namespace(watch_index=True, jobs=[NaturalNumber(3)])
+
+        with mock.patch("makefiles.utils.index_watcher.watch") as mock_watch, mock.patch.object(cli_io, "eprint"):
+            result: ExitCode = mkfile.runner(namespace, tempdir)
+
+        assert result == ExitCode(0)
+        mock_watch.assert_called_once_with(tempdir, jobs=NaturalNumber(3))
+
     def test_creates_empty_files_when_no_template(self, tempdir: Path) -> None:
         """Without --template, runner should create empty files."""
         dest: Path = tempdir.joinpath("new_file.txt")
@@ -154,6 +436,45 @@ class TestRunner:
         assert result == ExitCode(0)
         assert dest.read_bytes() == templates_content
 
+    def test_jobs_copies_template_to_all_destinations(
+        self,
+        tempdir: Path,
+        populated_templates_dir: tuple[Path, bytes],
+    ) -> None:
+        """--jobs should copy the template to every destination."""
+        templates_dir: Path
+        templates_content: bytes
+
+        templates_dir, templates_content = populated_templates_dir
+        destinations: list[Path] = [tempdir.joinpath(f"output_{index}.py") for index in range(8)]
+        namespace: Namespace = _make_namespace(
+            files=[str(dest) for dest in destinations], template="sample_template.txt", jobs=[NaturalNumber(4)]
+        )
+
+        result: ExitCode = mkfile.runner(namespace, templates_dir)
+
+        assert result == ExitCode(0)
+        for dest in destinations:
+            assert dest.read_bytes() == templates_content
+
+    def test_link_hard_links_destinations_to_template(
+        self,
+        tempdir: Path,
+        populated_templates_dir: tuple[Path, bytes],
+    ) -> None:
+        """--link=hard should make every destination a hard link to the template."""
+        templates_dir: Path = populated_templates_dir[0]
+        destinations: list[Path] = [tempdir.joinpath(f"LICENSE_{index}") for index in range(3)]
+        namespace: Namespace = _make_namespace(
+            files=[str(dest) for dest in destinations], template="sample_template.txt", link=["hard"]
+        )
+
+        result: ExitCode = mkfile.runner(namespace, templates_dir)
+
+        assert result == ExitCode(0)
+        for dest in destinations:
+            assert dest.samefile(templates_dir.joinpath("sample_template.txt"))
+
     def test_raises_on_unknown_template_name(
         self,
         tempdir: Path,
@@ -169,6 +490,105 @@ class TestRunner:
         with pytest.raises(exceptions.TemplateNotFoundError):
             mkfile.runner(namespace, templates_dir)
 
+    def test_template_resolved_from_fallback_dir(self, tempdir: Path) -> None:
+        """A template missing from the templates directory should be taken from a fallback directory."""
+        user_dir: Path = tempdir.joinpath("user")
+        team_dir: Path = tempdir.joinpath("team")
+        user_dir.mkdir()
+        team_dir.mkdir()
+        team_dir.joinpath("team.txt").write_bytes(b"team")
+
+        dest: Path = tempdir.joinpath("output.txt")
+        namespace: Namespace = _make_namespace(files=[str(dest)], template="team.txt")
+
+        result: ExitCode = mkfile.runner(namespace, user_dir, (team_dir,))
+
+        assert result == ExitCode(0)
+        assert dest.read_bytes() == b"team"
+
+    def test_auto_picks_template_per_file(self, tempdir: Path) -> None:
+        """--auto should copy the template that fits each destination's name."""
+        templates_dir: Path = tempdir.joinpath("templates")
+        test_utils.create_file(templates_dir.joinpath("python", "script.py"))
+        test_utils.create_file(templates_dir.joinpath("python", "test_module.py"))
+        test_utils.create_file(templates_dir.joinpath("shell", "script.sh"))
+
+        files: list[Path] = [tempdir.joinpath(name) for name in ("foo.py", "test_foo.py", "bar.sh")]
+        namespace: Namespace = _make_namespace(files=list(map(str, files)), auto=True)
+
+        result: ExitCode = mkfile.runner(namespace, templates_dir)
+
+        assert result == ExitCode(0)
+        assert files[0].read_bytes() == templates_dir.joinpath("python", "script.py").read_bytes()
+        assert files[1].read_bytes() == templates_dir.joinpath("python", "test_module.py").read_bytes()
+        assert files[2].read_bytes() == templates_dir.joinpath("shell", "script.sh").read_bytes()
+
+    def test_auto_skips_files_without_template(self, tempdir: Path) -> None:
+        """--auto should report files no template fits, create the rest and return 1."""
+        templates_dir: Path = tempdir.joinpath("templates")
+        test_utils.create_file(templates_dir.joinpath("script.py"))
+
+        matched: Path = tempdir.joinpath("foo.py")
+        unmatched: Path = tempdir.joinpath("notes.md")
+        namespace: Namespace = _make_namespace(files=[str(matched), str(unmatched)], auto=True)
+
+        with mock.patch.object(cli_io, "eprint") as mock_eprint:
+            result: ExitCode = mkfile.runner(namespace, templates_dir)
+
+        assert result == ExitCode(1)
+        assert matched.is_file()
+        assert not unmatched.exists()
+        mock_eprint.assert_called_once_with(f"no template matches {unmatched}\n")
+
+    def test_follow_links_creates_linked_template(self, tempdir: Path) -> None:
+        """--follow-links should make templates in linked directories available."""
+        templates_dir: Path = tempdir.joinpath("templates")
+        shared: Path = tempdir.joinpath("shared")
+        templates_dir.mkdir()
+        shared.mkdir()
+        shared.joinpath("team.txt").write_bytes(b"team")
+        templates_dir.joinpath("team").symlink_to(shared, target_is_directory=True)
+
+        dest: Path = tempdir.joinpath("output.txt")
+        namespace: Namespace = _make_namespace(files=[str(dest)], template="team/team.txt", follow_links=True)
+
+        result: ExitCode = mkfile.runner(namespace, templates_dir, (tempdir.joinpath("missing"),))
+
+        assert result == ExitCode(0)
+        assert dest.read_bytes() == b"team"
+
+    def test_templates_dir_shadows_fallback_dir(self, tempdir: Path) -> None:
+        """A template present in both directories should come from the templates directory."""
+        user_dir: Path = tempdir.joinpath("user")
+        team_dir: Path = tempdir.joinpath("team")
+        user_dir.mkdir()
+        team_dir.mkdir()
+        user_dir.joinpath("shared.txt").write_bytes(b"user")
+        team_dir.joinpath("shared.txt").write_bytes(b"team")
+
+        dest: Path = tempdir.joinpath("output.txt")
+        namespace: Namespace = _make_namespace(files=[str(dest)], template="shared.txt")
+
+        mkfile.runner(namespace, user_dir, (team_dir,))
+
+        assert dest.read_bytes() == b"user"
+
+    def test_list_merges_fallback_dirs(self, tempdir: Path) -> None:
+        """--list should list templates of every directory of the search path once."""
+        user_dir: Path = tempdir.joinpath("user")
+        team_dir: Path = tempdir.joinpath("team")
+        test_utils.create_file(user_dir.joinpath("shared.txt"))
+        test_utils.create_file(team_dir.joinpath("shared.txt"))
+        test_utils.create_file(team_dir.joinpath("team.txt"))
+
+        namespace: Namespace = _make_namespace(list=True)
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            mkfile.runner(namespace, user_dir, (team_dir, tempdir.joinpath("missing")))
+
+        printed: str = "".join(call[0][0] for call in mock_print.call_args_list)
+        assert sorted(printed.splitlines()) == ["shared.txt", "team.txt"]
+
     def test_prompts_for_template_when_sentinel_given(
         self,
         tempdir: Path,
@@ -1,5 +1,6 @@
 import random
 from pathlib import Path
+from unittest import mock
 
 import pytest
 
@@ -87,3 +88,124 @@ class TestDirWalker:
         utils.create_file(hidden_file)
 
         assert dirwalker.listf(tempdir) == ["sub/x.txt"]
+
+    def test_symlinked_subdir_not_descended(self, tempdir: Path) -> None:
+        """Symlinks to directories inside the tree should be neither listed nor walked."""
+        real_dir: Path = tempdir.joinpath("real")
+        real_dir.mkdir()
+        utils.create_file(real_dir.joinpath("f.txt"))
+        tempdir.joinpath("link").symlink_to(real_dir, target_is_directory=True)
+
+        assert dirwalker.listf(tempdir) == ["real/f.txt"]
+
+    def test_follow_links_descends_into_symlinked_subdir(self, tempdir: Path) -> None:
+        """With follow_links, a linked collection outside the tree should be walked."""
+        root: Path = tempdir.joinpath("root")
+        shared: Path = tempdir.joinpath("shared")
+        utils.create_file(root.joinpath("own.txt"))
+        utils.create_file(shared.joinpath("sub", "f.txt"))
+        root.joinpath("link").symlink_to(shared, target_is_directory=True)
+
+        assert sorted(dirwalker.listf(root, follow_links=True)) == ["link/sub/f.txt", "own.txt"]
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_follow_links_survives_cycles(self, tempdir: Path, jobs: int) -> None:
+        """Links back to an ancestor should not be walked again."""
+        utils.create_file(tempdir.joinpath("a", "f.txt"))
+        tempdir.joinpath("a", "up").symlink_to(tempdir, target_is_directory=True)
+        tempdir.joinpath("a", "self").symlink_to(tempdir.joinpath("a"), target_is_directory=True)
+
+        assert dirwalker.listf(tempdir, jobs=jobs, follow_links=True) == ["a/f.txt"]
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_follow_links_reads_shared_subtree_once(self, tempdir: Path, jobs: int) -> None:
+        """A directory reachable through several links should be listed under one of them only."""
+        root: Path = tempdir.joinpath("root")
+        shared: Path = tempdir.joinpath("shared")
+        utils.create_file(shared.joinpath("f.txt"))
+        for name in ("one", "two", "three"):
+            utils.create_file(root.joinpath(name, "own.txt"))
+            root.joinpath(name, "link").symlink_to(shared, target_is_directory=True)
+
+        with mock.patch.object(dirwalker, "scan", wraps=dirwalker.scan) as mock_scan:
+            found: list[str] = dirwalker.listf(root, jobs=jobs, follow_links=True)
+
+        scanned: list[str] = [call.args[0] for call in mock_scan.call_args_list]
+        assert len([path for path in scanned if path.endswith("link")]) == 1
+        assert sorted(path for path in found if not path.endswith("own.txt")) in (
+            ["one/link/f.txt"],
+            ["two/link/f.txt"],
+            ["three/link/f.txt"],
+        )
+
+    def test_broken_symlink_listed_as_file(self, tempdir: Path) -> None:
+        """Broken symlinks should be reported as files, like `os.walk` does."""
+        tempdir.joinpath("dangling").symlink_to(tempdir.joinpath(utils.get_random_name()))
+
+        assert dirwalker.listf(tempdir) == ["dangling"]
+
+    def test_iterf_matches_listf(self, tempdir: Path, filetree: list[str]) -> None:
+        """iterf should yield the same entries as listf."""
+        assert set(dirwalker.iterf(tempdir)) == set(dirwalker.listf(tempdir)) == set(filetree)
+
+    def test_iterf_validates_eagerly(self, tempdir: Path) -> None:
+        """iterf should raise InvalidPathError on call, before iteration starts."""
+        with pytest.raises(exceptions.InvalidPathError):
+            dirwalker.iterf(tempdir.joinpath(utils.get_random_name()))
+
+    @pytest.mark.parametrize("jobs", [2, 8])
+    def test_parallel_walk_matches_serial(self, tempdir: Path, jobs: int) -> None:
+        """A parallel walk should return exactly the serial set, hidden filtering included."""
+        utils.generate_tree(tempdir, max_depth=4, max_children=4, max_files=4, hidden=True)
+
+        assert sorted(dirwalker.listf(tempdir, jobs=jobs)) == sorted(dirwalker.listf(tempdir))
+
+    def test_parallel_walk_can_stop_early(self, tempdir: Path) -> None:
+        """Closing a parallel iterf early should not raise or hang."""
+        utils.generate_tree(tempdir, max_depth=3, max_children=3, max_files=3)
+
+        walker = dirwalker.iterf(tempdir, jobs=4)
+        assert next(walker)
+        walker.close()  # type: ignore[attr-defined]
+
+    def test_max_depth_limits_walk(self, tempdir: Path) -> None:
+        """max_depth should return only files with at most that many path components."""
+        utils.create_file(tempdir.joinpath("top.txt"))
+        utils.create_file(tempdir.joinpath("a", "mid.txt"))
+        utils.create_file(tempdir.joinpath("a", "b", "deep.txt"))
+
+        assert dirwalker.listf(tempdir, max_depth=1) == ["top.txt"]
+        assert sorted(dirwalker.listf(tempdir, max_depth=2)) == ["a/mid.txt", "top.txt"]
+
+    def test_max_depth_does_not_read_deeper_directories(self, tempdir: Path) -> None:
+        """Directories beyond max_depth should never be scanned."""
+        utils.create_file(tempdir.joinpath("a", "b", "deep.txt"))
+
+        with mock.patch.object(dirwalker, "scan", wraps=dirwalker.scan) as mock_scan:
+            dirwalker.listf(tempdir, max_depth=2)
+
+        scanned: list[Path] = [Path(call[0][0]) for call in mock_scan.call_args_list]
+        assert scanned == [tempdir, tempdir.joinpath("a")]
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_max_entries_exceeded_raises(self, tempdir: Path, jobs: int) -> None:
+        """listf should fail once more than max_entries files are found."""
+        utils.generate_tree(tempdir, max_depth=3, max_children=3, max_files=3)
+        total: int = len(dirwalker.listf(tempdir))
+
+        with pytest.raises(exceptions.EntryLimitExceededError):
+            dirwalker.listf(tempdir, jobs=jobs, max_entries=total - 1)
+
+        assert len(dirwalker.listf(tempdir, jobs=jobs, max_entries=total)) == total
+
+    def test_iterf_yields_budget_before_raising(self, tempdir: Path) -> None:
+        """iterf should yield exactly max_entries files before raising."""
+        for index in range(5):
+            utils.create_file(tempdir.joinpath(f"file_{index}.txt"))
+
+        found: list[str] = []
+        with pytest.raises(exceptions.EntryLimitExceededError):
+            for name in dirwalker.iterf(tempdir, max_entries=3):
+                found.append(name)
+
+        assert len(found) == 3
@@ -1,3 +1,7 @@
+import errno
+import importlib
+import io
+import os
 import random
 from pathlib import Path
 from unittest import mock
@@ -8,7 +12,10 @@ import makefiles.exceptions as exceptions
 import makefiles.utils.cli_io as cli_io
 import tests.utils as utils
 from makefiles.types import ExitCode
-from makefiles.utils.fileutils import copy_file
+from makefiles.utils.fileutils import copy_data, copy_file, copy_stream
+
+# The package re-exports `copy` under the name of its module
+copy_module = importlib.import_module("makefiles.utils.fileutils.copy_file")
 
 
 class TestCopy:
@@ -215,3 +222,295 @@ class TestCopy:
             copy_file(filepath, (dest,), verbose=False)
 
         mock_print.assert_not_called()
+
+
+class TestCopyFanOut:
+    @pytest.fixture
+    def source(self, tempdir: Path) -> Path:
+        """Creates a source file of a few kilobytes."""
+        path: Path = tempdir.joinpath("source.bin")
+        path.write_bytes(bytes(range(256)) * 40)
+        return path
+
+    def test_source_is_opened_once(self, tempdir: Path, source: Path) -> None:
+        """Copying to many destinations should open the source a single time."""
+        destinations: tuple[Path, ...] = tuple(tempdir.joinpath(f"dest_{index}") for index in range(20))
+
+        with mock.patch("builtins.open", wraps=open) as mock_open:
+            assert copy_file(source, destinations) == ExitCode(0)
+
+        assert sum(1 for call in mock_open.call_args_list if call.args[0] == source) == 1
+        for dest in destinations:
+            assert utils.compare_files(source, dest)
+
+    def test_large_sources_use_copy_backends(self, tempdir: Path, source: Path) -> None:
+        """Sources above the buffer limit should be handed to the copy backends from one descriptor."""
+        destinations: tuple[Path, ...] = (tempdir.joinpath("first"), tempdir.joinpath("second"))
+
+        with (
+            mock.patch.object(copy_module, "_BUFFER_LIMIT", 0),
+            mock.patch.object(copy_module.copy_backends, "copy", wraps=copy_module.copy_backends.copy) as mock_copy,
+        ):
+            assert copy_file(source, destinations) == ExitCode(0)
+
+        assert mock_copy.call_count == 2
+        assert len({call.args[0] for call in mock_copy.call_args_list}) == 1
+        for dest in destinations:
+            assert utils.compare_files(source, dest)
+
+    def test_skipped_destinations_do_not_read_source(self, tempdir: Path, source: Path) -> None:
+        """The source should not be opened when every destination is skipped."""
+        dest: Path = tempdir.joinpath("dest")
+        utils.create_file(dest)
+
+        with mock.patch("builtins.open", wraps=open) as mock_open, mock.patch.object(cli_io, "eprint"):
+            assert copy_file(source, (dest,)) == ExitCode(1)
+
+        assert not mock_open.call_args_list
+
+
+class TestCopyParallel:
+    @pytest.fixture
+    def source(self, tempdir: Path) -> Path:
+        """Creates a source file of a few kilobytes."""
+        path: Path = tempdir.joinpath("source.bin")
+        path.write_bytes(bytes(range(256)) * 40)
+        return path
+
+    @pytest.fixture
+    def destinations(self, tempdir: Path) -> tuple[Path, ...]:
+        """Returns new, existing and parentless destinations, interleaved."""
+        paths: list[Path] = []
+        for index in range(12):
+            if index % 3 == 0:
+                paths.append(tempdir.joinpath(f"existing_{index}"))
+                utils.create_file(paths[-1])
+            elif index % 3 == 1:
+                paths.append(tempdir.joinpath(f"missing_{index}", "dest"))
+            else:
+                paths.append(tempdir.joinpath(f"dest_{index}"))
+        return tuple(paths)
+
+    def _run(self, source: Path, destinations: tuple[Path, ...], jobs: int) -> tuple[ExitCode, list[mock._Call]]:
+        manager: mock.Mock = mock.Mock()
+        with (
+            mock.patch.object(cli_io, "print", manager.print),
+            mock.patch.object(cli_io, "eprint", manager.eprint),
+        ):
+            exitcode: ExitCode = copy_file(source, destinations, verbose=True, jobs=jobs)
+        return exitcode, manager.mock_calls
+
+    def test_messages_and_exitcode_match_serial_copy(self, source: Path, destinations: tuple[Path, ...]) -> None:
+        """Parallel copies should print the same messages in the same order and return the same exit code."""
+        serial: tuple[ExitCode, list[mock._Call]] = self._run(source, destinations, jobs=1)
+        for path in destinations[2::3]:
+            path.unlink()
+
+        parallel: tuple[ExitCode, list[mock._Call]] = self._run(source, destinations, jobs=4)
+
+        assert parallel == serial
+        assert serial[0] == ExitCode(1)
+        for path in destinations[2::3]:
+            assert utils.compare_files(source, path)
+
+    def test_copies_every_destination(self, tempdir: Path, source: Path) -> None:
+        """All destinations should receive the source when copied by a pool."""
+        destinations: tuple[Path, ...] = tuple(tempdir.joinpath(f"dest_{index}") for index in range(16))
+
+        with mock.patch.object(copy_module, "_BUFFER_LIMIT", 0):
+            assert copy_file(source, destinations, jobs=4) == ExitCode(0)
+
+        for dest in destinations:
+            assert utils.compare_files(source, dest)
+
+    def test_repeated_destination_is_copied_in_order(self, tempdir: Path, source: Path) -> None:
+        """A destination given twice should be skipped the second time, as in a serial copy."""
+        dest: Path = tempdir.joinpath("dest")
+
+        with mock.patch.object(cli_io, "eprint") as mock_eprint:
+            assert copy_file(source, (dest, tempdir.joinpath("other"), dest), jobs=4) == ExitCode(1)
+
+        mock_eprint.assert_called_once_with(f"destination {dest} already exists\n")
+        assert utils.compare_files(source, dest)
+
+
+class TestCopyLink:
+    @pytest.fixture
+    def source(self, tempdir: Path) -> Path:
+        """Creates a source file of a few kilobytes."""
+        path: Path = tempdir.joinpath("source.bin")
+        path.write_bytes(bytes(range(256)) * 40)
+        return path
+
+    def test_hard_links_share_the_source_inode(self, tempdir: Path, source: Path) -> None:
+        """--link=hard destinations should be hard links to the source, which is never read."""
+        destinations: tuple[Path, ...] = tuple(tempdir.joinpath(f"dest_{index}") for index in range(3))
+
+        with mock.patch("builtins.open", wraps=open) as mock_open:
+            assert copy_file(source, destinations, link="hard") == ExitCode(0)
+
+        assert not mock_open.call_args_list
+        for dest in destinations:
+            assert dest.stat().st_ino == source.stat().st_ino
+        assert source.stat().st_nlink == 4
+
+    def test_unlinkable_source_links_to_first_copy(self, tempdir: Path, source: Path) -> None:
+        """When the source cannot be linked, it should be copied once and the rest linked to that copy."""
+        destinations: tuple[Path, ...] = tuple(tempdir.joinpath(f"dest_{index}") for index in range(3))
+        link = os.link
+
+        def cross_device(target: Path, dest: Path) -> None:
+            if target == source:
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            link(target, dest)
+
+        with mock.patch("os.link", side_effect=cross_device):
+            assert copy_file(source, destinations, link="hard") == ExitCode(0)
+
+        assert destinations[0].stat().st_ino != source.stat().st_ino
+        assert {dest.stat().st_ino for dest in destinations} == {destinations[0].stat().st_ino}
+        assert utils.compare_files(source, destinations[0])
+
+    def test_reflink_falls_back_to_copies(self, tempdir: Path, source: Path) -> None:
+        """--link=reflink should copy where the filesystem cannot clone, never hard-link."""
+        destinations: tuple[Path, ...] = (tempdir.joinpath("first"), tempdir.joinpath("second"))
+
+        with mock.patch.object(
+            copy_module.copy_backends, "reflink", side_effect=OSError(errno.EOPNOTSUPP, "Operation not supported")
+        ):
+            assert copy_file(source, destinations, link="reflink") == ExitCode(0)
+
+        for dest in destinations:
+            assert dest.stat().st_nlink == 1
+            assert utils.compare_files(source, dest)
+
+    def test_auto_copies_without_reflink(self, tempdir: Path, source: Path) -> None:
+        """--link=auto should copy, never hard-link, a writable source where the filesystem cannot clone."""
+        dest: Path = tempdir.joinpath("dest")
+
+        with (
+            mock.patch.object(
+                copy_module.copy_backends, "reflink", side_effect=OSError(errno.EOPNOTSUPP, "Operation not supported")
+            ),
+            mock.patch("os.link") as mock_link,
+        ):
+            assert copy_file(source, (dest,), link="auto") == ExitCode(0)
+
+        mock_link.assert_not_called()
+        assert dest.stat().st_ino != source.stat().st_ino
+        assert utils.compare_files(source, dest)
+
+    def test_auto_prefers_reflink(self, tempdir: Path, source: Path) -> None:
+        """--link=auto should clone where the filesystem supports it."""
+        dest: Path = tempdir.joinpath("dest")
+
+        with (
+            mock.patch.object(copy_module.copy_backends, "reflink") as mock_reflink,
+            mock.patch("os.link") as mock_link,
+        ):
+            assert copy_file(source, (dest,), link="auto") == ExitCode(0)
+
+        mock_reflink.assert_called_once()
+        mock_link.assert_not_called()
+
+    def test_linked_data_is_written_once(self, tempdir: Path) -> None:
+        """In-memory contents should be written to the first destination and linked to the others."""
+        destinations: tuple[Path, ...] = tuple(tempdir.joinpath(f"dest_{index}") for index in range(3))
+
+        assert copy_data(b"packed", destinations, source="pack", link="hard") == ExitCode(0)
+
+        assert {dest.stat().st_ino for dest in destinations} == {destinations[0].stat().st_ino}
+        assert destinations[2].read_bytes() == b"packed"
+
+    def test_auto_hard_links_read_only_source(self, tempdir: Path, source: Path) -> None:
+        """--link=auto should hard-link a read-only source where the filesystem cannot clone."""
+        destinations: tuple[Path, ...] = (tempdir.joinpath("first"), tempdir.joinpath("second"))
+        source.chmod(0o444)
+
+        with mock.patch.object(
+            copy_module.copy_backends, "reflink", side_effect=OSError(errno.EOPNOTSUPP, "Operation not supported")
+        ) as mock_reflink:
+            assert copy_file(source, destinations, link="auto") == ExitCode(0)
+
+        mock_reflink.assert_called_once()
+        for dest in destinations:
+            assert dest.stat().st_ino == source.stat().st_ino
+
+    def test_failed_reflink_is_tried_once_per_target(self, tempdir: Path, source: Path) -> None:
+        """A filesystem that cannot clone should not be asked again for every destination."""
+        destinations: tuple[Path, ...] = tuple(tempdir.joinpath(f"dest_{index}") for index in range(20))
+
+        with mock.patch.object(
+            copy_module.copy_backends, "reflink", side_effect=OSError(errno.EOPNOTSUPP, "Operation not supported")
+        ) as mock_reflink:
+            assert copy_file(source, destinations, link="reflink") == ExitCode(0)
+
+        # Once with the source, and once with the first copy that replaced it as the target
+        assert mock_reflink.call_count == 2
+        for dest in destinations:
+            assert utils.compare_files(source, dest)
+
+
+class TestCopyData:
+    def test_writes_data_to_every_destination(self, tempdir: Path) -> None:
+        """Writes the same contents to multiple destinations."""
+        destinations: tuple[Path, ...] = tuple(tempdir.joinpath(utils.get_random_name()) for _ in range(3))
+
+        assert copy_data(memoryview(b"contents\n"), destinations, source="pack:t.txt") == ExitCode(0)
+        for dest in destinations:
+            assert dest.read_bytes() == b"contents\n"
+
+    def test_existing_destination_is_skipped(self, tempdir: Path) -> None:
+        """Without overwrite an existing destination is left alone and reported."""
+        dest: Path = tempdir.joinpath(utils.get_random_name())
+        dest.write_bytes(b"old")
+
+        with mock.patch.object(cli_io, "eprint"):
+            assert copy_data(b"new", (dest,), source="pack:t.txt") == ExitCode(1)
+        assert dest.read_bytes() == b"old"
+
+    def test_dry_run_writes_nothing(self, tempdir: Path) -> None:
+        """A dry run reports the copy with the given source but writes nothing."""
+        dest: Path = tempdir.joinpath(utils.get_random_name())
+
+        with mock.patch.object(cli_io, "print") as mock_print:
+            assert copy_data(b"new", (dest,), source="pack:t.txt", dry_run=True) == ExitCode(0)
+
+        assert not dest.exists()
+        mock_print.assert_called_once_with(f"[dry-run] would copy 'pack:t.txt' -> '{dest}'\n")
+
+    def test_no_destination_raises(self) -> None:
+        """Calling without destinations raises ValueError."""
+        with pytest.raises(ValueError):
+            copy_data(b"", source="pack:t.txt")
+
+
+class TestCopyStream:
+    def test_streams_to_every_destination(self, tempdir: Path) -> None:
+        """Every destination gets the whole stream, read in chunks rather than at once."""
+        data: bytes = os.urandom(3 * 1024 * 1024 + 1)
+        destinations: tuple[Path, ...] = tuple(tempdir.joinpath(utils.get_random_name()) for _ in range(2))
+        streams: list[io.BytesIO] = []
+
+        def open_source() -> io.BytesIO:
+            streams.append(io.BytesIO(data))
+            return streams[-1]
+
+        with mock.patch.object(copy_module.shutil, "copyfileobj", wraps=copy_module.shutil.copyfileobj) as mock_copy:
+            assert copy_stream(open_source, destinations, source="archive:t.bin") == ExitCode(0)
+
+        for dest in destinations:
+            assert dest.read_bytes() == data
+        assert len(streams) == 2 and all(stream.closed for stream in streams)
+        assert all(call.args[2] == copy_module._BUFFER_LIMIT for call in mock_copy.call_args_list)
+
+    def test_dry_run_opens_nothing(self, tempdir: Path) -> None:
+        """A dry run should neither open the source nor write the destination."""
+        dest: Path = tempdir.joinpath(utils.get_random_name())
+        open_source: mock.Mock = mock.Mock()
+
+        with mock.patch.object(cli_io, "print"):
+            assert copy_stream(open_source, (dest,), source="archive:t.txt", dry_run=True) == ExitCode(0)
+
+        open_source.assert_not_called()
+        assert not dest.exists()
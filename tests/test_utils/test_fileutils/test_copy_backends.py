@@ -0,0 +1,155 @@
+import errno
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+import makefiles.utils.fileutils.copy_backends as copy_backends
+
+
+@pytest.fixture(autouse=True)
+def strategies() -> Iterator[dict[tuple[int, int], int]]:
+    """Gives every test an empty strategy cache."""
+    cache: dict[tuple[int, int], int] = {}
+    with mock.patch.object(copy_backends, "_strategies", cache):
+        yield cache
+
+
+@pytest.fixture
+def source(tempdir: Path) -> Path:
+    """Creates a source file of a few hundred kilobytes."""
+    path: Path = tempdir.joinpath("source.bin")
+    path.write_bytes(os.urandom(300 * 1024))
+    return path
+
+
+def _copy(source: Path, dest: Path) -> copy_backends.Backend:
+    with open(source, "rb") as src_file, open(dest, "wb") as dest_file:
+        return copy_backends.copy(src_file.fileno(), dest_file.fileno(), os.fstat(src_file.fileno()).st_size)
+
+
+def _unsupported(*args: int) -> None:
+    raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+
+class TestCopy:
+    @pytest.mark.parametrize("backend", copy_backends.BACKENDS, ids=lambda backend: backend.__name__)
+    def test_every_backend_copies(self, tempdir: Path, source: Path, backend: copy_backends.Backend) -> None:
+        """Every backend should produce an exact copy where it is supported."""
+        dest: Path = tempdir.joinpath("dest")
+        with open(source, "rb") as src_file, open(dest, "wb") as dest_file:
+            try:
+                backend(src_file.fileno(), dest_file.fileno(), os.fstat(src_file.fileno()).st_size)
+            except OSError as e:
+                if e.errno not in copy_backends.UNSUPPORTED:
+                    raise
+                pytest.skip(f"{backend.__name__} is not supported here")
+
+        assert dest.read_bytes() == source.read_bytes()
+
+    def test_copies_with_the_cheapest_supported_backend(self, tempdir: Path, source: Path) -> None:
+        """Unsupported backends should be skipped in order until one works."""
+        dest: Path = tempdir.joinpath("dest")
+        calls: list[str] = []
+
+        def record(backend: copy_backends.Backend, supported: bool) -> copy_backends.Backend:
+            def wrapper(*args: int) -> None:
+                calls.append(backend.__name__)
+                if not supported:
+                    _unsupported()
+                backend(*args)
+
+            wrapper.__name__ = backend.__name__
+            return wrapper
+
+        backends = (
+            record(copy_backends.reflink, False),
+            record(copy_backends.copy_file_range, False),
+            record(copy_backends.sendfile, True),
+            record(copy_backends.userspace, True),
+        )
+        with mock.patch.object(copy_backends, "BACKENDS", backends):
+            assert _copy(source, dest) is backends[2]
+
+        assert calls == ["reflink", "copy_file_range", "sendfile"]
+        assert dest.read_bytes() == source.read_bytes()
+
+    def test_strategy_is_cached_per_device_pair(
+        self, tempdir: Path, source: Path, strategies: dict[tuple[int, int], int]
+    ) -> None:
+        """Later copies between the same filesystems should start at the backend that worked."""
+        reflink: mock.Mock = mock.Mock(side_effect=_unsupported, __name__="reflink")
+        backends = (reflink, copy_backends.copy_file_range, copy_backends.sendfile, copy_backends.userspace)
+
+        with mock.patch.object(copy_backends, "BACKENDS", backends):
+            _copy(source, tempdir.joinpath("first"))
+            _copy(source, tempdir.joinpath("second"))
+
+        assert reflink.call_count == 1
+        device: int = source.stat().st_dev
+        assert strategies[(device, device)] > 0
+        assert tempdir.joinpath("second").read_bytes() == source.read_bytes()
+
+    @pytest.mark.parametrize("error", [errno.ENOSPC, errno.EBADF, errno.ENOTSOCK])
+    def test_other_errors_are_raised(self, tempdir: Path, source: Path, error: int) -> None:
+        """A failure that is not an unsupported operation, such as a bad descriptor, should not fall back."""
+        fail: mock.Mock = mock.Mock(side_effect=OSError(error, os.strerror(error)), __name__="reflink")
+        userspace: mock.Mock = mock.Mock(__name__="userspace")
+
+        with mock.patch.object(copy_backends, "BACKENDS", (fail, userspace)), pytest.raises(OSError) as excinfo:
+            _copy(source, tempdir.joinpath("dest"))
+
+        assert excinfo.value.errno == error
+        userspace.assert_not_called()
+
+    def test_partial_copies_are_not_retried(self, tempdir: Path, source: Path) -> None:
+        """A backend that fails after writing should not be followed by another one."""
+
+        def partial(src_fd: int, dest_fd: int, size: int) -> None:
+            os.write(dest_fd, b"partial")
+            _unsupported()
+
+        userspace: mock.Mock = mock.Mock(__name__="userspace")
+        with mock.patch.object(copy_backends, "BACKENDS", (partial, userspace)), pytest.raises(OSError):
+            _copy(source, tempdir.joinpath("dest"))
+
+        userspace.assert_not_called()
+
+    def test_empty_kernel_copy_falls_back(self, tempdir: Path, source: Path) -> None:
+        """copy_file_range copying nothing, as on procfs, should leave the copy to the next backend."""
+        dest: Path = tempdir.joinpath("dest")
+        backends = (copy_backends.copy_file_range, copy_backends.userspace)
+
+        with (
+            mock.patch.object(copy_backends, "BACKENDS", backends),
+            mock.patch.object(os, "copy_file_range", return_value=0, create=True),
+        ):
+            assert _copy(source, dest) is copy_backends.userspace
+
+        assert dest.read_bytes() == source.read_bytes()
+
+    @pytest.mark.parametrize(
+        "backend", [copy_backends.copy_file_range, copy_backends.sendfile], ids=lambda b: b.__name__
+    )
+    def test_truncated_kernel_copy_raises(self, tempdir: Path, source: Path, backend: copy_backends.Backend) -> None:
+        """A source that ends before the expected size, e.g. one that shrank, should fail the copy."""
+        size: int = source.stat().st_size
+        with (
+            open(source, "rb") as src_file,
+            open(tempdir.joinpath("dest"), "wb") as dest_file,
+            pytest.raises(OSError) as excinfo,
+        ):
+            backend(src_file.fileno(), dest_file.fileno(), size + 1024)
+
+        if excinfo.value.errno in copy_backends.UNSUPPORTED:
+            pytest.skip(f"{backend.__name__} is not supported here")
+        assert excinfo.value.errno == errno.EIO
+
+    def test_missing_copy_file_range_is_unsupported(self) -> None:
+        """Platforms without copy_file_range should report it as unsupported."""
+        with mock.patch.object(copy_backends, "os", mock.Mock(spec=[])), pytest.raises(OSError) as excinfo:
+            copy_backends.copy_file_range(0, 1, 10)
+
+        assert excinfo.value.errno == errno.ENOSYS
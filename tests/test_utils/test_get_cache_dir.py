@@ -0,0 +1,22 @@
+import os
+import pathlib
+from unittest import mock
+
+import makefiles.utils as utils
+
+
+class TestGetCacheDir:
+    def test_default_falls_back_to_home_cache(self) -> None:
+        """Without XDG_CACHE_HOME the path should be ~/.cache/makefiles-cli."""
+        env: dict[str, str] = {k: v for k, v in os.environ.items() if k != "XDG_CACHE_HOME"}
+        with mock.patch.dict(os.environ, env, clear=True):
+            result: pathlib.Path = utils.get_cache_dir()
+
+        assert result == pathlib.Path.home().joinpath(".cache", "makefiles-cli")
+
+    def test_respects_xdg_cache_home(self, tmp_path: pathlib.Path) -> None:
+        """XDG_CACHE_HOME should be used as the base directory."""
+        with mock.patch.dict(os.environ, {"XDG_CACHE_HOME": str(tmp_path)}):
+            result: pathlib.Path = utils.get_cache_dir()
+
+        assert result == tmp_path.joinpath("makefiles-cli")
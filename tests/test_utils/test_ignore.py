@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import pytest
+
+import makefiles.utils.dirwalker as dirwalker
+import makefiles.utils.ignore as ignore
+import tests.utils as utils
+
+
+class TestIgnoreMatcher:
+    @pytest.mark.parametrize(
+        "patterns, path, is_dir, expected",
+        [
+            ("*.pyc", "a.pyc", False, True),
+            ("*.pyc", "deep/down/a.pyc", False, True),
+            ("*.pyc", "a.py", False, False),
+            ("build/", "build", True, True),
+            ("build/", "build", False, False),
+            ("build/", "src/build", True, True),
+            ("/build", "build", True, True),
+            ("/build", "src/build", True, False),
+            ("docs/*.md", "docs/a.md", False, True),
+            ("docs/*.md", "docs/sub/a.md", False, False),
+            ("docs/*.md", "x/docs/a.md", False, False),
+            ("**/vendor", "a/b/vendor", True, True),
+            ("**/vendor", "vendor", True, True),
+            ("a/**/z", "a/z", False, True),
+            ("a/**/z", "a/b/c/z", False, True),
+            ("out/**", "out/x/y", False, True),
+            ("out/**", "out", True, False),
+            ("file?.txt", "file1.txt", False, True),
+            ("file?.txt", "file10.txt", False, False),
+            ("[ab].txt", "a.txt", False, True),
+            ("[!ab].txt", "a.txt", False, False),
+            ("[!ab].txt", "c.txt", False, True),
+            ("\\#hash", "#hash", False, True),
+            ("# comment", "# comment", False, False),
+            ("*.log\n!keep.log", "keep.log", False, False),
+            ("*.log\n!keep.log", "drop.log", False, True),
+            ("!keep.log\n*.log", "keep.log", False, True),
+            ("[z-a].txt\n*.tmp", "x.tmp", False, True),
+        ],
+    )
+    def test_pattern(self, patterns: str, path: str, is_dir: bool, expected: bool) -> None:
+        """Patterns should follow gitignore matching rules."""
+        assert ignore.IgnoreMatcher(patterns).ignores(path, is_dir=is_dir) is expected
+
+    def test_empty_matcher_is_falsy(self) -> None:
+        """A matcher without effective patterns should be falsy."""
+        assert not ignore.IgnoreMatcher("# only a comment\n\n")
+        assert ignore.IgnoreMatcher("*.tmp")
+
+    def test_read_missing_ignore_file(self, tempdir: Path) -> None:
+        """A directory without .mkfileignore should yield empty text."""
+        assert ignore.read_ignore_file(tempdir) == ""
+
+    def test_walk_prunes_ignored_directories(self, tempdir: Path) -> None:
+        """listf with a matcher should skip ignored files and whole ignored subtrees."""
+        utils.create_file(tempdir.joinpath("main.py"))
+        utils.create_file(tempdir.joinpath("main.pyc"))
+        utils.create_file(tempdir.joinpath("web", "node_modules", "lib", "x.js"))
+        utils.create_file(tempdir.joinpath("web", "app.js"))
+
+        matcher: ignore.IgnoreMatcher = ignore.IgnoreMatcher("node_modules/\n*.pyc\n")
+
+        assert sorted(dirwalker.listf(tempdir, ignore=matcher)) == ["main.py", "web/app.js"]
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+import makefiles.exceptions as exceptions
+import makefiles.utils.index_watcher as index_watcher
+import makefiles.utils.template_index as template_index
+import tests.utils as utils
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> bool:
+    deadline: float = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def _cached(root: Path) -> list[str]:
+    return sorted(template_index.TemplateIndex.load(root))
+
+
+class TestIndexWatcher:
+    @pytest.fixture
+    def watched(self, tempdir: Path) -> Iterator[Path]:
+        """Runs a watcher for *tempdir* in a background thread."""
+        utils.create_file(tempdir.joinpath("one.txt"))
+        utils.create_file(tempdir.joinpath("sub", "two.txt"))
+
+        stop: threading.Event = threading.Event()
+        thread: threading.Thread = threading.Thread(target=index_watcher.watch, args=(tempdir,), kwargs={"stop": stop})
+        thread.start()
+
+        assert _wait_for(lambda: template_index.is_watched(tempdir))
+        yield tempdir
+
+        stop.set()
+        thread.join()
+
+    def test_initial_index_is_written(self, watched: Path) -> None:
+        """The watcher should save a complete index before reporting ready."""
+        assert _cached(watched) == ["one.txt", "sub/two.txt"]
+
+    def test_created_file_is_added(self, watched: Path) -> None:
+        """A new file should appear in the cached index."""
+        utils.create_file(watched.joinpath("sub", "three.txt"))
+
+        assert _wait_for(lambda: "sub/three.txt" in _cached(watched))
+
+    def test_deleted_file_is_removed(self, watched: Path) -> None:
+        """A deleted file should disappear from the cached index."""
+        watched.joinpath("one.txt").unlink()
+
+        assert _wait_for(lambda: _cached(watched) == ["sub/two.txt"])
+
+    def test_new_directory_tree_is_indexed_and_watched(self, watched: Path) -> None:
+        """Files in a newly created directory, and files added to it later, should be indexed."""
+        utils.create_file(watched.joinpath("new", "deep", "a.txt"))
+        assert _wait_for(lambda: "new/deep/a.txt" in _cached(watched))
+
+        utils.create_file(watched.joinpath("new", "deep", "b.txt"))
+        assert _wait_for(lambda: "new/deep/b.txt" in _cached(watched))
+
+    def test_renamed_directory_moves_its_files(self, watched: Path) -> None:
+        """Renaming a directory should move its files to the new prefix."""
+        watched.joinpath("sub").rename(watched.joinpath("moved"))
+
+        assert _wait_for(lambda: _cached(watched) == ["moved/two.txt", "one.txt"])
+
+    def test_ignore_file_is_applied(self, watched: Path) -> None:
+        """Writing .mkfileignore should drop matching entries and keep new matches out."""
+        watched.joinpath(".mkfileignore").write_text("sub/\n*.log\n")
+        assert _wait_for(lambda: _cached(watched) == ["one.txt"])
+
+        utils.create_file(watched.joinpath("debug.log"))
+        utils.create_file(watched.joinpath("two.txt"))
+        assert _wait_for(lambda: _cached(watched) == ["one.txt", "two.txt"])
+
+    def test_rewritten_file_updates_metadata(self, watched: Path) -> None:
+        """Metadata should be collected up front and recollected when a template is rewritten."""
+        assert template_index.TemplateIndex.load(watched).meta.keys() == {"one.txt", "sub/two.txt"}
+
+        watched.joinpath("one.txt").write_bytes(b"a\nb\nc\n")
+
+        def lines() -> int | None:
+            file_meta = template_index.TemplateIndex.load(watched).meta.get("one.txt")
+            return None if file_meta is None else file_meta.lines
+
+        assert _wait_for(lambda: lines() == 3)
+
+    def test_get_index_skips_revalidation_while_watched(self, watched: Path) -> None:
+        """get_index should serve the cached index as-is while a watcher runs."""
+        index_path: Path = template_index.get_index_path(watched)
+        before: int = index_path.stat().st_mtime_ns
+
+        assert sorted(template_index.get_index(watched)) == ["one.txt", "sub/two.txt"]
+        assert index_path.stat().st_mtime_ns == before
+
+    def test_second_watcher_is_rejected(self, watched: Path) -> None:
+        """Only one watcher may run per template directory."""
+        with pytest.raises(exceptions.IndexWatchError):
+            index_watcher.watch(watched, stop=threading.Event())
+
+    def test_not_watched_after_stop(self, tempdir: Path) -> None:
+        """Once the watcher stops, readers should go back to revalidating."""
+        stop: threading.Event = threading.Event()
+        stop.set()
+        index_watcher.watch(tempdir, stop=stop)
+
+        assert not template_index.is_watched(tempdir)
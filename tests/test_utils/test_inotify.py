@@ -0,0 +1,33 @@
+from pathlib import Path
+
+import makefiles.utils.inotify as inotify
+import tests.utils as utils
+
+
+class TestInotify:
+    def test_reports_created_file(self, tempdir: Path) -> None:
+        """Creating a file in a watched directory should produce an IN_CREATE event with its name."""
+        with inotify.Inotify() as notifier:
+            wd: int = notifier.add_watch(str(tempdir), inotify.IN_CREATE)
+            utils.create_file(tempdir.joinpath("new.txt"))
+
+            events: list[inotify.Event] = notifier.read_events(timeout=1)
+
+        assert [(event.wd, event.name) for event in events if event.mask & inotify.IN_CREATE] == [(wd, "new.txt")]
+
+    def test_timeout_returns_no_events(self, tempdir: Path) -> None:
+        """read_events should return an empty list when nothing happens."""
+        with inotify.Inotify() as notifier:
+            notifier.add_watch(str(tempdir), inotify.IN_CREATE)
+
+            assert notifier.read_events(timeout=0) == []
+
+    def test_missing_path_raises_oserror(self, tempdir: Path) -> None:
+        """Watching a path that does not exist should raise OSError."""
+        with inotify.Inotify() as notifier:
+            try:
+                notifier.add_watch(str(tempdir.joinpath("missing")), inotify.IN_CREATE)
+            except OSError:
+                return
+
+        raise AssertionError("add_watch did not raise")
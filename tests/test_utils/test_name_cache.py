@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import makefiles.utils.name_cache as name_cache
+import tests.utils as utils
+
+
+class TestNameCache:
+    def test_round_trip(self, tempdir: Path) -> None:
+        """Saved names should load back in sorted order."""
+        name_cache.save(tempdir, ["b.txt", "a/c.txt", "a/b.txt"])
+
+        names = name_cache.load(tempdir)
+
+        assert names is not None
+        assert list(names) == ["a/b.txt", "a/c.txt", "b.txt"]
+
+    def test_missing_file_loads_none(self, tempdir: Path) -> None:
+        """A root that was never saved should have no cached names."""
+        assert name_cache.load(tempdir.joinpath(utils.get_random_name())) is None
+
+    def test_corrupt_file_loads_none(self, tempdir: Path) -> None:
+        """A damaged names file should be ignored."""
+        name_cache.save(tempdir, ["a.txt"])
+        names_path: Path = name_cache.get_names_path(tempdir)
+        names_path.write_bytes(names_path.read_bytes()[:-3])
+
+        assert name_cache.load(tempdir) is None
+
+    def test_file_of_another_root_loads_none(self, tempdir: Path) -> None:
+        """A names file recorded for a different root should not be used."""
+        other: Path = tempdir.joinpath("other")
+        name_cache.save(other, ["a.txt"])
+        name_cache.get_names_path(tempdir).parent.mkdir(parents=True, exist_ok=True)
+        name_cache.get_names_path(tempdir).write_bytes(name_cache.get_names_path(other).read_bytes())
+
+        assert name_cache.load(tempdir) is None
@@ -0,0 +1,125 @@
+import random
+import sys
+
+import pytest
+
+from makefiles.utils.name_store import NameStore
+
+
+def _sorted(names: list[str]) -> list[str]:
+    return sorted(set(names), key=lambda name: name.encode("utf-8", "surrogateescape"))
+
+
+class TestNameStore:
+    @pytest.fixture
+    def names(self) -> list[str]:
+        """Generates nested template names with plenty of shared prefixes and duplicates."""
+        return [
+            f"lang_{random.randint(0, 20)}/group_{random.randint(0, 5)}/template_{random.randint(0, 300)}.txt"
+            for _ in range(3000)
+        ]
+
+    def test_iterates_sorted_unique_names(self, names: list[str]) -> None:
+        """Iteration should yield every distinct name once, in sorted order."""
+        store: NameStore = NameStore(names)
+
+        assert list(store) == _sorted(names)
+        assert len(store) == len(set(names))
+
+    def test_membership(self, names: list[str]) -> None:
+        """Stored names should be members; their prefixes and unknown names should not."""
+        store: NameStore = NameStore(names)
+
+        assert all(name in store for name in names)
+        assert "lang_0/group_0" not in store
+        assert "missing.txt" not in store
+        assert 42 not in store
+
+    def test_index_and_getitem_agree(self, names: list[str]) -> None:
+        """store[store.index(name)] should give back the name."""
+        store: NameStore = NameStore(names)
+        expected: list[str] = _sorted(names)
+
+        for position in range(0, len(expected), 7):
+            assert store[position] == expected[position]
+            assert store.index(expected[position]) == position
+        assert store[-1] == expected[-1]
+
+    def test_index_of_unknown_name_raises(self) -> None:
+        """index should raise ValueError like list.index."""
+        with pytest.raises(ValueError):
+            NameStore(["a.txt"]).index("b.txt")
+
+    def test_getitem_out_of_range_raises(self) -> None:
+        """Positions outside the store should raise IndexError."""
+        with pytest.raises(IndexError):
+            NameStore(["a.txt"])[1]
+
+    @pytest.mark.parametrize("prefix", ["", "lang_1", "lang_1/", "lang_2/group_3/template_1", "zzz"])
+    def test_iter_prefix(self, names: list[str], prefix: str) -> None:
+        """iter_prefix should yield exactly the sorted names starting with the prefix."""
+        store: NameStore = NameStore(names)
+
+        assert list(store.iter_prefix(prefix)) == [name for name in _sorted(names) if name.startswith(prefix)]
+
+    def test_non_ascii_and_undecodable_names(self) -> None:
+        """Names that came from undecodable file names should round-trip."""
+        names: list[str] = ["café/menu.txt", "raw\udcff.bin", "plain.txt"]
+        store: NameStore = NameStore(names)
+
+        assert list(store) == _sorted(names)
+        assert "raw\udcff.bin" in store
+        assert list(store.iter_prefix("caf")) == ["café/menu.txt"]
+
+    def test_long_shared_prefixes(self) -> None:
+        """Names sharing more than 127 leading bytes should be stored correctly."""
+        names: list[str] = ["a" * 300 + suffix for suffix in ("x", "y", "z/deep.txt")]
+
+        assert list(NameStore(names)) == sorted(names)
+
+    def test_empty_store(self) -> None:
+        """An empty store should behave like an empty sorted set."""
+        store: NameStore = NameStore()
+
+        assert len(store) == 0
+        assert list(store) == []
+        assert list(store.iter_prefix("")) == []
+        assert "a" not in store
+
+    def test_smaller_than_list_of_strings(self, names: list[str]) -> None:
+        """The front-coded store should need a fraction of the memory of the names themselves."""
+        unique: list[str] = list(set(names))
+        list_size: int = sys.getsizeof(unique) + sum(sys.getsizeof(name) for name in unique)
+
+        assert sys.getsizeof(NameStore(unique)) * 5 < list_size
+
+    def test_serialisation_round_trip(self, names: list[str]) -> None:
+        """from_bytes(to_bytes()) should give an equal store."""
+        store: NameStore = NameStore(names)
+
+        assert list(NameStore.from_bytes(store.to_bytes())) == list(store)
+        assert list(NameStore.from_bytes(NameStore().to_bytes())) == []
+
+    @pytest.mark.parametrize("data", [b"", b"garbage", b"MKN1" + bytes(30)])
+    def test_from_bytes_rejects_garbage(self, data: bytes) -> None:
+        """from_bytes should raise ValueError for data it did not produce."""
+        with pytest.raises(ValueError):
+            NameStore.from_bytes(data)
+
+    @pytest.mark.parametrize("prefix", ["", "lang_1", "lang_1/", "lang_2/group_3/", "lang_2/group_3/template_1", "zzz"])
+    def test_iter_completions(self, names: list[str], prefix: str) -> None:
+        """iter_completions should cut every match after the next separator and report it once."""
+        expected: list[str] = []
+        for name in _sorted(names):
+            if name.startswith(prefix):
+                cut: int = name.find("/", len(prefix))
+                completion: str = name if cut < 0 else name[: cut + 1]
+                if completion not in expected:
+                    expected.append(completion)
+
+        assert list(NameStore(names).iter_completions(prefix)) == expected
+
+    @pytest.mark.parametrize("prefix", ["", "lang_1", "lang_1/", "lang_2/group_3/", "lang_2/group_3/template_1", "zzz"])
+    def test_count_prefix(self, names: list[str], prefix: str) -> None:
+        """count_prefix should count the distinct names that start with the prefix."""
+        assert NameStore(names).count_prefix(prefix) == len({name for name in names if name.startswith(prefix)})
@@ -0,0 +1,22 @@
+import makefiles.utils.natural_order as natural_order
+
+
+class TestNaturalOrder:
+    def test_numbers_sort_by_value(self) -> None:
+        """Runs of digits should be compared by their numeric value."""
+        assert natural_order.sort(["file10.txt", "file2.txt", "file1.txt"]) == ["file1.txt", "file2.txt", "file10.txt"]
+
+    def test_case_is_ignored(self) -> None:
+        """Upper- and lower-case names should be interleaved."""
+        assert natural_order.sort(["main.c", "Makefile", "lib.c"]) == ["lib.c", "main.c", "Makefile"]
+
+    def test_shorter_name_first(self) -> None:
+        """A name should come before the names it is a prefix of, and numbers before other characters."""
+        assert natural_order.sort(["a/b", "a1", "a"]) == ["a", "a1", "a/b"]
+
+    def test_keys_are_unique(self) -> None:
+        """Names that only differ in case or leading zeros should still get distinct keys."""
+        names: list[str] = ["a1", "a01", "A1"]
+
+        assert len({natural_order.sort_key(name) for name in names}) == len(names)
+        assert natural_order.sort(names) == natural_order.sort(reversed(names))
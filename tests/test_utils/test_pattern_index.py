@@ -0,0 +1,64 @@
+import pytest
+
+import makefiles.utils.pattern_index as pattern_index
+
+
+class TestGetKeys:
+    @pytest.mark.parametrize(
+        ("filename", "keys"),
+        [
+            ("test_parser.py", ["test_parser.py", "test_*.py", "*.py"]),
+            ("Dockerfile", ["dockerfile"]),
+            ("backup.tar.gz", ["backup.tar.gz", "*.tar.gz", "*.gz"]),
+            ("my-module.js", ["my-module.js", "my-*.js", "*.js"]),
+            (".bashrc", [".bashrc"]),
+            ("*.py", ["*.py"]),
+            ("test_*.py", ["test_*.py", "*.py"]),
+        ],
+    )
+    def test_keys_most_specific_first(self, filename: str, keys: list[str]) -> None:
+        """Keys should go from the whole name to the last suffix, without duplicates."""
+        assert pattern_index.get_keys(filename) == keys
+
+
+class TestPatternIndex:
+    NAMES: list[str] = [
+        "docker/Dockerfile",
+        "python/script.py",
+        "python/test_module.py",
+        "python/web/server.py",
+        "shell/script.sh",
+    ]
+
+    def test_lookup_by_suffix(self) -> None:
+        """A destination should get the shallowest, shortest template with its suffix."""
+        index = pattern_index.PatternIndex(self.NAMES)
+
+        assert index.lookup("main.py") == 1
+        assert index.lookup("run.sh") == 4
+
+    def test_lookup_by_prefix_pattern(self) -> None:
+        """A prefixed destination should prefer a template with the same prefix."""
+        index = pattern_index.PatternIndex(self.NAMES)
+
+        assert index.lookup("test_cli.py") == 2
+
+    def test_lookup_by_whole_name_ignores_case(self) -> None:
+        """A destination named like a template should get that template."""
+        index = pattern_index.PatternIndex(self.NAMES)
+
+        assert index.lookup("dockerfile") == 0
+
+    def test_lookup_without_match(self) -> None:
+        """A destination no template fits should give None."""
+        index = pattern_index.PatternIndex(self.NAMES)
+
+        assert index.lookup("notes.md") is None
+        assert index.lookup("Makefile") is None
+
+    def test_template_named_after_pattern(self) -> None:
+        """A template named like a pattern should serve that pattern."""
+        index = pattern_index.PatternIndex(["python/any.py", "python/test_*.py"])
+
+        assert index.lookup("test_cli.py") == 1
+        assert index.lookup("cli.py") == 0
@@ -10,20 +10,20 @@ class TestSimplePrompt:
     def test_returns_correct_selection(self) -> None:
         """Should return the correct option based on valid user input."""
         options: list[str] = ["delta", "alpha", "charlie"]
-        user_input: str = "2"  # sorted: ["alpha", "charlie", "delta"] => index 2 = "charlie"
+        user_input: str = "2"  # shown in the given order => index 2 = "alpha"
 
         with (
             mock.patch.object(cli_io, "input", return_value=user_input),
             mock.patch.object(cli_io, "eprint") as mock_eprint,
         ):
             result: str = manual(options)
-            assert result == "charlie"
+            assert result == "alpha"
 
-            # Print should include numbered options
+            # Print should include numbered options, in the given order
             printed_lines: list[str] = [call.args[0] for call in mock_eprint.call_args_list]
-            assert "[1]: alpha" in printed_lines[0]
-            assert "[2]: charlie" in printed_lines[1]
-            assert "[3]: delta" in printed_lines[2]
+            assert "[1]: delta" in printed_lines[0]
+            assert "[2]: alpha" in printed_lines[1]
+            assert "[3]: charlie" in printed_lines[2]
 
     @pytest.mark.parametrize("bad_input", ["abc", "0", "-1", "99", "", "3.14"])
     def test_invalid_inputs_retry_until_valid(self, bad_input: str) -> None:
@@ -43,8 +43,8 @@ class TestSimplePrompt:
 
     def test_exact_bounds_selection(self) -> None:
         """Should accept lowest and highest valid index values."""
-        options: list[str] = ["x", "a", "z"]  # sorted: ["a", "x", "z"]
+        options: list[str] = ["x", "a", "z"]
 
-        for index, expected in enumerate(sorted(options), start=1):
+        for index, expected in enumerate(options, start=1):
             with mock.patch.object(cli_io, "input", return_value=str(index)):
                 assert manual(options) == expected
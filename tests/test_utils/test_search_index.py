@@ -0,0 +1,172 @@
+import os
+import sqlite3
+from collections.abc import Iterator
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+import makefiles.exceptions as exceptions
+import makefiles.utils.search_index as search_index
+import makefiles.utils.template_catalog as template_catalog
+import makefiles.utils.template_pack as template_pack
+
+
+def _sync(index: search_index.SearchIndex, *roots: Path) -> int:
+    catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+    return index.sync(
+        catalog.roots,
+        catalog.iter_sources(),
+        bundles=catalog.get_bundle_files(),
+        read_contents=catalog.read_contents,
+    )
+
+
+class TestBuildQuery:
+    def test_words_become_phrases(self) -> None:
+        """Every word should be quoted so punctuation needs no escaping."""
+        assert search_index.build_query("std::vector foo-bar") == '"std::vector" "foo-bar"'
+
+    def test_trailing_star_is_prefix(self) -> None:
+        """A trailing star should turn the word into a prefix query."""
+        assert search_index.build_query("sub* x") == '"sub"* "x"'
+
+    def test_quotes_are_escaped(self) -> None:
+        """Double quotes inside a word should be doubled."""
+        assert search_index.build_query('say"hi') == '"say""hi"'
+
+    def test_blank_query_is_empty(self) -> None:
+        """A query without words should produce an empty FTS query."""
+        assert search_index.build_query("  * ") == ""
+
+
+class TestSearchIndex:
+    @pytest.fixture
+    def index(self, tempdir: Path) -> Iterator[search_index.SearchIndex]:
+        """Opens a search index private to the test."""
+        with search_index.SearchIndex(tempdir.joinpath("cache", "search.sqlite3")) as index:
+            yield index
+
+    @pytest.fixture
+    def root(self, tempdir: Path) -> Path:
+        """Creates a template directory with a few text templates and a binary one."""
+        root: Path = tempdir.joinpath("templates")
+        root.joinpath("python").mkdir(parents=True)
+        root.joinpath("python", "cli.py").write_text("import argparse\nparser = argparse.ArgumentParser()\n")
+        root.joinpath("python", "script.py").write_text("def main() -> None:\n    pass\n")
+        root.joinpath("Makefile").write_text("all:\n\tgcc main.c -o main\n")
+        root.joinpath("logo.png").write_bytes(b"\x89PNG\x00argparse")
+        return root
+
+    def test_finds_templates_by_contents(self, index: search_index.SearchIndex, root: Path) -> None:
+        """Templates should be found by the words they contain."""
+        _sync(index, root)
+
+        assert index.search("argparse", [root]) == ["python/cli.py"]
+        assert index.search("main", [root]) == ["Makefile", "python/script.py"]
+
+    def test_packed_root_is_searched_from_pack(self, index: search_index.SearchIndex, root: Path) -> None:
+        """Templates of a packed root should be indexed from the pack, and again once it is rewritten."""
+        template_pack.write_pack(root)
+        root.joinpath("python", "cli.py").write_text("import click\n")
+
+        _sync(index, root)
+        assert index.search("argparse", [root]) == ["python/cli.py"]
+        assert index.search("click", [root]) == []
+
+        template_pack.write_pack(root)
+        _sync(index, root)
+        assert index.search("click", [root]) == ["python/cli.py"]
+
+    def test_all_words_must_match(self, index: search_index.SearchIndex, root: Path) -> None:
+        """Only templates containing every word should match."""
+        _sync(index, root)
+
+        assert index.search("main gcc", [root]) == ["Makefile"]
+        assert index.search("argparse gcc", [root]) == []
+
+    def test_prefix_query(self, index: search_index.SearchIndex, root: Path) -> None:
+        """A trailing star should match words starting with the prefix."""
+        _sync(index, root)
+
+        assert index.search("argp*", [root]) == ["python/cli.py"]
+
+    def test_binary_templates_never_match(self, index: search_index.SearchIndex, root: Path) -> None:
+        """Binary templates should be recorded without searchable contents."""
+        _sync(index, root)
+
+        assert "logo.png" not in index.search("argparse", [root])
+
+    def test_unchanged_templates_are_not_read_again(self, index: search_index.SearchIndex, root: Path) -> None:
+        """A second sync should only read templates whose size or mtime changed."""
+        assert _sync(index, root) == 4
+        assert _sync(index, root) == 0
+
+        template: Path = root.joinpath("python", "script.py")
+        template.write_text("def main() -> int:\n    return 0\n")
+        os.utime(template, ns=(0, 0))
+
+        assert _sync(index, root) == 1
+        assert index.search("return", [root]) == ["python/script.py"]
+        assert index.search("pass", [root]) == []
+
+    def test_removed_templates_are_dropped(self, index: search_index.SearchIndex, root: Path) -> None:
+        """Templates that disappeared should no longer match."""
+        _sync(index, root)
+        root.joinpath("python", "cli.py").unlink()
+        _sync(index, root)
+
+        assert index.search("argparse", [root]) == []
+
+    def test_shadowed_templates_are_not_searched(self, index: search_index.SearchIndex, tempdir: Path) -> None:
+        """Only the template of the root that provides a name should be searched."""
+        user: Path = tempdir.joinpath("user")
+        team: Path = tempdir.joinpath("team")
+        user.mkdir()
+        team.mkdir()
+        user.joinpath("shared.txt").write_text("user copy\n")
+        team.joinpath("shared.txt").write_text("team copy\n")
+        team.joinpath("team.txt").write_text("team only\n")
+
+        _sync(index, user, team)
+
+        assert index.search("team", [user, team]) == ["team.txt"]
+        assert index.search("user", [user, team]) == ["shared.txt"]
+
+    def test_other_roots_are_left_alone(self, index: search_index.SearchIndex, tempdir: Path, root: Path) -> None:
+        """Syncing one root should neither drop nor return records of another root."""
+        other: Path = tempdir.joinpath("other")
+        other.mkdir()
+        other.joinpath("notes.txt").write_text("argparse notes\n")
+
+        _sync(index, root)
+        _sync(index, other)
+
+        assert index.search("argparse", [root]) == ["python/cli.py"]
+        assert index.search("argparse", [other]) == ["notes.txt"]
+
+    def test_persists_across_connections(self, tempdir: Path, root: Path) -> None:
+        """A reopened index should not read unchanged templates again."""
+        path: Path = tempdir.joinpath("search.sqlite3")
+        with search_index.SearchIndex(path) as index:
+            _sync(index, root)
+
+        with search_index.SearchIndex(path) as index:
+            assert _sync(index, root) == 0
+            assert index.search("argparse", [root]) == ["python/cli.py"]
+
+    def test_corrupt_database_is_rebuilt(self, tempdir: Path, root: Path) -> None:
+        """An unreadable database file should be replaced by a fresh one."""
+        path: Path = tempdir.joinpath("search.sqlite3")
+        path.write_bytes(b"not a database" * 100)
+
+        with search_index.SearchIndex(path) as index:
+            assert _sync(index, root) == 4
+
+    def test_missing_fts5_raises(self, tempdir: Path) -> None:
+        """SQLite without FTS5 should raise SearchIndexError."""
+        with mock.patch.object(
+            search_index.SearchIndex, "_open", side_effect=sqlite3.OperationalError("no such module: fts5")
+        ):
+            with pytest.raises(exceptions.SearchIndexError):
+                search_index.SearchIndex(tempdir.joinpath("search.sqlite3"))
@@ -0,0 +1,155 @@
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import Literal
+
+import pytest
+
+import makefiles.exceptions as exceptions
+import makefiles.utils.template_archive as template_archive
+
+_MEMBERS: dict[str, bytes] = {
+    "python/script.py": b"print('hi')\n",
+    "python/cli/main.py": b"import argparse\nparser = None",
+    "logo.png": b"\x89PNG\x00\x01",
+    ".hidden": b"secret\n",
+}
+
+
+def _write_zip(path: Path) -> Path:
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("python/", b"")
+        for name, data in _MEMBERS.items():
+            archive.writestr(name, data)
+    return path
+
+
+def _write_tar(path: Path, mode: Literal["w", "w:gz"] = "w") -> Path:
+    with tarfile.open(path, mode) as archive:
+        directory: tarfile.TarInfo = tarfile.TarInfo("./python")
+        directory.type = tarfile.DIRTYPE
+        archive.addfile(directory)
+        for name, data in _MEMBERS.items():
+            member: tarfile.TarInfo = tarfile.TarInfo(f"./{name}")
+            member.size = len(data)
+            member.mtime = 1_700_000_000
+            archive.addfile(member, io.BytesIO(data))
+        link: tarfile.TarInfo = tarfile.TarInfo("./link.py")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "python/script.py"
+        archive.addfile(link)
+    return path
+
+
+class TestTemplateArchive:
+    @pytest.fixture(params=["zip", "tar", "tar.gz"])
+    def archive_path(self, request: pytest.FixtureRequest, tempdir: Path) -> Path:
+        """Creates a template archive of every supported kind."""
+        if request.param == "zip":
+            return _write_zip(tempdir.joinpath("templates.zip"))
+        if request.param == "tar":
+            return _write_tar(tempdir.joinpath("templates.tar"))
+        return _write_tar(tempdir.joinpath("templates.tar.gz"), "w:gz")
+
+    def test_lists_regular_visible_members(self, archive_path: Path) -> None:
+        """Only regular, non-hidden members should be listed, in sorted order."""
+        archive: template_archive.TemplateArchive | None = template_archive.load(archive_path)
+
+        assert archive is not None
+        assert list(archive) == ["logo.png", "python/cli/main.py", "python/script.py"]
+
+    def test_reads_single_member(self, archive_path: Path) -> None:
+        """read() should return the contents of a member, and None for unknown names."""
+        archive: template_archive.TemplateArchive | None = template_archive.load(archive_path)
+
+        assert archive is not None
+        for name in archive:
+            assert archive.read(name) == _MEMBERS[name]
+        assert archive.read(".hidden") is None
+        assert archive.read("missing.txt") is None
+
+    def test_max_depth_and_entries(self, archive_path: Path) -> None:
+        """max_depth should hide deeper members and max_entries mark the archive truncated."""
+        archive: template_archive.TemplateArchive | None = template_archive.load(
+            archive_path, max_depth=2, max_entries=1
+        )
+
+        assert archive is not None
+        assert list(archive) == ["logo.png", "python/script.py"]
+        assert archive.truncated
+
+    def test_streams_single_member(self, archive_path: Path) -> None:
+        """open() should give a file object over one member, and raise KeyError for unknown names."""
+        archive: template_archive.TemplateArchive | None = template_archive.load(archive_path)
+        assert archive is not None
+
+        with archive:
+            with archive.open("python/cli/main.py") as member:
+                assert member.read(7) == b"import "
+                assert member.read() == b"argparse\nparser = None"
+
+            with pytest.raises(KeyError), archive.open(".hidden"):
+                pass
+
+    def test_damaged_member_raises(self, tempdir: Path) -> None:
+        """A member that cannot be extracted any more should raise TemplateArchiveError from open()."""
+        archive_path: Path = _write_tar(tempdir.joinpath("templates.tar.gz"), "w:gz")
+        archive: template_archive.TemplateArchive | None = template_archive.load(archive_path)
+        assert archive is not None
+        with archive_path.open("r+b") as file:
+            file.truncate(archive_path.stat().st_size // 2)
+
+        with pytest.raises(exceptions.TemplateArchiveError):
+            with archive.open("python/script.py") as member:
+                member.read()
+        assert archive.read("python/script.py") is None
+
+    def test_zip_is_closed(self, tempdir: Path) -> None:
+        """A zip archive should only be held open between reading a member and close()."""
+        archive: template_archive.TemplateArchive | None = template_archive.load(_write_zip(tempdir.joinpath("t.zip")))
+        assert isinstance(archive, template_archive.ZipTemplateArchive)
+        assert archive._zip is None
+
+        assert archive.read("logo.png") == _MEMBERS["logo.png"]
+        assert archive._zip is not None
+
+        archive.close()
+        assert archive._zip is None
+
+    def test_records_metadata(self, archive_path: Path) -> None:
+        """meta should hold the size and line count of every member, None lines for binaries."""
+        archive: template_archive.TemplateArchive | None = template_archive.load(archive_path)
+
+        assert archive is not None
+        assert archive.meta["python/cli/main.py"].size == len(_MEMBERS["python/cli/main.py"])
+        assert archive.meta["python/cli/main.py"].lines == 2
+        assert archive.meta["logo.png"].lines is None
+
+    def test_tar_member_index_is_cached(self, tempdir: Path) -> None:
+        """A tar archive should be listed from its cached member index until it changes."""
+        archive_path: Path = _write_tar(tempdir.joinpath("templates.tar"))
+        template_archive.load(archive_path)
+        index_path: Path = template_archive.get_tar_index_path(archive_path)
+        assert index_path.is_file()
+
+        mtime_ns: int = index_path.stat().st_mtime_ns
+        assert template_archive.load(archive_path) is not None
+        assert index_path.stat().st_mtime_ns == mtime_ns
+
+        with tarfile.open(archive_path, "a") as tar:
+            member: tarfile.TarInfo = tarfile.TarInfo("added.txt")
+            tar.addfile(member, io.BytesIO(b""))
+
+        archive: template_archive.TemplateArchive | None = template_archive.load(archive_path)
+        assert archive is not None
+        assert "added.txt" in archive
+
+    def test_directory_and_plain_file_are_not_archives(self, tempdir: Path) -> None:
+        """load() should return None for directories and files that are no archives."""
+        plain: Path = tempdir.joinpath("notes.txt")
+        plain.write_bytes(b"just text\n")
+
+        assert template_archive.load(tempdir) is None
+        assert template_archive.load(plain) is None
+        assert template_archive.load(tempdir.joinpath("missing.zip")) is None
@@ -0,0 +1,203 @@
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+import makefiles.exceptions as exceptions
+import makefiles.utils.natural_order as natural_order
+import makefiles.utils.template_catalog as template_catalog
+import makefiles.utils.template_pack as template_pack
+import tests.utils as utils
+
+
+class TestTemplateCatalog:
+    @pytest.fixture
+    def roots(self, tempdir: Path) -> tuple[Path, Path]:
+        """Creates a user root and a team root that share one template name."""
+        user: Path = tempdir.joinpath("user")
+        team: Path = tempdir.joinpath("team")
+
+        utils.create_file(user.joinpath("shared.txt"))
+        utils.create_file(user.joinpath("mine.py"))
+        utils.create_file(team.joinpath("shared.txt"))
+        utils.create_file(team.joinpath("lang", "team.sh"))
+
+        return user, team
+
+    def test_merges_all_roots(self, roots: tuple[Path, Path]) -> None:
+        """Every template name should appear exactly once."""
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+
+        assert sorted(catalog) == ["lang/team.sh", "mine.py", "shared.txt"]
+        assert len(catalog) == 3
+
+    def test_earlier_root_shadows_later(self, roots: tuple[Path, Path]) -> None:
+        """A name present in several roots should resolve to the first root."""
+        user, team = roots
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+
+        assert catalog.resolve("shared.txt") == user.joinpath("shared.txt")
+        assert catalog.resolve("lang/team.sh") == team.joinpath("lang", "team.sh")
+
+    def test_unknown_name_resolves_to_none(self, roots: tuple[Path, Path]) -> None:
+        """resolve() should return None for names no root provides."""
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+
+        assert catalog.resolve("missing.txt") is None
+        assert "missing.txt" not in catalog
+
+    def test_missing_roots_are_skipped(self, tempdir: Path, roots: tuple[Path, Path]) -> None:
+        """Roots that do not exist should be ignored."""
+        user, team = roots
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(
+            (tempdir.joinpath("missing"), user, team)
+        )
+
+        assert catalog.roots == (user.absolute(), team.absolute())
+
+    def test_max_entries_truncates_merged_catalog(self, roots: tuple[Path, Path]) -> None:
+        """The merged catalog should hold at most max_entries templates and say so."""
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots, max_entries=2)
+
+        assert len(catalog) == 2
+        assert catalog.truncated
+        assert not template_catalog.get_catalog(roots, max_entries=3).truncated
+
+    def test_max_entries_keeps_first_names_in_natural_order(self, tempdir: Path) -> None:
+        """A capped catalog should hold the start of the natural listing, without gaps."""
+        for name in ("f3", "f10", "f1", "f2"):
+            utils.create_file(tempdir.joinpath("a", name))
+
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog((tempdir,), max_entries=2)
+
+        assert list(catalog.iter_natural()) == ["a/f1", "a/f2"]
+        assert catalog.truncated
+
+    def test_iterates_in_sorted_order(self, roots: tuple[Path, Path]) -> None:
+        """Template names should be listed in sorted order regardless of their root."""
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+
+        assert list(catalog) == ["lang/team.sh", "mine.py", "shared.txt"]
+
+    def test_iter_prefix(self, roots: tuple[Path, Path]) -> None:
+        """iter_prefix should only yield names below the given prefix."""
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+
+        assert list(catalog.iter_prefix("lang/")) == ["lang/team.sh"]
+
+    def test_iter_metadata(self, roots: tuple[Path, Path]) -> None:
+        """iter_metadata should pair every name with the metadata of the file it resolves to."""
+        user, _ = roots
+        user.joinpath("shared.txt").write_bytes(b"x\ny\n")
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots, metadata=True)
+
+        found = dict(catalog.iter_metadata())
+
+        assert list(found) == ["lang/team.sh", "mine.py", "shared.txt"]
+        assert found["shared.txt"] is not None
+        assert (found["shared.txt"].size, found["shared.txt"].lines) == (4, 2)
+
+    def test_iter_metadata_needs_metadata(self, roots: tuple[Path, Path]) -> None:
+        """iter_metadata should raise ValueError for a catalog built without metadata."""
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+
+        with pytest.raises(ValueError):
+            list(catalog.iter_metadata())
+
+    def test_match_filename(self, roots: tuple[Path, Path]) -> None:
+        """match_filename() should pick a template from the destination's name."""
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+
+        assert catalog.match_filename("build.sh") == "lang/team.sh"
+        assert catalog.match_filename("main.py") == "mine.py"
+        assert catalog.match_filename("README") is None
+
+    def test_find_unique_partial_name(self, roots: tuple[Path, Path]) -> None:
+        """find() should return the single template that matches best across roots."""
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+
+        assert catalog.find("tea") == ["lang/team.sh"]
+        assert catalog.find("shared") == ["shared.txt"]
+
+    def test_find_ambiguous_partial_name(self, roots: tuple[Path, Path]) -> None:
+        """find() should return ranked candidates when no template matches best."""
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+
+        assert catalog.find("e") == ["mine.py", "shared.txt", "lang/team.sh"]
+        assert catalog.find("e", limit=1) == ["mine.py"]
+        assert catalog.find("zzz") == []
+
+    def test_packed_root_is_served_from_pack(self, roots: tuple[Path, Path]) -> None:
+        """A packed root should be listed, searched and read from its pack."""
+        user, team = roots
+        team.joinpath("lang", "team.sh").write_bytes(b"packed\n")
+        template_pack.write_pack(team)
+        team.joinpath("lang", "team.sh").write_bytes(b"edited\n")
+
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+
+        assert sorted(catalog) == ["lang/team.sh", "mine.py", "shared.txt"]
+        assert catalog.find("tea") == ["lang/team.sh"]
+        assert catalog.read_contents("lang/team.sh") == b"packed\n"
+        assert catalog.read_contents("shared.txt") is None  # provided by the unpacked user root
+
+    def test_outdated_pack_is_not_served(self, roots: tuple[Path, Path]) -> None:
+        """A template added after packing should be listed from the directory, with a warning."""
+        _, team = roots
+        template_pack.write_pack(team)
+        utils.create_file(team.joinpath("lang", "added.sh"))
+
+        with mock.patch.object(template_catalog._logger, "warning") as mock_warning:
+            catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+
+        assert "lang/added.sh" in catalog
+        assert not catalog.is_bundled(team.absolute())
+        mock_warning.assert_called_once()
+
+    def test_archive_root_is_served_from_archive(self, tempdir: Path, roots: tuple[Path, Path]) -> None:
+        """A zip archive on the search path should be listed, searched and read like a root."""
+        user, _ = roots
+        archive_path: Path = tempdir.joinpath("archived.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("shared.txt", b"shadowed\n")
+            archive.writestr("zipped/notes.md", b"# notes\n")
+
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog((user, archive_path))
+
+        assert sorted(catalog) == ["mine.py", "shared.txt", "zipped/notes.md"]
+        assert catalog.find("notes") == ["zipped/notes.md"]
+        assert catalog.read_contents("zipped/notes.md") == b"# notes\n"
+        assert catalog.read_contents("shared.txt") is None  # provided by the user directory
+
+    def test_iter_natural_pages(self, tempdir: Path) -> None:
+        """iter_natural should list names in natural order and cut pages from it."""
+        for name in ("b10.txt", "B2.txt", "b1.txt", "a.txt"):
+            utils.create_file(tempdir.joinpath("root", name))
+        catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog((tempdir.joinpath("root"),))
+
+        assert list(catalog.iter_natural()) == ["a.txt", "b1.txt", "B2.txt", "b10.txt"]
+        assert list(catalog.iter_natural(offset=1, limit=2)) == ["b1.txt", "B2.txt"]
+        assert list(catalog.iter_natural(offset=10)) == []
+
+    def test_natural_order_is_cached(self, roots: tuple[Path, Path]) -> None:
+        """A catalog with the same names should reuse the cached order without computing sort keys."""
+        expected: list[str] = list(template_catalog.get_catalog(roots).iter_natural())
+
+        with mock.patch.object(natural_order, "sort_key", side_effect=AssertionError):
+            catalog: template_catalog.TemplateCatalog = template_catalog.get_catalog(roots)
+            assert list(catalog.iter_natural()) == expected
+
+        user, _ = roots
+        utils.create_file(user.joinpath("another.txt"))
+        assert "another.txt" in template_catalog.get_catalog(roots).iter_natural()
+
+    def test_all_roots_missing_raises(self, tempdir: Path) -> None:
+        """InvalidPathError should be raised when no root exists."""
+        with pytest.raises(exceptions.InvalidPathError):
+            template_catalog.get_catalog((tempdir.joinpath("a"), tempdir.joinpath("b")))
+
+    def test_empty_roots_raises(self) -> None:
+        """ValueError should be raised when no root is given."""
+        with pytest.raises(ValueError):
+            template_catalog.get_catalog(())
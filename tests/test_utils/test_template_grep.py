@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import makefiles.utils.template_grep as template_grep
+
+
+def _grep(path: Path, pattern: str) -> list[tuple[int, bytes]]:
+    return [
+        (match.number, match.line)
+        for match in template_grep.grep_file(str(path), template_grep.compile_pattern(pattern))
+    ]
+
+
+class TestGrepFile:
+    def test_reports_matching_lines_with_numbers(self, tempdir: Path) -> None:
+        """Matching lines should be reported with their 1-based line numbers."""
+        path: Path = tempdir.joinpath("cli.py")
+        path.write_bytes(b"import os\nimport argparse\n\nparser = argparse.ArgumentParser()\n")
+
+        assert _grep(path, "argparse") == [(2, b"import argparse"), (4, b"parser = argparse.ArgumentParser()")]
+
+    def test_line_reported_once(self, tempdir: Path) -> None:
+        """A line with several matches should be reported once."""
+        path: Path = tempdir.joinpath("a.txt")
+        path.write_bytes(b"aaa\nb\na\n")
+
+        assert _grep(path, "a") == [(1, b"aaa"), (3, b"a")]
+
+    def test_anchors_match_at_line_boundaries(self, tempdir: Path) -> None:
+        """^ and $ should match at the start and end of every line."""
+        path: Path = tempdir.joinpath("a.txt")
+        path.write_bytes(b"x = 1\n  x = 2\nx")
+
+        assert _grep(path, "^x") == [(1, b"x = 1"), (3, b"x")]
+        assert _grep(path, "2$") == [(2, b"  x = 2")]
+
+    def test_empty_match_after_final_newline_is_ignored(self, tempdir: Path) -> None:
+        """A pattern matching the empty string should report each line once, and nothing past the end."""
+        path: Path = tempdir.joinpath("a.txt")
+        path.write_bytes(b"one\n\ntwo\n")
+
+        assert _grep(path, "^") == [(1, b"one"), (2, b""), (3, b"two")]
+
+    def test_binary_files_are_skipped(self, tempdir: Path) -> None:
+        """Files with a NUL byte near the start should never match."""
+        path: Path = tempdir.joinpath("logo.png")
+        path.write_bytes(b"\x89PNG\x00argparse\n")
+
+        assert _grep(path, "argparse") == []
+
+    def test_empty_and_missing_files_have_no_matches(self, tempdir: Path) -> None:
+        """Empty files cannot be mapped and missing ones cannot be opened; neither should fail."""
+        path: Path = tempdir.joinpath("empty.txt")
+        path.touch()
+
+        assert _grep(path, "^") == []
+        assert _grep(tempdir.joinpath("missing.txt"), "x") == []
+
+
+class TestGrepBuffer:
+    def test_searches_in_memory_contents(self) -> None:
+        """Contents served from memory, such as a pack's memoryview, should be searched like files."""
+        pattern = template_grep.compile_pattern("^b")
+
+        assert template_grep.grep_buffer(memoryview(b"a\nbc\nb\n"), pattern) == [
+            template_grep.LineMatch(2, b"bc"),
+            template_grep.LineMatch(3, b"b"),
+        ]
+
+
+class TestGrep:
+    def test_results_follow_input_order(self, tempdir: Path) -> None:
+        """Results should be aligned with the given paths, with and without a thread pool."""
+        paths: list[str] = []
+        for index in range(20):
+            path: Path = tempdir.joinpath(f"{index}.txt")
+            path.write_bytes(b"match\n" if index % 3 == 0 else b"other\n")
+            paths.append(str(path))
+
+        pattern = template_grep.compile_pattern("match")
+        serial: list[list[template_grep.LineMatch]] = list(template_grep.grep(paths, pattern))
+        parallel: list[list[template_grep.LineMatch]] = list(template_grep.grep(paths, pattern, jobs=4))
+
+        assert serial == parallel
+        assert [bool(matches) for matches in serial] == [index % 3 == 0 for index in range(20)]
+
+    def test_searches_contents_of_bundled_templates(self, tempdir: Path) -> None:
+        """Functions returning contents should be searched alongside paths; unreadable ones match nothing."""
+        path: Path = tempdir.joinpath("file.txt")
+        path.write_bytes(b"match\n")
+        pattern = template_grep.compile_pattern("match")
+
+        results: list[list[template_grep.LineMatch]] = list(
+            template_grep.grep([str(path), lambda: b"no\nmatch\n", lambda: None], pattern, jobs=2)
+        )
+
+        assert results == [[template_grep.LineMatch(1, b"match")], [template_grep.LineMatch(2, b"match")], []]
@@ -0,0 +1,250 @@
+import os
+import random
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+import makefiles.exceptions as exceptions
+import makefiles.utils.dirwalker as dirwalker
+import makefiles.utils.name_cache as name_cache
+import makefiles.utils.natural_order as natural_order
+import makefiles.utils.template_index as template_index
+import tests.utils as utils
+
+
+def _age_tree(root: Path, seconds: int = 60) -> None:
+    """Moves every directory mtime into the past so the index trusts it."""
+    for dirpath, _, _ in os.walk(root):
+        stat: os.stat_result = os.stat(dirpath)
+        os.utime(dirpath, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 1_000_000_000))
+
+
+class TestTemplateIndex:
+    @pytest.fixture
+    def filetree(self, tempdir: Path) -> list[str]:
+        """Generates a random file tree with old directory mtimes."""
+        files: list[str] = utils.generate_tree(
+            tempdir,
+            max_depth=random.randint(1, 4),
+            max_children=random.randint(1, 4),
+            max_files=random.randint(1, 4),
+            hidden=True,
+        )
+        _age_tree(tempdir)
+        return files
+
+    def test_matches_listf(self, tempdir: Path, filetree: list[str]) -> None:
+        """The index should list exactly what listf lists."""
+        index: template_index.TemplateIndex = template_index.get_index(tempdir)
+
+        assert sorted(index) == sorted(dirwalker.listf(tempdir))
+        assert len(index) == len(dirwalker.listf(tempdir))
+
+    def test_records_sort_keys(self, tempdir: Path, filetree: list[str]) -> None:
+        """The saved index should hold the natural sort key of every template, and only those."""
+        template_index.get_index(tempdir)
+        removed: str = filetree[0]
+        tempdir.joinpath(removed).unlink()
+
+        template_index.get_index(tempdir)
+        index: template_index.TemplateIndex = template_index.TemplateIndex.load(tempdir)
+
+        assert index.sort_keys == {name: natural_order.sort_key(name) for name in index}
+        assert removed not in index.sort_keys
+
+    def test_saved_index_is_reused(self, tempdir: Path, filetree: list[str]) -> None:
+        """An unchanged tree should be served from the cache without rescanning any directory."""
+        expected: list[str] = sorted(template_index.get_index(tempdir))
+
+        with mock.patch.object(dirwalker, "scan", wraps=dirwalker.scan) as mock_scan:
+            index: template_index.TemplateIndex = template_index.get_index(tempdir)
+
+        assert sorted(index) == expected
+        mock_scan.assert_not_called()
+
+    def test_only_changed_directory_is_rescanned(self, tempdir: Path) -> None:
+        """Adding a file should rescan only the directory that holds it."""
+        utils.create_file(tempdir.joinpath("a", "one.txt"))
+        utils.create_file(tempdir.joinpath("b", "two.txt"))
+        _age_tree(tempdir)
+        template_index.get_index(tempdir)
+
+        utils.create_file(tempdir.joinpath("b", "three.txt"))
+
+        with mock.patch.object(dirwalker, "scan", wraps=dirwalker.scan) as mock_scan:
+            index: template_index.TemplateIndex = template_index.get_index(tempdir)
+
+        assert sorted(index) == ["a/one.txt", "b/three.txt", "b/two.txt"]
+        mock_scan.assert_called_once()
+        assert mock_scan.call_args[0][0] == os.path.join(tempdir, "b")
+
+    def test_recently_modified_directory_is_not_trusted(self, tempdir: Path) -> None:
+        """A directory modified within the racy window should be rescanned on the next run."""
+        utils.create_file(tempdir.joinpath("one.txt"))
+        template_index.get_index(tempdir)
+
+        with mock.patch.object(dirwalker, "scan", wraps=dirwalker.scan) as mock_scan:
+            template_index.get_index(tempdir)
+
+        mock_scan.assert_called_once()
+
+    def test_removed_directory_is_dropped(self, tempdir: Path) -> None:
+        """Files of a deleted directory should disappear from the index."""
+        utils.create_file(tempdir.joinpath("keep.txt"))
+        utils.create_file(tempdir.joinpath("gone", "file.txt"))
+        template_index.get_index(tempdir)
+
+        tempdir.joinpath("gone", "file.txt").unlink()
+        tempdir.joinpath("gone").rmdir()
+
+        assert list(template_index.get_index(tempdir)) == ["keep.txt"]
+
+    def test_corrupt_cache_is_rebuilt(self, tempdir: Path) -> None:
+        """A corrupt cache file should be discarded and rebuilt from a full scan."""
+        utils.create_file(tempdir.joinpath("one.txt"))
+        index_path: Path = template_index.get_index_path(tempdir)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        index_path.write_text("{not json")
+
+        assert list(template_index.get_index(tempdir)) == ["one.txt"]
+
+    def test_invalid_root_raises(self, tempdir: Path) -> None:
+        """A missing root should raise InvalidPathError."""
+        with pytest.raises(exceptions.InvalidPathError):
+            template_index.get_index(tempdir.joinpath(utils.get_random_name()))
+
+    def test_parallel_refresh_matches_serial(self, tempdir: Path, filetree: list[str]) -> None:
+        """Building the index with a thread pool should give the same listing."""
+        assert sorted(template_index.get_index(tempdir, jobs=4)) == sorted(dirwalker.listf(tempdir))
+
+    def test_ignore_file_prunes_directories(self, tempdir: Path) -> None:
+        """Directories matched by .mkfileignore should never be read."""
+        utils.create_file(tempdir.joinpath("app", "main.py"))
+        utils.create_file(tempdir.joinpath("app", "node_modules", "dep", "index.js"))
+        tempdir.joinpath(".mkfileignore").write_text("node_modules/\n")
+
+        with mock.patch.object(dirwalker, "scan", wraps=dirwalker.scan) as mock_scan:
+            index: template_index.TemplateIndex = template_index.get_index(tempdir)
+
+        assert list(index) == ["app/main.py"]
+        scanned: list[str] = [call[0][0] for call in mock_scan.call_args_list]
+        assert os.path.join(tempdir, "app", "node_modules") not in scanned
+
+    def test_changed_ignore_file_rebuilds_index(self, tempdir: Path) -> None:
+        """Editing .mkfileignore should take effect even for directories with unchanged mtimes."""
+        utils.create_file(tempdir.joinpath("keep.txt"))
+        utils.create_file(tempdir.joinpath("sub", "drop.log"))
+        _age_tree(tempdir)
+        assert sorted(template_index.get_index(tempdir)) == ["keep.txt", "sub/drop.log"]
+
+        tempdir.joinpath(".mkfileignore").write_text("*.log\n")
+        _age_tree(tempdir)
+
+        assert list(template_index.get_index(tempdir)) == ["keep.txt"]
+
+    def test_follow_links_indexes_linked_collections(self, tempdir: Path) -> None:
+        """Switching follow_links should rebuild the index with linked directories, each read once."""
+        root: Path = tempdir.joinpath("root")
+        shared: Path = tempdir.joinpath("shared")
+        utils.create_file(root.joinpath("own.txt"))
+        utils.create_file(shared.joinpath("f.txt"))
+        root.joinpath("link").symlink_to(shared, target_is_directory=True)
+        root.joinpath("again").symlink_to(shared, target_is_directory=True)
+        shared.joinpath("loop").symlink_to(root, target_is_directory=True)
+        _age_tree(tempdir)
+        assert list(template_index.get_index(root)) == ["own.txt"]
+
+        index: template_index.TemplateIndex = template_index.get_index(root, follow_links=True)
+
+        assert sorted(index) in (["again/f.txt", "own.txt"], ["link/f.txt", "own.txt"])
+        assert template_index.TemplateIndex.load(root).follow_links
+        assert list(template_index.get_index(root)) == ["own.txt"]
+
+    def test_metadata_is_recorded_once(self, tempdir: Path) -> None:
+        """Metadata should be collected on request, saved, and not collected again."""
+        tempdir.joinpath("text.txt").write_bytes(b"one\ntwo\nthree")
+        tempdir.joinpath("blob.bin").write_bytes(b"\x00\x01\n\x02")
+        _age_tree(tempdir)
+
+        index: template_index.TemplateIndex = template_index.get_index(tempdir, metadata=True)
+        text_meta: template_index.FileMeta = index.meta["text.txt"]
+
+        assert (text_meta.size, text_meta.lines, text_meta.binary) == (13, 3, False)
+        assert index.meta["blob.bin"].binary
+        assert text_meta.mtime_ns == tempdir.joinpath("text.txt").stat().st_mtime_ns
+
+        with mock.patch.object(template_index, "read_metadata") as mock_read:
+            assert template_index.get_index(tempdir, metadata=True).meta == index.meta
+        mock_read.assert_not_called()
+
+    def test_metadata_of_changed_file_is_dropped(self, tempdir: Path) -> None:
+        """Files that changed in a rescanned directory should have their metadata collected again."""
+        utils.create_file(tempdir.joinpath("sub", "kept.txt"))
+        utils.create_file(tempdir.joinpath("sub", "changed.txt"))
+        _age_tree(tempdir)
+        template_index.get_index(tempdir, metadata=True)
+
+        tempdir.joinpath("sub", "changed.txt").write_bytes(b"new\n")
+        utils.create_file(tempdir.joinpath("sub", "added.txt"))
+        _age_tree(tempdir)
+
+        with mock.patch.object(template_index, "read_metadata", wraps=template_index.read_metadata) as mock_read:
+            index: template_index.TemplateIndex = template_index.get_index(tempdir, metadata=True)
+
+        read: list[str] = sorted(Path(call.args[0]).name for call in mock_read.call_args_list)
+        assert read == ["added.txt", "changed.txt"]
+        assert index.meta["sub/changed.txt"].lines == 1
+
+    def test_metadata_not_collected_unless_requested(self, tempdir: Path) -> None:
+        """A plain refresh should not read any template."""
+        utils.create_file(tempdir.joinpath("a.txt"))
+
+        with mock.patch.object(template_index, "read_metadata") as mock_read:
+            assert template_index.get_index(tempdir).meta == {}
+        mock_read.assert_not_called()
+
+    def test_max_entries_stops_refresh_early(self, tempdir: Path) -> None:
+        """Exceeding max_entries should stop the walk and mark the index truncated."""
+        for name in ("a", "b", "c"):
+            for number in range(3):
+                utils.create_file(tempdir.joinpath(name, f"{number}.txt"))
+
+        with mock.patch.object(dirwalker, "scan", wraps=dirwalker.scan) as mock_scan:
+            index: template_index.TemplateIndex = template_index.get_index(tempdir, max_entries=4)
+
+        assert index.truncated
+        assert mock_scan.call_count < 4
+        assert not template_index.get_index(tempdir).truncated
+
+    @pytest.mark.parametrize(("max_depth", "max_entries"), [(None, 2), (1, None)])
+    def test_budgeted_refresh_is_not_saved(self, tempdir: Path, max_depth: int | None, max_entries: int | None) -> None:
+        """A refresh cut short by a budget should leave the cached index and completion names complete."""
+        for name in ("a", "b"):
+            for number in range(2):
+                utils.create_file(tempdir.joinpath(name, f"{number}.txt"))
+        _age_tree(tempdir)
+        names: list[str] = sorted(template_index.get_index(tempdir))
+
+        assert not template_index.get_index(tempdir, max_depth=max_depth, max_entries=max_entries).complete
+
+        assert sorted(template_index.TemplateIndex.load(tempdir)) == names
+        assert list(name_cache.load(tempdir) or ()) == names
+
+    def test_max_depth_leaves_out_deeper_directories(self, tempdir: Path) -> None:
+        """A depth-limited refresh should only index files up to max_depth components deep."""
+        utils.create_file(tempdir.joinpath("top.txt"))
+        utils.create_file(tempdir.joinpath("a", "b", "deep.txt"))
+        _age_tree(tempdir)
+
+        assert list(template_index.get_index(tempdir, max_depth=2)) == ["top.txt"]
+        assert sorted(template_index.get_index(tempdir)) == ["a/b/deep.txt", "top.txt"]
+
+    def test_restrict_matches_budgeted_refresh(self, tempdir: Path, filetree: list[str]) -> None:
+        """restrict should give the same listing as a refresh with the same budgets."""
+        expected: list[str] = sorted(dirwalker.listf(tempdir, max_depth=2))
+        index: template_index.TemplateIndex = template_index.get_index(tempdir)
+        index.restrict(max_depth=2, max_entries=len(expected) - 1)
+
+        assert sorted(index) == expected
+        assert index.truncated
@@ -0,0 +1,91 @@
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+import makefiles.utils.template_mirror as template_mirror
+
+
+class TestGetTtl:
+    @pytest.mark.parametrize(("value", "expected"), [("", None), ("0", 0.0), ("2.5", 2.5), ("-1", None), ("x", None)])
+    def test_parses_variable(self, value: str, expected: float | None) -> None:
+        """MKFILE_MIRROR_TTL should enable mirroring only with a non-negative number of seconds."""
+        with mock.patch.dict(os.environ, {"MKFILE_MIRROR_TTL": value}):
+            assert template_mirror.get_ttl() == expected
+
+    def test_unset_disables_mirroring(self) -> None:
+        """Without MKFILE_MIRROR_TTL templates should not be mirrored."""
+        env: dict[str, str] = {k: v for k, v in os.environ.items() if k != "MKFILE_MIRROR_TTL"}
+        with mock.patch.dict(os.environ, env, clear=True):
+            assert template_mirror.get_ttl() is None
+
+
+class TestFetch:
+    @pytest.fixture
+    def root(self, tempdir: Path) -> Path:
+        """Creates a template directory with one nested template."""
+        root: Path = tempdir.joinpath("remote")
+        root.joinpath("python").mkdir(parents=True)
+        root.joinpath("python", "script.py").write_bytes(b"print('hi')\n")
+        return root
+
+    def test_mirrors_template(self, root: Path) -> None:
+        """The first fetch should copy the template into the mirror directory."""
+        mirrored: Path | None = template_mirror.fetch(root, "python/script.py")
+
+        assert mirrored == template_mirror.get_mirror_dir(root).joinpath("python", "script.py")
+        assert mirrored.read_bytes() == b"print('hi')\n"
+
+    def test_refreshes_changed_template(self, root: Path) -> None:
+        """A template whose size or mtime changed should be copied again."""
+        template_mirror.fetch(root, "python/script.py")
+        root.joinpath("python", "script.py").write_bytes(b"print('changed')\n")
+
+        mirrored: Path | None = template_mirror.fetch(root, "python/script.py")
+
+        assert mirrored is not None
+        assert mirrored.read_bytes() == b"print('changed')\n"
+
+    def test_ttl_skips_check(self, root: Path) -> None:
+        """Within the TTL the mirrored copy should be used without looking at the original."""
+        template_mirror.fetch(root, "python/script.py")
+        root.joinpath("python", "script.py").unlink()
+
+        mirrored: Path | None = template_mirror.fetch(root, "python/script.py", ttl=3600)
+
+        assert mirrored is not None
+        assert mirrored.read_bytes() == b"print('hi')\n"
+        assert template_mirror.fetch(root, "python/script.py", ttl=0) is None
+
+    def test_lookup_only_reads_the_mirror(self, root: Path) -> None:
+        """lookup() should return the mirrored copy within the TTL and None otherwise, without fetching."""
+        assert template_mirror.lookup(root, "python/script.py", ttl=3600) is None
+        assert not template_mirror.get_mirror_dir(root).joinpath("python", "script.py").exists()
+
+        template_mirror.fetch(root, "python/script.py")
+
+        assert template_mirror.lookup(root, "python/script.py", ttl=3600) == template_mirror.get_mirror_dir(
+            root
+        ).joinpath("python", "script.py")
+        assert template_mirror.lookup(root, "python/script.py", ttl=0) is None
+
+    def test_missing_or_escaping_names(self, root: Path) -> None:
+        """Names that do not exist or leave the template directory should not be mirrored."""
+        assert template_mirror.fetch(root, "missing.txt") is None
+        assert template_mirror.fetch(root, "../remote/python/script.py") is None
+        assert template_mirror.fetch(root, str(root.joinpath("python", "script.py"))) is None
+
+    @pytest.mark.parametrize(
+        "state", ['{"version": 1, "templates": []}', '{"version": 1, "templates": {"a": 5}}', "[]"]
+    )
+    def test_malformed_state_is_ignored(self, root: Path, state: str) -> None:
+        """A state file that does not hold a templates mapping should be treated as empty."""
+        mirror_dir: Path = template_mirror.get_mirror_dir(root)
+        mirror_dir.parent.mkdir(parents=True, exist_ok=True)
+        mirror_dir.with_name(f"{mirror_dir.name}.json").write_text(state)
+
+        mirrored: Path | None = template_mirror.fetch(root, "python/script.py", ttl=3600)
+
+        assert mirrored is not None
+        assert mirrored.read_bytes() == b"print('hi')\n"
@@ -0,0 +1,128 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import makefiles.exceptions as exceptions
+import makefiles.utils.template_pack as template_pack
+
+
+class TestTemplatePack:
+    @pytest.fixture
+    def root(self, tempdir: Path) -> Path:
+        """Creates a template directory with nested, empty and binary templates."""
+        root: Path = tempdir.joinpath("templates")
+        root.joinpath("python", "cli").mkdir(parents=True)
+        root.joinpath("python", "script.py").write_bytes(b"print('hi')\n")
+        root.joinpath("python", "cli", "main.py").write_bytes(b"import argparse\nparser = None")
+        root.joinpath("empty.txt").write_bytes(b"")
+        root.joinpath("logo.png").write_bytes(b"\x89PNG\x00\x01")
+        return root
+
+    def test_roundtrip(self, root: Path) -> None:
+        """Every template should be served from the pack with its contents."""
+        assert template_pack.write_pack(root) == 4
+
+        pack: template_pack.TemplatePack | None = template_pack.load(root)
+        assert pack is not None
+        assert list(pack) == ["empty.txt", "logo.png", "python/cli/main.py", "python/script.py"]
+        for name in pack:
+            assert pack.read(name) == root.joinpath(name).read_bytes()
+
+    def test_unknown_name_reads_none(self, root: Path) -> None:
+        """read() should return None for names that are not packed."""
+        template_pack.write_pack(root)
+        pack: template_pack.TemplatePack | None = template_pack.load(root)
+
+        assert pack is not None
+        assert pack.read("missing.txt") is None
+
+    def test_records_metadata(self, root: Path) -> None:
+        """The pack should record size, mtime and line count, with None lines for binary templates."""
+        template_pack.write_pack(root)
+        pack: template_pack.TemplatePack | None = template_pack.load(root)
+
+        assert pack is not None
+        main: Path = root.joinpath("python", "cli", "main.py")
+        assert pack.meta["python/cli/main.py"] == (main.stat().st_size, main.stat().st_mtime_ns, 2)
+        assert pack.meta["empty.txt"].lines == 0
+        assert pack.meta["logo.png"].binary
+
+    def test_pack_is_a_snapshot(self, root: Path) -> None:
+        """Templates changed after packing should keep their packed contents."""
+        template_pack.write_pack(root)
+        root.joinpath("python", "script.py").write_bytes(b"changed\n")
+        root.joinpath("new.txt").write_bytes(b"new\n")
+
+        pack: template_pack.TemplatePack | None = template_pack.load(root)
+        assert pack is not None
+        assert pack.read("python/script.py") == b"print('hi')\n"
+        assert "new.txt" not in list(pack)
+
+    @pytest.mark.parametrize("added", ["new.txt", "python/cli/new.py"])
+    def test_added_template_makes_pack_outdated(self, root: Path, added: str) -> None:
+        """Adding a template anywhere in the tree should make the pack out of date."""
+        template_pack.write_pack(root)
+        pack: template_pack.TemplatePack | None = template_pack.load(root)
+        assert pack is not None
+        assert pack.is_current()
+
+        root.joinpath(added).write_bytes(b"new\n")
+
+        assert not pack.is_current()
+        assert not pack.is_current(jobs=4)
+
+    def test_pack_is_not_packed_again(self, root: Path) -> None:
+        """Repacking should list the directory itself, without the pack file."""
+        template_pack.write_pack(root)
+        root.joinpath("new.txt").write_bytes(b"new\n")
+
+        assert template_pack.write_pack(root) == 5
+
+    def test_max_depth_filters_names(self, root: Path) -> None:
+        """Names deeper than max_depth should not be listed."""
+        template_pack.write_pack(root)
+        pack: template_pack.TemplatePack | None = template_pack.load(root, max_depth=2)
+
+        assert pack is not None
+        assert list(pack) == ["empty.txt", "logo.png", "python/script.py"]
+
+    def test_max_entries_marks_truncated(self, root: Path) -> None:
+        """A pack with more templates than max_entries should be truncated."""
+        template_pack.write_pack(root)
+
+        truncated: template_pack.TemplatePack | None = template_pack.load(root, max_entries=3)
+        complete: template_pack.TemplatePack | None = template_pack.load(root, max_entries=4)
+
+        assert truncated is not None and truncated.truncated
+        assert complete is not None and not complete.truncated
+
+    def test_write_refuses_truncated_listing(self, root: Path) -> None:
+        """Packing more than max_entries templates should fail without writing a pack."""
+        with pytest.raises(exceptions.EntryLimitExceededError):
+            template_pack.write_pack(root, max_entries=2)
+
+        assert not template_pack.get_pack_path(root).exists()
+
+    def test_write_with_jobs(self, root: Path) -> None:
+        """Packing with a thread pool should produce the same pack."""
+        template_pack.write_pack(root)
+        serial: template_pack.TemplatePack | None = template_pack.load(root)
+        assert serial is not None
+        expected: dict[str, bytes] = {name: bytes(serial.read(name) or b"") for name in serial}
+        template_pack.write_pack(root, jobs=4)
+
+        pack: template_pack.TemplatePack | None = template_pack.load(root)
+        assert pack is not None
+        assert {name: bytes(pack.read(name) or b"") for name in pack} == expected
+        assert pack.meta == serial.meta
+
+    def test_missing_pack_loads_none(self, root: Path) -> None:
+        """A directory without a pack should load as None."""
+        assert template_pack.load(root) is None
+
+    def test_corrupt_pack_loads_none(self, root: Path) -> None:
+        """An unreadable pack should be ignored so the directory is read instead."""
+        template_pack.get_pack_path(root).write_bytes(b"MKP2" + os.urandom(64))
+
+        assert template_pack.load(root) is None
@@ -0,0 +1,21 @@
+import makefiles.utils.template_tree as template_tree
+from makefiles.utils.name_store import NameStore
+
+
+class TestIterTree:
+    def test_draws_nested_branches(self) -> None:
+        """Inner branches of a directory that is not last should keep the vertical line."""
+        names: NameStore = NameStore(["a/b/c.txt", "a/d.txt", "e.txt"])
+
+        assert list(template_tree.iter_tree(names)) == [
+            ". (3)",
+            "├── a/ (2)",
+            "│   ├── b/ (1)",
+            "│   │   └── c.txt",
+            "│   └── d.txt",
+            "└── e.txt",
+        ]
+
+    def test_empty_store(self) -> None:
+        """An empty store should only yield the root line."""
+        assert list(template_tree.iter_tree(NameStore())) == [". (0)"]
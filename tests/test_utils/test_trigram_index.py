@@ -0,0 +1,119 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import makefiles.utils.name_cache as name_cache
+import makefiles.utils.trigram_index as trigram_index
+from makefiles.utils.name_store import NameStore
+
+NAMES: list[str] = [
+    "c/main.c",
+    "python/pyscraper.py",
+    "python/pyscript.py",
+    "shell/script.sh",
+    "Dockerfile",
+]
+
+
+class TestMatchTier:
+    @pytest.mark.parametrize(
+        ("query", "name", "tier"),
+        [
+            ("pyscript", "python/pyscript.py", 0),
+            ("pyscript.py", "python/pyscript.py", 0),
+            ("pyscr", "python/pyscript.py", 1),
+            ("script", "python/pyscript.py", 2),
+            ("thon/py", "python/pyscript.py", 3),
+            ("pspy", "python/pyscript.py", 4),
+            ("tnscr", "python/pyscript.py", 5),
+            ("docker", "Dockerfile", 1),
+        ],
+    )
+    def test_tiers(self, query: str, name: str, tier: int) -> None:
+        """Closer matches should get lower tiers, ignoring case."""
+        assert trigram_index.match_tier(query, name) == tier
+
+    def test_no_match(self) -> None:
+        """Names without the query's characters in order should not match."""
+        assert trigram_index.match_tier("zzz", "python/pyscript.py") is None
+
+    def test_rank_orders_by_tier_then_length(self) -> None:
+        """Ranking should put better tiers first and shorter names first within a tier."""
+        ranked = trigram_index.rank("pyscr", NAMES)
+
+        assert [name for _, name in ranked] == ["python/pyscript.py", "python/pyscraper.py"]
+
+
+class TestTrigramIndex:
+    def test_search(self) -> None:
+        """Search should return the matching names, best first."""
+        names: NameStore = NameStore(NAMES)
+
+        assert trigram_index.TrigramIndex(names).search("script", names) == ["shell/script.sh", "python/pyscript.py"]
+
+    def test_candidates_need_every_trigram(self) -> None:
+        """Only names containing all trigrams of the query should be candidates."""
+        names: NameStore = NameStore(NAMES)
+        index = trigram_index.TrigramIndex(names)
+
+        assert index.candidates("main") == [names.index("c/main.c")]
+        assert index.candidates("mainx") == []
+
+    def test_short_query_scans_all_names(self) -> None:
+        """A query without trigrams should be matched against every name."""
+        names: NameStore = NameStore(NAMES)
+        index = trigram_index.TrigramIndex(names)
+
+        assert index.candidates("sh") is None
+        assert index.search("sh", names) == ["shell/script.sh"]
+
+    def test_round_trip(self) -> None:
+        """A deserialised index should give the same results."""
+        names: NameStore = NameStore(NAMES)
+        index = trigram_index.TrigramIndex.from_buffer(trigram_index.TrigramIndex(names).to_bytes())
+
+        assert index.search("pyscr", names) == ["python/pyscript.py", "python/pyscraper.py"]
+
+    def test_rejects_corrupt_data(self) -> None:
+        """Data that is not a serialised index should raise ValueError."""
+        data: bytes = trigram_index.TrigramIndex(NameStore(NAMES)).to_bytes()
+
+        with pytest.raises(ValueError):
+            trigram_index.TrigramIndex.from_buffer(data[:-1])
+        with pytest.raises(ValueError):
+            trigram_index.TrigramIndex.from_buffer(b"MKT")
+
+
+class TestGetTrigramIndex:
+    def test_built_once_and_stored(self, tempdir: Path) -> None:
+        """The index should be written on first use and read back afterwards."""
+        name_cache.save(tempdir, NAMES)
+        names = name_cache.load(tempdir)
+        assert names is not None
+
+        trigram_index.get_trigram_index(tempdir, names)
+        trigrams_path: Path = trigram_index.get_trigrams_path(tempdir)
+        mtime: int = trigrams_path.stat().st_mtime_ns
+
+        index = trigram_index.get_trigram_index(tempdir, names)
+
+        assert trigrams_path.stat().st_mtime_ns == mtime
+        assert index.search("main", names) == ["c/main.c"]
+
+    def test_rebuilt_when_names_change(self, tempdir: Path) -> None:
+        """A stored index built from an older names file should be replaced."""
+        name_cache.save(tempdir, NAMES)
+        names = name_cache.load(tempdir)
+        assert names is not None
+        trigram_index.get_trigram_index(tempdir, names)
+
+        name_cache.save(tempdir, ["go/main.go", *NAMES])
+        names_path: Path = name_cache.get_names_path(tempdir)
+        os.utime(names_path, ns=(0, names_path.stat().st_mtime_ns + 1))
+        names = name_cache.load(tempdir)
+        assert names is not None
+
+        index = trigram_index.get_trigram_index(tempdir, names)
+
+        assert index.search("main", names) == ["c/main.c", "go/main.go"]